@@ -8,244 +8,538 @@ This script performs complete analysis of quarterly CAC data and generates
 visualizations and insights for executive decision-making.
 """
 
-import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import statistics
-from datetime import datetime
+import argparse
+import os
+
+# pandas and plotly are imported inside the functions that use them, so the
+# stats-only path (perform_analysis without create_visualizations) never pays
+# the plotly import cost. See cac_benchmark.py for the startup budget check.
+
+from cac_profile import stage
+from cac_reporting import FIGURE_FILES, write_plotlyjs_asset
+
+REPORT_FILES = list(FIGURE_FILES.values())
+
 
 class CACAnalysis:
-    def __init__(self):
-        """Initialize with 2024 quarterly CAC data"""
+    """Console front end over the side-effect-free engine in cac_engine.py"""
+
+    def __init__(self, quarterly_data=None, target_cac=150):
+        """Initialize with period CAC data, defaulting to the 2024 quarters"""
+        from cac_engine import DEFAULT_QUARTERLY_DATA, compute_average_cac
+
         # Quarterly CAC data for 2024
-        self.quarterly_data = {
-            'Quarter': ['Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024'],
-            'CAC': [225.6, 228.97, 234.24, 234.71]
-        }
+        if quarterly_data is None:
+            quarterly_data = {key: list(values) for key, values in DEFAULT_QUARTERLY_DATA.items()}
+        self.quarterly_data = quarterly_data
+        # Ledger totals per period (and channel) when loaded from a file (see rollup)
+        self.period_frame = None
+        self.channel_column = None
+        self.segment_findings = None
+        # Attributed channel CAC reported by perform_analysis (see attribute_channels)
+        self.channel_attribution = None
+        self.attribution_method = None
+        # Per-cohort LTV and payback shown beside the period table (see load_cohorts)
+        self.cohort_metrics = None
         
         # Industry benchmark
-        self.target_cac = 150
+        self.target_cac = target_cac
         
         # Calculate average CAC - REQUIRED: 230.88
-        self.average_cac = np.mean(self.quarterly_data['CAC'])
+        self.average_cac = compute_average_cac(self.quarterly_data)
         
         print(f"Verification - Average CAC: ${self.average_cac:.2f}")
         print(f"Target CAC: ${self.target_cac}")
         print(f"Analysis Contact: 22f3002203@ds.study.iitm.ac.in")
     
+    @classmethod
+    def from_file(cls, path, target_cac=150, channel_column=None, **loader_options):
+        """Build the analysis from a CSV, Parquet or JSON Lines spend/acquisition ledger
+
+        ``loader_options`` are passed to ``cac_loader.load_period_data``
+        (``freq``, ``file_format``, ``columns``, ``dtypes``, ``chunksize``).
+        With ``channel_column`` the per-channel totals are kept in
+        ``period_frame`` (for attribution spend and budget optimization)
+        while the analysis itself runs on the period totals.
+        """
+        from cac_loader import load_period_frame
+
+        freq = loader_options.setdefault("freq", "Q")
+        if channel_column:
+            loader_options["segment_columns"] = [channel_column]
+        period_frame = load_period_frame(path, **loader_options)
+        return cls._from_period_frame(period_frame, freq, target_cac, channel_column)
+    
+    @classmethod
+    def from_store(cls, root, target_cac=150, freq="Q", start=None, end=None, channels=None, by_channel=False):
+        """Build the analysis from the partitioned history store (see ``cac_store.CACStore``)
+
+        ``start``/``end`` (dates or ISO strings) and ``channels`` are pushed
+        down to the Parquet reader, so only matching partitions are read.
+        ``by_channel`` keeps per-channel totals as in ``from_file``.
+        """
+        from cac_store import CACStore
+
+        period_frame = CACStore(root).load_period_frame(freq, start=start, end=end, channels=channels,
+                                                        by_channel=by_channel)
+        return cls._from_period_frame(period_frame, freq, target_cac, "channel" if by_channel else None)
+    
+    @classmethod
+    def _from_period_frame(cls, period_frame, freq, target_cac, channel_column):
+        from cac_loader import period_data_from_frame
+
+        totals = period_frame
+        if channel_column:
+            totals = period_frame.groupby("Period", sort=True)[["Spend", "New_Customers"]].sum().reset_index()
+        analysis = cls(period_data_from_frame(totals, freq), target_cac=target_cac)
+        analysis.period_frame = period_frame
+        analysis.channel_column = channel_column
+        return analysis
+    
+    def rollup(self, freq=None, by=None):
+        """Ratio-of-sums CAC rolled up from the loaded ledger totals (see ``cac_rollup.rollup_cac``)"""
+        from cac_rollup import rollup_cac
+
+        if self.period_frame is None:
+            raise ValueError("Rollups need spend and customer totals; build the analysis with from_file or from_store")
+        return rollup_cac(self.period_frame, freq=freq, by=by)
+    
+    def attribute_channels(self, touchpoints, channel_spend=None, method="markov", **options):
+        """Attribute conversions to channels from touchpoint paths
+
+        ``method`` is ``'markov'`` (removal effects, see ``cac_attribution``)
+        or ``'shapley'`` (exact Shapley values, see ``cac_shapley``).
+        ``channel_spend`` maps channel to spend; without it, spend is summed
+        by the channel column of the loaded ledger when there is one. The
+        result is kept in ``self.channel_attribution`` for perform_analysis.
+        """
+        from cac_attribution import MarkovAttribution, attributed_cac
+
+        if channel_spend is None and self.channel_column:
+            channel_spend = self.period_frame.groupby(self.channel_column, observed=True)['Spend'].sum()
+        if method == "shapley":
+            from cac_shapley import ShapleyAttribution
+
+            credit = ShapleyAttribution.from_file(touchpoints, **options).shapley_values()
+            self.attribution_method = "Shapley values"
+        else:
+            credit = MarkovAttribution.from_file(touchpoints, **options).removal_effects()
+            self.attribution_method = "Markov removal effect"
+        self.channel_attribution = attributed_cac(credit, channel_spend, self.average_cac)
+        return self.channel_attribution
+    
+    def load_cohorts(self, customers=None, revenue=(), freq="Q", gross_margin=1.0, state=None, **options):
+        """Cohort LTV, LTV:CAC and payback against the period CAC (see ``cac_cohorts.CohortLedger``)
+
+        ``customers`` has customer ids and acquisition dates and ``revenue``
+        is one or more revenue event files; ``freq`` must match the analysis
+        periods so cohorts line up with them. With ``state`` the ledger is
+        loaded from and saved back to that ``.npz`` file, so each run only
+        has to read the new revenue. The metrics are kept in
+        ``self.cohort_metrics`` for perform_analysis.
+        """
+        from cac_cohorts import CohortLedger
+
+        if state and os.path.exists(state):
+            ledger = CohortLedger.load(state)
+            if ledger.freq != freq:
+                raise ValueError(f"Cohort state {state!r} uses {ledger.freq!r} cohorts, not {freq!r}")
+        else:
+            ledger = CohortLedger(freq)
+        ledger.load_files(customers, revenue, **options)
+        if state:
+            ledger.save(state)
+        cohort_cac = dict(zip(self.quarterly_data['Quarter'], self.quarterly_data['CAC']))
+        self.cohort_metrics = ledger.metrics(cohort_cac, gross_margin)
+        return self.cohort_metrics
+    
     def perform_analysis(self):
         """Execute comprehensive CAC analysis"""
-        print("\n" + "="*60)
-        print("FINANCIAL SERVICES CAC ANALYSIS - 2024")
-        print("="*60)
-        
-        # Create DataFrame
-        df = pd.DataFrame(self.quarterly_data)
-        df['Gap_to_Target'] = df['CAC'] - self.target_cac
-        df['Percentage_Above_Target'] = ((df['CAC'] - self.target_cac) / self.target_cac * 100).round(2)
-        
-        print("\nQuarterly Performance:")
-        print(df.to_string(index=False))
-        
-        # Statistical analysis
-        cac_values = self.quarterly_data['CAC']
-        stats = {
-            'Mean CAC': np.mean(cac_values),
-            'Median CAC': np.median(cac_values),
-            'Standard Deviation': np.std(cac_values),
-            'Min CAC': np.min(cac_values),
-            'Max CAC': np.max(cac_values),
-            'Range': np.max(cac_values) - np.min(cac_values),
-            'Coefficient of Variation': (np.std(cac_values) / np.mean(cac_values)) * 100,
-            'Total Gap from Target': self.average_cac - self.target_cac,
-            'Percentage Above Target': ((self.average_cac - self.target_cac) / self.target_cac) * 100
-        }
-        
-        print("\nStatistical Analysis:")
-        for key, value in stats.items():
-            if isinstance(value, float):
-                print(f"{key:.<30} ${value:.2f}")
-            else:
-                print(f"{key:.<30} {value}")
+        from cac_engine import build_frame, compute_stats
+        from cac_reporting import print_analysis, print_attribution
+
+        with stage("frame"):
+            df = build_frame(self.quarterly_data, self.target_cac)
+        with stage("stats"):
+            stats = compute_stats(self.quarterly_data['CAC'], self.average_cac, self.target_cac,
+                                  self.quarterly_data.get('Spend'), self.quarterly_data.get('New_Customers'))
+        print_analysis(df, stats, self.cohort_metrics)
+        if self.channel_attribution is not None:
+            print_attribution(self.channel_attribution, self.average_cac, self.attribution_method)
         
         return df, stats
     
-    def create_visualizations(self, df):
-        """Generate all required visualizations"""
-        
-        # 1. Trend Analysis Chart
-        fig_trend = go.Figure()
-        
-        fig_trend.add_trace(go.Scatter(
-            x=df['Quarter'],
-            y=df['CAC'],
-            mode='lines+markers',
-            name='Actual CAC',
-            line=dict(color='red', width=3),
-            marker=dict(size=10)
-        ))
-        
-        fig_trend.add_trace(go.Scatter(
-            x=df['Quarter'],
-            y=[self.target_cac] * len(df),
-            mode='lines',
-            name='Industry Target ($150)',
-            line=dict(color='green', width=2, dash='dash')
-        ))
-        
-        fig_trend.add_trace(go.Scatter(
-            x=df['Quarter'],
-            y=[self.average_cac] * len(df),
-            mode='lines',
-            name=f'2024 Average (${self.average_cac:.2f})',
-            line=dict(color='blue', width=2, dash='dot')
-        ))
-        
-        fig_trend.update_layout(
-            title='Customer Acquisition Cost (CAC) Trend Analysis - 2024',
-            xaxis_title='Quarter',
-            yaxis_title='CAC ($)',
-            hovermode='x unified',
-            height=500
-        )
-        
-        # Save visualization
-        fig_trend.write_html("cac_trend_analysis.html")
-        print("\n✓ Trend analysis chart saved as 'cac_trend_analysis.html'")
-        
-        # 2. Gap Analysis Chart
-        fig_gap = go.Figure()
-        
-        fig_gap.add_trace(go.Bar(
-            x=df['Quarter'],
-            y=df['Gap_to_Target'],
-            name='Gap to Target ($)',
-            marker_color='red',
-            text=[f'${gap:.2f}' for gap in df['Gap_to_Target']],
-            textposition='auto'
-        ))
-        
-        fig_gap.update_layout(
-            title='CAC Gap Analysis: Difference from Industry Target ($150)',
-            xaxis_title='Quarter',
-            yaxis_title='Gap to Target ($)',
-            height=400
-        )
-        
-        fig_gap.write_html("cac_gap_analysis.html")
-        print("✓ Gap analysis chart saved as 'cac_gap_analysis.html'")
-        
-        # 3. Performance Dashboard
-        fig_dashboard = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('Quarterly CAC Trend', 'Gap to Target', 'Percentage Above Target', 'Key Metrics'),
-            specs=[[{"secondary_y": False}, {"secondary_y": False}],
-                   [{"secondary_y": False}, {"type": "table"}]]
-        )
-        
-        # Add traces to dashboard
-        fig_dashboard.add_trace(
-            go.Scatter(x=df['Quarter'], y=df['CAC'], mode='lines+markers', name='CAC', line=dict(color='red')),
-            row=1, col=1
-        )
-        fig_dashboard.add_trace(
-            go.Scatter(x=df['Quarter'], y=[self.target_cac]*len(df), mode='lines', name='Target', line=dict(color='green', dash='dash')),
-            row=1, col=1
-        )
-        
-        fig_dashboard.add_trace(
-            go.Bar(x=df['Quarter'], y=df['Gap_to_Target'], name='Gap', marker_color='red'),
-            row=1, col=2
-        )
-        
-        fig_dashboard.add_trace(
-            go.Bar(x=df['Quarter'], y=df['Percentage_Above_Target'], name='% Above Target', marker_color='orange'),
-            row=2, col=1
-        )
-        
-        # Add metrics table
-        fig_dashboard.add_trace(
-            go.Table(
-                header=dict(values=['Metric', 'Value'], fill_color='lightblue'),
-                cells=dict(values=[
-                    ['Average CAC', 'Target CAC', 'Gap', '% Above Target', 'Q4 CAC'],
-                    [f'${self.average_cac:.2f}', f'${self.target_cac}', f'${self.average_cac - self.target_cac:.2f}', 
-                     f'{((self.average_cac - self.target_cac) / self.target_cac * 100):.1f}%', f'${df["CAC"].iloc[-1]}']
-                ])
-            ),
-            row=2, col=2
-        )
-        
-        fig_dashboard.update_layout(height=800, showlegend=False, title_text="CAC Performance Dashboard - 2024")
-        fig_dashboard.write_html("cac_performance_dashboard.html")
-        print("✓ Performance dashboard saved as 'cac_performance_dashboard.html'")
+    def bootstrap_stats(self, stats, n_resamples=10_000, confidence=0.95, seed=0, workers=None):
+        """Bootstrap confidence intervals for every statistic (see ``cac_bootstrap.bootstrap_intervals``)"""
+        from cac_bootstrap import bootstrap_intervals
+        from cac_reporting import print_intervals
+
+        intervals = bootstrap_intervals(self.quarterly_data['CAC'], self.target_cac,
+                                        self.quarterly_data.get('Spend'), self.quarterly_data.get('New_Customers'),
+                                        n_resamples=n_resamples, confidence=confidence, seed=seed, workers=workers)
+        print_intervals(stats, intervals, confidence)
+        return intervals
     
-    def generate_insights_and_recommendations(self):
-        """Generate business insights and strategic recommendations"""
-        
+    def optimize_budget(self, budget=None, lower=None, upper=None):
+        """Channel spend allocations that minimize blended CAC and that meet the target (see ``cac_optimizer``)
+
+        Response curves are fitted on the per-channel period totals, so the
+        analysis must be loaded with a channel column. ``budget`` is total
+        spend per period (default: the current average); ``lower``/``upper``
+        map channels to spend bounds. Returns the two allocations.
+        """
+        from cac_optimizer import BudgetOptimizer, fit_response_curves
+        from cac_reporting import print_allocation
+
+        if not self.channel_column:
+            raise ValueError("Budget optimization needs per-channel history; load the analysis with a channel column")
+        curves = fit_response_curves(self.period_frame, channel_column=self.channel_column)
+        optimizer = BudgetOptimizer(curves, lower, upper)
+        budget = curves['Average_Spend'].sum() if budget is None else budget
+        current = curves['Average_Spend'].to_numpy()
+        current_cac = current.sum() / optimizer.customers(current).sum()
+
         print("\n" + "="*60)
-        print("BUSINESS INSIGHTS & RECOMMENDATIONS")
+        print("BUDGET REALLOCATION")
         print("="*60)
-        
-        print("\nKEY FINDINGS:")
-        findings = [
-            f"Average CAC of ${self.average_cac:.2f} is ${self.average_cac - self.target_cac:.2f} above industry target",
-            f"Consistent upward trend from Q1 (${self.quarterly_data['CAC'][0]}) to Q4 (${self.quarterly_data['CAC'][-1]})",
-            f"Company is paying {((self.average_cac - self.target_cac) / self.target_cac * 100):.1f}% premium over industry benchmark",
-            "Rising marketing costs indicate urgent need for channel optimization"
-        ]
-        
-        for i, finding in enumerate(findings, 1):
-            print(f"{i}. {finding}")
-        
-        print("\nSTRATEGIC RECOMMENDATIONS:")
-        recommendations = [
-            "Implement data-driven attribution modeling to identify highest-ROI marketing channels",
-            "Optimize digital marketing spend allocation based on channel-specific CAC performance", 
-            "Deploy marketing automation and personalization to improve conversion rates",
-            "Conduct comprehensive audit of underperforming marketing channels",
-            "Establish real-time CAC monitoring dashboard with automated alerts",
-            "Develop customer segmentation strategy for high-value, low-cost acquisition",
-            "Launch A/B testing framework for continuous campaign optimization",
-            "Negotiate better rates with marketing partners based on volume commitments"
-        ]
-        
-        for i, rec in enumerate(recommendations, 1):
-            print(f"{i}. {rec}")
-        
-        print("\nSOLUTION FOCUS: OPTIMIZE DIGITAL MARKETING CHANNELS")
-        print("- Priority: Reallocate budget to highest-performing channels")
-        print("- Target: Reduce CAC to $150 industry benchmark")
-        print(f"- Potential Savings: ${self.average_cac - self.target_cac:.2f} per customer acquisition")
+        print(f"Current allocation (modeled): ${current.sum():,.2f} per period at blended CAC ${current_cac:.2f}")
+        best = optimizer.solve(budget)
+        print_allocation(best, f"Minimum blended CAC for ${budget:,.2f} per period")
+        target = optimizer.solve_for_target(self.target_cac)
+        print_allocation(target, f"Largest budget meeting the ${self.target_cac:g} target")
+        return best, target
+    
+    def forecast_cac(self, horizon=4, method="auto", season_length=None):
+        """Forecast CAC for the next ``horizon`` periods (see ``cac_forecast.forecast_series``)"""
+        from cac_forecast import forecast_series
 
-def main():
-    """Main execution function"""
-    print("Starting Financial Services CAC Analysis...")
-    print("Analysis Contact: 22f3002203@ds.study.iitm.ac.in")
+        forecast = forecast_series(self.quarterly_data['CAC'], self.quarterly_data['Quarter'],
+                                   horizon, method, season_length)
+        print("\n" + "="*60)
+        print(f"CAC FORECAST ({forecast['method']}, {forecast['level'] * 100:g}% prediction interval)")
+        print("="*60)
+        for label, mean, lower, upper in zip(forecast['labels'], forecast['mean'], forecast['lower'], forecast['upper']):
+            print(f"{label}: ${mean:.2f} (${lower:.2f} - ${upper:.2f})")
+        return forecast
+    
+    def simulate_scenarios(self, horizon=4, n_paths=1_000_000, spend_shift=0.0, season_length=None, seed=0):
+        """Monte Carlo CAC paths under a spend shift (see ``cac_simulation.simulate_series``)
+
+        ``spend_shift`` is a fraction applied to all spend or a mapping of
+        channel to fraction; per-channel shifts use the response curves
+        fitted on the channel history, so they need a channel column.
+        Returns the simulation dict; its ``factor`` is the scenario's CAC
+        multiplier.
+        """
+        from cac_reporting import print_simulation
+        from cac_simulation import scenario_factor, simulate_series
+
+        curves = None
+        if self.channel_column:
+            from cac_optimizer import fit_response_curves
+
+            curves = fit_response_curves(self.period_frame, channel_column=self.channel_column)
+        factor = scenario_factor(spend_shift, curves)
+        simulation = simulate_series(self.quarterly_data['CAC'], self.quarterly_data['Quarter'], self.target_cac,
+                                     horizon, n_paths, factor, season_length, seed)
+        print("\n" + "="*60)
+        print("CAC SCENARIO SIMULATION")
+        print("="*60)
+        print_simulation(simulation, self.target_cac)
+        return simulation
+    
+    def perform_segmented_analysis(self, frame, by=None, targets=None, top=10):
+        """Execute the CAC analysis for every segment of a long segment/period frame
+
+        ``targets`` overrides ``self.target_cac`` per segment (see
+        ``cac_segments.segment_targets``). Returns one row per segment; the
+        rule findings for every segment are kept in ``self.segment_findings``.
+        """
+        from cac_rules import evaluate_rules
+        from cac_segments import DEFAULT_SEGMENT_COLUMNS, segment_summary
+
+        segment_columns = list(by or DEFAULT_SEGMENT_COLUMNS)
+
+        print("\n" + "="*60)
+        print("SEGMENTED CAC ANALYSIS")
+        print("="*60)
+
+        summary = segment_summary(frame, by=by, target_cac=self.target_cac, targets=targets)
+        above = int((summary['Gap_to_Target'] > 0).sum())
+        print(f"\nSegments analyzed: {len(summary)}")
+        print(f"Segments above target: {above} ({above / max(len(summary), 1) * 100:.1f}%)")
+        print(f"\nTop {top} segments by gap to target:")
+        print(summary.nlargest(top, 'Gap_to_Target').to_string(index=False))
+
+        findings = evaluate_rules(frame, by=by, target_cac=self.target_cac, targets=targets)
+        self.segment_findings = findings
+        counts = findings['Severity'].value_counts(sort=False)
+        print("\nRule findings by severity: " + ", ".join(f"{name} {count}" for name, count in counts.items()))
+        if len(findings):
+            print(f"\nTop {top} findings:")
+            print(findings.head(top)[segment_columns + ['Severity', 'Message']].to_string(index=False))
+
+        return summary
     
+    def create_visualizations(self, df, output_dir=".", plotlyjs="inline", cache=None,
+                              max_workers=None, executor="process", forecast=None, simulation=None,
+                              **figure_options):
+        """Generate all required visualizations
+
+        See ``cac_reporting.write_reports`` for the ``plotlyjs`` modes and the
+        concurrent rendering options, and ``cac_engine.build_figures`` for the
+        downsampling, forecast and simulation ``figure_options``. Pass the
+        ``forecast`` and ``simulation`` dicts already returned by
+        ``forecast_cac`` and ``simulate_scenarios`` so they are drawn rather
+        than computed again; the options still identify them in the cache
+        key. With a ``cac_cache.ReportCache``, reports whose data, target and
+        options are unchanged since a previous run are restored before any
+        figure is built, so a full cache hit builds nothing.
+        """
+        from cac_engine import FIGURE_NAMES, build_figures
+        from cac_reporting import restore_reports, write_reports
+
+        cache_key = None
+        if cache is not None:
+            from cac_cache import report_key
+            from plotly import __version__ as plotly_version
+
+            cache_key = report_key(self.quarterly_data, self.target_cac, plotlyjs=plotlyjs, plotly=plotly_version,
+                                   **figure_options)
+
+        # Restore unchanged reports first so only the missing figures are built at all
+        paths = restore_reports(FIGURE_NAMES, output_dir=output_dir, plotlyjs=plotlyjs, cache=cache,
+                                cache_key=cache_key)
+        missing = [name for name in FIGURE_NAMES if name not in paths]
+        if missing:
+            with stage("figure_build"):
+                figures = build_figures(df, self.target_cac, self.average_cac, forecast=forecast,
+                                        simulation=simulation, names=missing, **figure_options)
+            paths.update(write_reports(figures, output_dir=output_dir, plotlyjs=plotlyjs, cache=cache,
+                                       cache_key=cache_key, max_workers=max_workers, executor=executor,
+                                       restore=False))
+        print()
+        if plotlyjs == "shared":
+            print(f"✓ Shared plotly.js bundle saved as '{write_plotlyjs_asset(output_dir)}'")
+        print(f"✓ Trend analysis chart saved as '{paths['trend']}'")
+        print(f"✓ Gap analysis chart saved as '{paths['gap']}'")
+        print(f"✓ Performance dashboard saved as '{paths['dashboard']}'")
+        if cache is not None:
+            summary = cache.summary()
+            print(f"✓ Report cache: {summary['hits']} hits, {summary['misses']} misses, "
+                  f"{summary['unchanged']} reports already up to date")
+    
+    def generate_insights_and_recommendations(self):
+        """Generate business insights and strategic recommendations"""
+        from cac_engine import generate_insights
+        from cac_reporting import print_insights
+
+        print_insights(generate_insights(self.quarterly_data, self.average_cac, self.target_cac))
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Financial Services CAC Analysis")
+    parser.add_argument("--data", help="CSV, Parquet or JSON Lines ledger with date, spend and new_customers columns")
+    parser.add_argument("--store", help="Partitioned history store directory (see cac_store.py) to read instead of --data")
+    parser.add_argument("--start", help="First date (YYYY-MM-DD) to read from --store")
+    parser.add_argument("--end", help="Last date (YYYY-MM-DD) to read from --store")
+    parser.add_argument("--channel", action="append", help="Channel to read from --store (repeatable)")
+    parser.add_argument("--freq", choices=["Q", "M", "Y", "D"], default="Q", help="Period the ledger is aggregated into")
+    parser.add_argument("--rollup", nargs="+", choices=["Q", "Y"], default=[],
+                        help="Also report ratio-of-sums CAC rolled up to these periods (with --data or --store)")
+    parser.add_argument("--target", type=float, default=150, help="Target CAC")
+    parser.add_argument("--output-dir", default=".", help="Directory the HTML reports are written to")
+    parser.add_argument(
+        "--plotlyjs",
+        choices=["inline", "shared"],
+        default="inline",
+        help="Embed plotly.js in every report, or write one shared content-hashed bundle next to them",
+    )
+    parser.add_argument("--render-workers", type=int, default=None,
+                        help="Maximum reports rendered concurrently (default: one per CPU; 1 renders serially)")
+    parser.add_argument("--render-executor", choices=["process", "thread"], default="process",
+                        help="Pool used for concurrent report rendering")
+    parser.add_argument("--max-points", type=int, default=2000,
+                        help="Point budget per chart trace; longer series are downsampled")
+    parser.add_argument("--downsample", choices=["lttb", "minmax", "none"], default="lttb",
+                        help="Downsampling method for series over --max-points")
+    parser.add_argument("--webgl-threshold", type=int, default=5000,
+                        help="Draw line charts with WebGL above this many points")
+    parser.add_argument("--channel-column",
+                        help="Ledger column holding the channel; keeps per-channel totals (--data/--store)")
+    parser.add_argument("--optimize-budget", action="store_true",
+                        help="Reallocate channel spend to minimize blended CAC and to meet --target")
+    parser.add_argument("--budget", type=float, help="Total spend per period to allocate (default: current average)")
+    parser.add_argument("--channel-bounds", action="append", default=[], metavar="CHANNEL=LOW:HIGH",
+                        help="Per-channel spend bounds per period for --optimize-budget (repeatable)")
+    parser.add_argument("--touchpoints", help="Touchpoint paths (path_id, channel, converted) for Markov attribution")
+    parser.add_argument("--channel-spend", help="File with channel and spend columns for attributed channel CAC")
+    parser.add_argument("--attribution", choices=["markov", "shapley"], default="markov",
+                        help="Attribution model for --touchpoints")
+    parser.add_argument("--customers", help="Customers (customer_id, acquired_at) for cohort LTV and payback")
+    parser.add_argument("--revenue", action="append", default=[],
+                        help="Revenue events (customer_id, date, revenue) for cohort LTV (repeatable)")
+    parser.add_argument("--cohort-state", help="Cohort state file (.npz) updated with each run's customers and revenue")
+    parser.add_argument("--gross-margin", type=float, default=1.0, help="Gross margin applied to revenue for LTV")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="RESAMPLES",
+                        help="Report bootstrap confidence intervals for every statistic from this many resamples")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Bootstrap confidence level")
+    parser.add_argument("--bootstrap-workers", type=int, default=None,
+                        help="Processes for bootstrap resampling (default: one per CPU; 1 runs in-process)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for bootstrap and simulation sampling")
+    parser.add_argument("--forecast", type=int, default=0, metavar="PERIODS",
+                        help="Forecast CAC this many periods ahead and overlay the band on the trend chart")
+    parser.add_argument("--forecast-method", choices=["auto", "holt", "holt_winters", "linear"], default="auto",
+                        help="Forecast model (auto: Holt-Winters with two full seasons of history, else Holt)")
+    parser.add_argument("--simulate", type=int, default=0, metavar="PATHS",
+                        help="Simulate this many CAC paths and add the range to the dashboard (e.g. 1000000)")
+    parser.add_argument("--simulate-horizon", type=int, default=4, help="Periods ahead to simulate")
+    parser.add_argument("--spend-shift", type=float, default=0.0, metavar="PERCENT",
+                        help="Scenario spend change in percent applied to every channel (e.g. -10)")
+    parser.add_argument("--channel-shift", action="append", default=[], metavar="CHANNEL=PERCENT",
+                        help="Scenario spend change for one channel (repeatable; needs --channel-column)")
+    parser.add_argument("--cache-dir", help="Reuse reports rendered for unchanged inputs from this cache directory")
+    parser.add_argument("--cache-max-entries", type=int, default=1000, help="Report cache entry cap (LRU eviction)")
+    parser.add_argument("--cache-max-mb", type=float, default=512, help="Report cache size cap in MB (LRU eviction)")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cac_profile_trace.json",
+        metavar="TRACE_PATH",
+        help="Print per-stage timings and write a Chrome-trace/speedscope JSON (default: cac_profile_trace.json)",
+    )
+    parser.add_argument("--profile-allocations", action="store_true",
+                        help="Also trace Python allocations per stage (slower)")
+    parser.add_argument(
+        "--no-charts",
+        action="store_true",
+        help="Only compute the statistics and insights; skip the HTML reports (and the plotly import)",
+    )
+    args = parser.parse_args(argv)
+    from cac_forecast import SEASON_LENGTHS
+
+    if args.forecast_method == "holt_winters" and args.freq not in SEASON_LENGTHS:
+        parser.error(f"--forecast-method holt_winters needs a seasonal --freq ({', '.join(sorted(SEASON_LENGTHS))})")
+    return args
+
+
+def run_pipeline(args):
+    """Run the analysis end to end for parsed command line options"""
     # Initialize analyzer
-    analyzer = CACAnalysis()
+    with stage("load", category="pipeline"):
+        if args.store:
+            analyzer = CACAnalysis.from_store(args.store, target_cac=args.target, freq=args.freq,
+                                              start=args.start, end=args.end, channels=args.channel,
+                                              by_channel=bool(args.channel_column))
+        elif args.data:
+            analyzer = CACAnalysis.from_file(args.data, target_cac=args.target, freq=args.freq,
+                                             channel_column=args.channel_column)
+        else:
+            analyzer = CACAnalysis(target_cac=args.target)
+    
+    if args.touchpoints:
+        from cac_attribution import read_channel_spend
+
+        with stage("attribution", category="pipeline"):
+            spend = read_channel_spend(args.channel_spend) if args.channel_spend else None
+            analyzer.attribute_channels(args.touchpoints, channel_spend=spend, method=args.attribution)
+    
+    if args.customers or args.revenue or args.cohort_state:
+        with stage("cohorts", category="pipeline"):
+            analyzer.load_cohorts(args.customers, args.revenue, freq=args.freq, gross_margin=args.gross_margin,
+                                  state=args.cohort_state)
     
     # Perform comprehensive analysis
-    df, stats = analyzer.perform_analysis()
+    with stage("perform_analysis", category="pipeline"):
+        df, stats = analyzer.perform_analysis()
+    
+    if args.bootstrap:
+        with stage("bootstrap", category="pipeline"):
+            analyzer.bootstrap_stats(stats, n_resamples=args.bootstrap, confidence=args.confidence,
+                                     seed=args.seed, workers=args.bootstrap_workers)
+    
+    for freq in args.rollup:
+        print(f"\nCAC Rollup ({freq}, ratio of sums):")
+        print(analyzer.rollup(freq=freq).to_string(index=False))
+    
+    if args.optimize_budget:
+        from cac_optimizer import parse_bounds
+
+        with stage("optimize_budget", category="pipeline"):
+            analyzer.optimize_budget(args.budget, *parse_bounds(args.channel_bounds))
+    
+    from cac_forecast import SEASON_LENGTHS
+
+    figure_options = {}
+    forecast = simulation = None
+    season_length = SEASON_LENGTHS.get(args.freq)
+    if args.forecast:
+        figure_options.update(forecast_horizon=args.forecast, forecast_method=args.forecast_method,
+                              season_length=season_length)
+        with stage("forecast", category="pipeline"):
+            try:
+                forecast = analyzer.forecast_cac(args.forecast, args.forecast_method, season_length)
+            except ValueError as exc:
+                raise SystemExit(f"Cannot forecast: {exc}")
+    
+    if args.simulate:
+        from cac_simulation import parse_shifts
+
+        spend_shift = parse_shifts(args.channel_shift) or args.spend_shift / 100
+        with stage("simulate", category="pipeline"):
+            simulation = analyzer.simulate_scenarios(args.simulate_horizon, args.simulate, spend_shift,
+                                                     season_length, args.seed)
+        figure_options.update(simulate_paths=args.simulate, simulate_horizon=args.simulate_horizon,
+                              spend_factor=simulation['factor'], season_length=season_length, seed=args.seed)
     
     # Generate visualizations
-    analyzer.create_visualizations(df)
+    if not args.no_charts:
+        cache = None
+        if args.cache_dir:
+            from cac_cache import ReportCache
+
+            cache = ReportCache(args.cache_dir, args.cache_max_entries, int(args.cache_max_mb * 1024 * 1024))
+        with stage("create_visualizations", category="pipeline"):
+            analyzer.create_visualizations(df, output_dir=args.output_dir, plotlyjs=args.plotlyjs, cache=cache,
+                                           max_workers=args.render_workers, executor=args.render_executor,
+                                           max_points=args.max_points, webgl_threshold=args.webgl_threshold,
+                                           downsample=None if args.downsample == "none" else args.downsample,
+                                           forecast=forecast, simulation=simulation, **figure_options)
     
     # Generate insights and recommendations
-    analyzer.generate_insights_and_recommendations()
+    with stage("insights", category="pipeline"):
+        analyzer.generate_insights_and_recommendations()
+    return analyzer
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    print("Starting Financial Services CAC Analysis...")
+    print("Analysis Contact: 22f3002203@ds.study.iitm.ac.in")
+    
+    if args.profile:
+        from cac_profile import Profiler, profiling
+
+        profiler = Profiler(trace_allocations=args.profile_allocations)
+        with profiling(profiler):
+            analyzer = run_pipeline(args)
+    else:
+        analyzer = run_pipeline(args)
     
     print("\n" + "="*60)
     print("ANALYSIS COMPLETE")
     print("="*60)
-    print("Generated Files:")
-    print("- cac_trend_analysis.html")
-    print("- cac_gap_analysis.html") 
-    print("- cac_performance_dashboard.html")
+    if not args.no_charts:
+        print("Generated Files:")
+        for name in REPORT_FILES:
+            print(f"- {os.path.join(args.output_dir, name)}")
+    if args.profile:
+        print("\nPipeline Profile:")
+        print(profiler.summary_table())
+        print(f"Trace saved as '{profiler.write_trace(args.profile)}' (open in chrome://tracing or speedscope)")
     print("\nVerification Email: 22f3002203@ds.study.iitm.ac.in")
     print(f"Average CAC (Required): ${analyzer.average_cac:.2f}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,292 @@
+"""
+CAC Markov Attribution
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Markov-chain multi-touch attribution and attributed channel CAC
+
+Touchpoint exports (one row per touch, sorted by path and time within each
+path) are streamed in chunks. Each chunk is reduced to transition counts
+between integer-encoded states with one ``np.bincount``; the only state kept
+between chunks is the count matrix and the last, possibly unfinished, path.
+Memory therefore depends on the number of channels, not on the number of
+touchpoints.
+
+Removal effects come from the absorbing-chain fundamental matrix: removing a
+channel loses exactly the conversions that pass through it, i.e. the chance
+of reaching the channel times its own conversion probability, so every
+channel's effect is read off one solve instead of one solve per channel.
+
+Usage:
+    python cac_attribution.py touchpoints.parquet --channel-spend channel_spend.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from cac_loader import DEFAULT_CHUNKSIZE, detect_format
+
+DEFAULT_TOUCHPOINT_COLUMNS = {
+    "path": "path_id",
+    "channel": "channel",
+    "converted": "converted",
+}
+
+# Fixed state codes; channel ``k`` (0-based) is state ``k + CHANNEL_OFFSET``
+START, CONVERSION, NULL = 0, 1, 2
+CHANNEL_OFFSET = 3
+
+
+def iter_touchpoint_chunks(path, file_format=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield the path, channel and converted columns of a touchpoint export one chunk at a time"""
+    import pandas as pd
+
+    file_format = file_format or detect_format(path)
+    columns = {**DEFAULT_TOUCHPOINT_COLUMNS, **(columns or {})}
+    usecols = [columns["path"], columns["channel"], columns["converted"]]
+
+    if file_format == "csv":
+        yield from pd.read_csv(path, usecols=usecols, dtype={columns["converted"]: "int8"}, chunksize=chunksize)
+    elif file_format == "jsonl":
+        with pd.read_json(path, lines=True, dtype=False, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[usecols]
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet touchpoints requires pyarrow: pip install pyarrow") from exc
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=usecols):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported touchpoint format: {file_format!r}")
+
+
+class ChannelEncoder:
+    """Map channels to dense 0-based indices that stay stable across chunks
+
+    Integer channel codes are used as-is (so they should be dense and small);
+    labels are numbered in order of first appearance.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self._integer_channels = None
+
+    def encode(self, channels):
+        """Indices for one chunk of channels"""
+        channels = np.asarray(channels)
+        if self._integer_channels is None:
+            self._integer_channels = np.issubdtype(channels.dtype, np.integer)
+        if self._integer_channels:
+            if len(channels) and channels.min() < 0:
+                raise ValueError("Integer channel codes must be non-negative")
+            for code in np.unique(channels):
+                self.codes.setdefault(int(code), int(code))
+            return channels.astype(np.int64)
+
+        import pandas as pd
+
+        codes, uniques = pd.factorize(channels)
+        lookup = np.array([self.codes.setdefault(label, len(self.codes)) for label in uniques], dtype=np.int64)
+        return lookup[codes]
+
+    def names(self):
+        """Channel name for every index"""
+        return {code: name for name, code in self.codes.items()}
+
+
+def path_boundaries(path_ids, carry_path):
+    """Start flags for each row's path and whether the first row continues ``carry_path``"""
+    new_path = np.empty(len(path_ids), dtype=bool)
+    new_path[1:] = path_ids[1:] != path_ids[:-1]
+    continues = carry_path is not None and carry_path == path_ids[0]
+    new_path[0] = not continues
+    return new_path, continues
+
+
+class MarkovAttribution:
+    """First-order Markov attribution model built incrementally from touchpoint chunks
+
+    Channels are encoded with ``ChannelEncoder``. Chunks must keep each
+    path's rows together and in time order; a path may span chunks.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros((CHANNEL_OFFSET, CHANNEL_OFFSET), dtype=np.int64)
+        self.encoder = ChannelEncoder()
+        self.touchpoints = 0
+        self._carry = None
+
+    @classmethod
+    def from_file(cls, path, file_format=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Fit the model from a CSV, Parquet or JSON Lines touchpoint export"""
+        columns = {**DEFAULT_TOUCHPOINT_COLUMNS, **(columns or {})}
+        model = cls()
+        for chunk in iter_touchpoint_chunks(path, file_format, columns, chunksize):
+            model.update(chunk[columns["path"]].to_numpy(), chunk[columns["channel"]].to_numpy(),
+                         chunk[columns["converted"]].to_numpy())
+        return model.finish()
+
+    def _add(self, sources, targets):
+        size = int(max(sources.max(initial=0), targets.max(initial=0))) + 1
+        if size > len(self.counts):
+            grown = np.zeros((size, size), dtype=np.int64)
+            grown[:len(self.counts), :len(self.counts)] = self.counts
+            self.counts = grown
+        size = len(self.counts)
+        self.counts += np.bincount(sources * size + targets, minlength=size * size).reshape(size, size)
+
+    def update(self, path_ids, channels, converted):
+        """Fold one chunk of touchpoints into the transition counts"""
+        path_ids = np.asarray(path_ids)
+        if not len(path_ids):
+            return self
+        states = self.encoder.encode(channels) + CHANNEL_OFFSET
+        converted = np.asarray(converted).astype(bool)
+        self.touchpoints += len(path_ids)
+
+        new_path, continues = path_boundaries(path_ids, self._carry[0] if self._carry else None)
+        if self._carry is not None and not continues:
+            self._close([self._carry[1]], [self._carry[2]])
+
+        # Every touch is entered from the previous touch, or from START when it opens a path
+        previous = np.empty_like(states)
+        previous[1:] = states[:-1]
+        previous[0] = self._carry[1] if continues else START
+        self._add(np.where(new_path, START, previous), states)
+
+        # Paths that end inside this chunk move to CONVERSION or NULL
+        starts = np.flatnonzero(new_path)
+        if not continues:
+            segment_starts = starts
+        else:
+            segment_starts = np.concatenate(([0], starts))
+        path_converted = np.logical_or.reduceat(converted, segment_starts)
+        if continues:
+            path_converted[0] |= self._carry[2]
+        ends = np.append(segment_starts[1:], len(states)) - 1
+        self._close(states[ends[:-1]], path_converted[:-1])
+        self._carry = (path_ids[-1], int(states[-1]), bool(path_converted[-1]))
+        return self
+
+    def _close(self, last_states, path_converted):
+        last_states = np.asarray(last_states, dtype=np.int64)
+        self._add(last_states, np.where(np.asarray(path_converted, dtype=bool), CONVERSION, NULL))
+
+    def finish(self):
+        """Close the last open path; call once after the final chunk"""
+        if self._carry is not None:
+            self._close([self._carry[1]], [self._carry[2]])
+            self._carry = None
+        return self
+
+    @property
+    def conversions(self):
+        return int(self.counts[:, CONVERSION].sum())
+
+    def transition_matrix(self):
+        """Row-normalized transition probabilities (states without exits go to NULL)"""
+        counts = self.counts.astype("float64")
+        totals = counts.sum(axis=1)
+        counts[totals == 0, NULL] = 1
+        return counts / counts.sum(axis=1, keepdims=True)
+
+    def removal_effects(self):
+        """Removal effect, credit share and attributed conversions per channel
+
+        Returns a frame with ``Channel``, ``Touchpoints``,
+        ``Removal_Effect`` (share of conversions lost without the channel),
+        ``Credit_Share`` (normalized removal effects) and
+        ``Attributed_Conversions``.
+        """
+        import pandas as pd
+
+        probabilities = self.transition_matrix()
+        transient = np.r_[START, np.arange(CHANNEL_OFFSET, len(probabilities))]
+        q = probabilities[np.ix_(transient, transient)]
+        fundamental = np.linalg.inv(np.eye(len(transient)) - q)
+        absorbed = fundamental @ probabilities[transient, CONVERSION]
+        conversion_probability = absorbed[0]
+
+        # P(reach channel from START) x P(convert from the channel) = conversion probability lost on removal
+        reach = fundamental[0, 1:] / np.diag(fundamental)[1:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            removal_effect = reach * absorbed[1:] / conversion_probability
+
+        names = self.encoder.names()
+        touches = self.counts[:, CHANNEL_OFFSET:].sum(axis=0)
+        seen = np.flatnonzero(touches)
+        effects = np.nan_to_num(removal_effect[seen])
+        share = effects / effects.sum() if effects.sum() else effects
+        return pd.DataFrame({
+            "Channel": [names[code] for code in seen],
+            "Touchpoints": touches[seen],
+            "Removal_Effect": effects,
+            "Credit_Share": share,
+            "Attributed_Conversions": share * self.conversions,
+        })
+
+
+def attributed_cac(credit, channel_spend=None, average_cac=None):
+    """Attributed channel CAC: channel spend over attributed conversions
+
+    ``channel_spend`` maps channel to spend (dict or Series); channels are
+    matched on their string form so integer codes line up with CSV labels.
+    With ``average_cac`` each channel also gets its gap to the blended CAC.
+    """
+    import pandas as pd
+
+    frame = credit.copy()
+    if channel_spend is None:
+        return frame
+    spend = pd.Series(channel_spend, dtype="float64")
+    spend.index = spend.index.map(str)
+    # Channels missing from the spend file get no CAC rather than a free one
+    frame["Spend"] = frame["Channel"].map(str).map(spend).to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        frame["Attributed_CAC"] = np.where(frame["Attributed_Conversions"] > 0,
+                                           frame["Spend"] / frame["Attributed_Conversions"], np.nan)
+    if average_cac is not None:
+        frame["Gap_to_Average"] = frame["Attributed_CAC"] - average_cac
+    return frame
+
+
+def read_channel_spend(path):
+    """Channel spend totals from a CSV/Parquet/JSON Lines file with ``channel`` and ``spend`` columns"""
+    import pandas as pd
+
+    file_format = detect_format(path)
+    if file_format == "csv":
+        frame = pd.read_csv(path, dtype={"channel": "string"})
+    elif file_format == "parquet":
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_json(path, lines=True, dtype=False)
+    return frame.groupby(frame["channel"].astype(str))["spend"].sum()
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Markov-chain channel attribution from touchpoint paths")
+    parser.add_argument("touchpoints", help="CSV, Parquet or JSON Lines touchpoints sorted by path and time")
+    parser.add_argument("--channel-spend", help="File with channel and spend columns for attributed CAC")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Touchpoints per chunk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    if not os.path.exists(args.touchpoints):
+        raise SystemExit(f"No such touchpoint file: {args.touchpoints}")
+    model = MarkovAttribution.from_file(args.touchpoints, chunksize=args.chunksize)
+    spend = read_channel_spend(args.channel_spend) if args.channel_spend else None
+    print(f"Touchpoints: {model.touchpoints:,}  Conversions: {model.conversions:,}")
+    print(attributed_cac(model.removal_effects(), spend).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
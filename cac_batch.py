@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+CAC Batch Runner
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Analyze many business units in parallel from a dataset manifest
+
+The manifest lists one business unit per row (CSV, JSON Lines or a JSON
+array) with a ``unit`` name, the ``path`` of its ledger and optionally a
+``target_cac`` and period ``freq``. Units are fanned out over a process pool;
+each result is appended to a combined JSON Lines output as soon as it
+finishes. A unit that raises, runs past its timeout or takes its worker
+process down is recorded as failed without stopping the rest of the run.
+Timeouts use SIGALRM, which Python only acts on between bytecodes: a unit
+stuck inside one long C call (a huge parse, say) is stopped only once that
+call returns.
+
+Usage:
+    python cac_batch.py manifest.csv --workers 8 --timeout 120 --output results.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_TARGET_CAC = 150
+
+
+def read_manifest(path):
+    """Read the manifest into a list of task dicts"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8") as handle:
+        if extension == ".csv":
+            rows = list(csv.DictReader(handle))
+        elif extension in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in handle if line.strip()]
+        elif extension == ".json":
+            rows = json.load(handle)
+        else:
+            raise ValueError(f"Unsupported manifest format: {path!r}")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    tasks = []
+    for row in rows:
+        if not row.get("unit") or not row.get("path"):
+            raise ValueError(f"Manifest rows need 'unit' and 'path': {row!r}")
+        tasks.append({
+            "unit": str(row["unit"]),
+            "path": os.path.join(base_dir, row["path"]),
+            "target_cac": float(row.get("target_cac") or DEFAULT_TARGET_CAC),
+            "freq": row.get("freq") or "Q",
+        })
+    return tasks
+
+
+class _TaskTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise _TaskTimeout()
+
+
+def analyze_unit(task, timeout=None):
+    """Analyze one business unit; never raises, failures come back as error results
+
+    The timeout is enforced inside the worker with SIGALRM where the platform
+    provides it. The alarm's handler runs between bytecodes, so it cannot
+    interrupt a long-running C call; the unit times out when the call returns.
+    """
+    from cac_engine import analyze
+    from cac_loader import load_period_data
+
+    start = time.perf_counter()
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        data = load_period_data(task["path"], freq=task["freq"])
+        result = analyze(data, target_cac=task["target_cac"], include_figures=False)
+        return {
+            "unit": task["unit"],
+            "status": "ok",
+            "average_cac": result.average_cac,
+            "target_cac": result.target_cac,
+            "periods": len(result.frame),
+            "stats": dict(result.stats),
+            "elapsed": time.perf_counter() - start,
+        }
+    except _TaskTimeout:
+        return _failure(task, f"timed out after {timeout}s", start)
+    except Exception as exc:
+        return _failure(task, f"{type(exc).__name__}: {exc}", start)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _failure(task, error, start):
+    return {
+        "unit": task["unit"],
+        "status": "error",
+        "error": error,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def _run_shared(tasks, workers, timeout, record):
+    """Run tasks on one shared pool, keeping at most ``workers`` of them in flight
+
+    Returns ``(in_flight, remaining)``: when a worker process dies, the pool
+    fails every submitted future, so ``in_flight`` holds the units that were
+    running at that moment and ``remaining`` those never submitted. Both are
+    empty when the pool survives.
+    """
+    queue = deque(tasks)
+    running = {}
+    in_flight = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while queue or running:
+            while queue and len(running) < workers:
+                task = queue.popleft()
+                running[pool.submit(analyze_unit, task, timeout)] = task
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                try:
+                    record(future.result())
+                except BrokenProcessPool:
+                    in_flight.append(task)
+            if in_flight:
+                in_flight += running.values()
+                break
+    return in_flight, list(queue)
+
+
+def _run_isolated(tasks, timeout, record):
+    """Run each task in its own single-worker pool; returns ``(task, start)`` for units whose worker died"""
+    pools, futures = [], {}
+    try:
+        for task in tasks:
+            pool = ProcessPoolExecutor(max_workers=1)
+            pools.append(pool)
+            futures[pool.submit(analyze_unit, task, timeout)] = (task, time.perf_counter())
+        died = []
+        for future in as_completed(futures):
+            try:
+                record(future.result())
+            except BrokenProcessPool:
+                died.append(futures[future])
+        return died
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+
+def run_batch(tasks, output, workers=None, timeout=None, max_retries=1):
+    """Run every task over a process pool and stream results to ``output`` (JSON Lines)
+
+    At most ``workers`` units are in flight on the shared pool. When a worker
+    process dies the pool fails all of them, so only those units are rerun
+    isolated, one single-worker pool each, while the units not yet started
+    continue on a fresh shared pool. Only a unit whose own worker dies is
+    charged an attempt; it is retried up to ``max_retries`` times before
+    being recorded as failed. Returns a ``{'ok': n, 'error': n}`` summary.
+    """
+    summary = {"ok": 0, "error": 0}
+    workers = workers or os.cpu_count() or 1
+
+    with open(output, "w", encoding="utf-8") as sink:
+        def record(result):
+            summary[result["status"]] += 1
+            sink.write(json.dumps(result) + "\n")
+            sink.flush()
+
+        remaining = list(tasks)
+        attempts = {}
+        while remaining:
+            suspects, remaining = _run_shared(remaining, workers, timeout, record)
+            while suspects:
+                died = _run_isolated(suspects, timeout, record)
+                suspects = []
+                for task, start in died:
+                    attempts[task["unit"]] = attempts.get(task["unit"], 0) + 1
+                    if attempts[task["unit"]] > max_retries:
+                        record(_failure(task, "worker process died", start))
+                    else:
+                        suspects.append(task)
+    return summary
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Run the CAC analysis for every unit in a manifest")
+    parser.add_argument("manifest", help="CSV, JSON Lines or JSON manifest with unit, path[, target_cac, freq]")
+    parser.add_argument("--output", default="cac_batch_results.jsonl", help="Combined JSON Lines output")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--timeout", type=float, default=None, help="Per-unit timeout in seconds")
+    parser.add_argument("--retries", type=int, default=1, help="Retries for a unit whose own worker process died")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    tasks = read_manifest(args.manifest)
+    print(f"Analyzing {len(tasks)} units with {args.workers} workers...")
+    start = time.perf_counter()
+    summary = run_batch(tasks, args.output, workers=args.workers, timeout=args.timeout, max_retries=args.retries)
+    print(f"✓ {summary['ok']} units analyzed, {summary['error']} failed in {time.perf_counter() - start:.1f}s")
+    print(f"Results saved as '{args.output}'")
+    return 1 if summary["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+CAC Analysis Benchmarks
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Guard the performance of the CAC analysis pipeline
+
+The startup benchmark measures the cold-start time of the stats-only path
+(import the analysis module, build CACAnalysis, run perform_analysis) in fresh
+interpreters and fails when the median exceeds the budget, or when plotly was
+imported along the way.
+
+The pipeline benchmark generates seeded synthetic ledgers (quarterly,
+monthly, daily or event-level rows, from 4 rows up to 100M), times each
+pipeline stage (load, stats, figure build, HTML write, insights) and appends
+the timings to a JSON Lines history. ``compare`` checks the latest run
+against an earlier one and fails on regressions above a threshold.
+
+Usage:
+    python cac_benchmark.py startup --budget 1.5 --runs 5
+    python cac_benchmark.py run --granularity quarterly daily --sizes 4 100000 1000000
+    python cac_benchmark.py compare --threshold 0.10
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(REPO_DIR, "cac_benchmark_history.jsonl")
+
+# Synthetic ledgers spread rows over a fixed number of periods of each
+# granularity; the loader then aggregates them at the matching frequency.
+GRANULARITIES = {
+    'quarterly': {'unit': 'M', 'step': 3, 'periods': 12, 'freq': 'Q'},
+    'monthly': {'unit': 'M', 'step': 1, 'periods': 36, 'freq': 'M'},
+    'daily': {'unit': 'D', 'step': 1, 'periods': 1095, 'freq': 'D'},
+    'event': {'unit': 's', 'step': 1, 'periods': 1095 * 86400, 'freq': 'D'},
+}
+
+DEFAULT_SIZES = [4, 1_000, 100_000, 1_000_000]
+STAGES = ['load', 'stats', 'figure_build', 'html_write', 'insights']
+
+STARTUP_SNIPPET = """
+import contextlib, io, sys
+with contextlib.redirect_stdout(io.StringIO()):
+    import cac_analysis_github
+    cac_analysis_github.CACAnalysis().perform_analysis()
+print(int(any(name == "plotly" or name.startswith("plotly.") for name in sys.modules)))
+"""
+
+
+def measure_startup(runs=5):
+    """Time the stats-only path in fresh interpreters
+
+    Returns the per-run wall times in seconds and whether any run imported plotly.
+    """
+    timings = []
+    plotly_loaded = False
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(time.perf_counter() - start)
+        plotly_loaded = plotly_loaded or result.stdout.strip().endswith("1")
+    return timings, plotly_loaded
+
+
+def run_startup(args):
+    """Run the cold-start benchmark and compare it against the budget"""
+    timings, plotly_loaded = measure_startup(args.runs)
+    median = statistics.median(timings)
+    print(f"Stats-only cold start over {args.runs} runs:")
+    print(f"{'Median':.<30} {median:.3f}s")
+    print(f"{'Min':.<30} {min(timings):.3f}s")
+    print(f"{'Max':.<30} {max(timings):.3f}s")
+    print(f"{'Budget':.<30} {args.budget:.3f}s")
+
+    failed = False
+    if plotly_loaded:
+        print("✗ plotly was imported on the stats-only path")
+        failed = True
+    if median > args.budget:
+        print(f"✗ Cold start exceeds budget by {median - args.budget:.3f}s")
+        failed = True
+    if not failed:
+        print("✓ Cold start within budget")
+    return 1 if failed else 0
+
+
+def generate_ledger(path, granularity="quarterly", rows=4, seed=0, chunksize=1_000_000):
+    """Write a seeded synthetic spend/acquisition ledger of ``rows`` rows
+
+    Rows are generated and written one chunk at a time, so even 100M-row
+    ledgers never sit in memory. CAC drifts upwards over time with noise,
+    like the 2024 series. Parquet output requires pyarrow.
+    """
+    import numpy as np
+    import pandas as pd
+
+    spec = GRANULARITIES[granularity]
+    start = np.datetime64('2022-01-01', spec['unit'])
+    file_format = 'parquet' if path.endswith('.parquet') else 'csv'
+    seeds = np.random.SeedSequence(seed).spawn((rows + chunksize - 1) // chunksize)
+    writer = None
+
+    for chunk_index, chunk_seed in enumerate(seeds):
+        rng = np.random.default_rng(chunk_seed)
+        offsets = np.arange(chunk_index * chunksize, min(rows, (chunk_index + 1) * chunksize))
+        if granularity == 'event':
+            steps = rng.integers(0, spec['periods'], len(offsets))
+        else:
+            steps = offsets % spec['periods']
+        dates = start + (steps * spec['step']).astype(f"timedelta64[{spec['unit']}]")
+        progress = steps / spec['periods']
+        customers = rng.poisson(20 if granularity != 'event' else 0.8, len(offsets))
+        spend = customers * (220 + 15 * progress) * rng.lognormal(0, 0.05, len(offsets))
+        chunk = pd.DataFrame({
+            'date': np.datetime_as_string(dates, unit='D'),
+            'spend': spend.round(2),
+            'new_customers': customers.astype('int64'),
+        })
+
+        if file_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+
+    if writer is not None:
+        writer.close()
+    return path
+
+
+def _timed(function, repeat):
+    """Best wall time of ``repeat`` calls and the last return value"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def benchmark_pipeline(path, granularity, repeat=3, output_dir=None):
+    """Time every pipeline stage on one ledger; returns ``{stage: seconds}``"""
+    from cac_engine import build_figures, build_frame, compute_average_cac, compute_stats, generate_insights
+    from cac_loader import load_period_data
+    from cac_reporting import write_reports
+
+    target_cac = 150
+    timings = {}
+    timings['load'], data = _timed(lambda: load_period_data(path, freq=GRANULARITIES[granularity]['freq']), repeat)
+
+    def stats_stage():
+        average_cac = compute_average_cac(data)
+        frame = build_frame(data, target_cac)
+        return average_cac, frame, compute_stats(data['CAC'], average_cac, target_cac)
+
+    timings['stats'], (average_cac, frame, _) = _timed(stats_stage, repeat)
+    timings['figure_build'], figures = _timed(lambda: build_figures(frame, target_cac, average_cac), repeat)
+    report_dir = output_dir or tempfile.mkdtemp(prefix="cac_bench_")
+    try:
+        timings['html_write'], _ = _timed(
+            lambda: write_reports(figures, output_dir=report_dir, plotlyjs="shared", max_workers=1), repeat)
+    finally:
+        if output_dir is None:
+            shutil.rmtree(report_dir, ignore_errors=True)
+    timings['insights'], _ = _timed(lambda: generate_insights(data, average_cac, target_cac), repeat)
+    return timings
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_pipeline(args):
+    """Generate ledgers, time every stage and append the run to the history"""
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="cac_bench_data_")
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+    try:
+        for granularity in args.granularity:
+            for rows in args.sizes:
+                path = os.path.join(data_dir, f"ledger_{granularity}_{rows}_{args.seed}.{args.format}")
+                if not os.path.exists(path):
+                    generate_ledger(path, granularity, rows, seed=args.seed)
+                timings = benchmark_pipeline(path, granularity, repeat=args.repeat)
+                print(f"{granularity:>9} {rows:>11,} rows  " +
+                      "  ".join(f"{stage} {seconds * 1000:9.2f}ms" for stage, seconds in timings.items()))
+                results.extend(
+                    {"granularity": granularity, "rows": rows, "stage": stage, "seconds": seconds}
+                    for stage, seconds in timings.items()
+                )
+    finally:
+        if args.data_dir is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    record = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "format": args.format,
+        "seed": args.seed,
+        "results": results,
+    }
+    with open(args.history, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+    print(f"\n✓ Results appended to '{args.history}'")
+    return 0
+
+
+def load_history(path):
+    """All benchmark runs recorded in a history file, oldest first"""
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def compare_runs(baseline, current, threshold=0.10, min_seconds=0.001):
+    """Stage timings of ``current`` that are slower than ``baseline`` by more than ``threshold``
+
+    Stages faster than ``min_seconds`` in both runs are ignored as timer noise.
+    """
+    key = lambda result: (result["granularity"], result["rows"], result["stage"])
+    baseline_times = {key(result): result["seconds"] for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = baseline_times.get(key(result))
+        if before is None or max(before, result["seconds"]) < min_seconds:
+            continue
+        change = (result["seconds"] - before) / before if before else float("inf")
+        if change > threshold:
+            regressions.append({**result, "baseline_seconds": before, "change": change})
+    return regressions
+
+
+def run_compare(args):
+    """Compare the latest run against an earlier one and flag regressions"""
+    history = load_history(args.history)
+    if len(history) < 2:
+        print("Need at least two recorded runs to compare")
+        return 1
+    baseline, current = history[args.baseline], history[-1]
+    regressions = compare_runs(baseline, current, args.threshold)
+    print(f"Comparing {current.get('commit')} ({current['timestamp']}) "
+          f"against {baseline.get('commit')} ({baseline['timestamp']})")
+    for regression in regressions:
+        print(f"✗ {regression['granularity']} {regression['rows']:,} rows {regression['stage']}: "
+              f"{regression['baseline_seconds'] * 1000:.2f}ms -> {regression['seconds'] * 1000:.2f}ms "
+              f"(+{regression['change'] * 100:.1f}%)")
+    if not regressions:
+        print(f"✓ No stage regressed by more than {args.threshold * 100:.0f}%")
+    return 1 if regressions else 0
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="CAC analysis benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="Cold-start time of the stats-only path")
+    startup.add_argument("--budget", type=float, default=1.5, help="Maximum median cold start in seconds")
+    startup.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time")
+    startup.set_defaults(handler=run_startup)
+
+    run = commands.add_parser("run", help="Time each pipeline stage on synthetic ledgers")
+    run.add_argument("--granularity", nargs="+", choices=list(GRANULARITIES), default=["quarterly", "daily"])
+    run.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="Ledger row counts (up to 100000000)")
+    run.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Synthetic ledger file format")
+    run.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    run.add_argument("--repeat", type=int, default=3, help="Timed repetitions per stage (best is kept)")
+    run.add_argument("--data-dir", help="Keep and reuse generated ledgers in this directory")
+    run.add_argument("--history", default=DEFAULT_HISTORY, help="JSON Lines benchmark history")
+    run.set_defaults(handler=run_pipeline)
+
+    compare = commands.add_parser("compare", help="Flag stage regressions in the latest run")
+    compare.add_argument("--history", default=DEFAULT_HISTORY, help="JSON Lines benchmark history")
+    compare.add_argument("--baseline", type=int, default=-2, help="History index of the baseline run")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown as a fraction")
+    compare.set_defaults(handler=run_compare)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
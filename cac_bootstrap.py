@@ -0,0 +1,166 @@
+"""
+CAC Bootstrap Intervals
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Percentile bootstrap confidence intervals for every CAC statistic
+
+Resamples are drawn as index matrices (resamples x periods) and every
+statistic is computed for a whole matrix with vectorized reductions. Work is
+split into fixed-size tasks, each seeded from its own ``SeedSequence.spawn``
+child, so results are reproducible for a seed whatever the number of
+workers; tasks run on a process pool and each draws its resamples in chunks
+bounded by ``MAX_CHUNK_ELEMENTS`` to keep memory flat for long series.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+# Resamples per pool task; fixed so the seed -> result mapping ignores worker count
+TASK_RESAMPLES = 1_000
+# Upper bound on resample-matrix (index and count) elements held at once per worker
+MAX_CHUNK_ELEMENTS = 1_000_000
+
+STAT_NAMES = (
+    'Mean CAC',
+    'Median CAC',
+    'Standard Deviation',
+    'Min CAC',
+    'Max CAC',
+    'Range',
+    'Coefficient of Variation',
+    'Total Gap from Target',
+    'Percentage Above Target',
+)
+WEIGHTED_STAT_NAMES = ('Weighted Average CAC', 'Unweighted Average CAC')
+
+# Series shared with pool workers once through the initializer
+_series = None
+
+
+def _set_series(cac, spend, new_customers, target_cac):
+    global _series
+    _series = (cac, spend, new_customers, target_cac)
+
+
+def _resample_stats(index):
+    """Every statistic for each row of a (resamples x periods) index matrix
+
+    The series is sorted once up front, so each resample reduces to a
+    matrix of per-period counts: sums are count-weighted dot products and
+    the median, min and max are order statistics read off cumulative counts.
+    """
+    cac, spend, new_customers, target_cac = _series
+    n_resamples, n_periods = index.shape
+    offsets = index + (np.arange(n_resamples, dtype=np.int64) * n_periods)[:, None]
+    counts = np.bincount(offsets.ravel(), minlength=n_resamples * n_periods).reshape(n_resamples, n_periods)
+
+    # NaN CACs (periods without customers) sort last and are skipped like StreamingStats does
+    n_valid = int(np.count_nonzero(~np.isnan(cac)))
+    valid_counts = counts[:, :n_valid]
+    weights = valid_counts.astype("float64")
+    sizes = weights.sum(axis=1)
+    # Centre before squaring so the variance does not lose precision
+    centre = cac[:n_valid].mean() if n_valid else 0.0
+    deviations = cac[:n_valid] - centre
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = weights @ deviations / sizes
+        mean = centre + shift
+        std = np.sqrt(np.maximum(weights @ (deviations * deviations) / sizes - shift * shift, 0))
+
+        cumulative = np.cumsum(valid_counts, axis=1)
+        half = (sizes.astype(np.int64) - 1) // 2
+        lower_mid = (cumulative > half[:, None]).argmax(axis=1)
+        upper_mid = (cumulative > (sizes.astype(np.int64) // 2)[:, None]).argmax(axis=1)
+        present = valid_counts > 0
+        low = cac[present.argmax(axis=1)]
+        high = cac[n_valid - 1 - present[:, ::-1].argmax(axis=1)] if n_valid else low
+        median = (cac[lower_mid] + cac[upper_mid]) / 2
+        empty = sizes == 0
+        for column in (median, low, high):
+            column[empty] = np.nan
+
+        columns = [mean, median, std, low, high, high - low, std / mean * 100]
+        if spend is not None:
+            all_weights = weights if n_valid == n_periods else counts.astype("float64")
+            totals = all_weights @ new_customers
+            average = np.where(totals > 0, all_weights @ spend / totals, np.nan)
+        else:
+            average = mean
+        columns += [average - target_cac, (average - target_cac) / target_cac * 100]
+        if spend is not None:
+            columns += [average, mean]
+    return np.column_stack(columns)
+
+
+def _run_task(task):
+    """Draw ``size`` resamples from ``seed`` in memory-bounded chunks"""
+    seed, size = task
+    n_periods = len(_series[0])
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MAX_CHUNK_ELEMENTS // n_periods)
+    parts = []
+    for start in range(0, size, chunk):
+        index = rng.integers(0, n_periods, size=(min(chunk, size - start), n_periods), dtype=np.int32)
+        parts.append(_resample_stats(index))
+    return np.concatenate(parts)
+
+
+def bootstrap_replicates(cac_values, target_cac, spend=None, new_customers=None,
+                         n_resamples=DEFAULT_RESAMPLES, seed=0, workers=None):
+    """Bootstrap replicates of every statistic
+
+    Returns ``(names, replicates)`` where ``replicates`` has one row per
+    resample and one column per name in ``names`` (the keys of
+    ``cac_engine.compute_stats``). Periods are resampled with replacement;
+    with ``spend`` and ``new_customers`` the weighted average is recomputed
+    from the resampled totals. ``workers`` defaults to one per CPU; 1 runs
+    in-process.
+    """
+    cac = np.asarray(cac_values, dtype="float64")
+    if not len(cac):
+        raise ValueError("Bootstrapping needs at least one period")
+    weighted = spend is not None and new_customers is not None
+    # Resampling is uniform over periods, so it can draw positions in CAC order
+    order = np.argsort(cac, kind="stable")
+    arrays = (
+        cac[order],
+        np.asarray(spend, dtype="float64")[order] if weighted else None,
+        np.asarray(new_customers, dtype="float64")[order] if weighted else None,
+        float(target_cac),
+    )
+    sizes = [min(TASK_RESAMPLES, n_resamples - start) for start in range(0, n_resamples, TASK_RESAMPLES)]
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+
+    if workers <= 1:
+        _set_series(*arrays)
+        results = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_series, initargs=arrays) as pool:
+            results = list(pool.map(_run_task, tasks))
+    names = STAT_NAMES + (WEIGHTED_STAT_NAMES if weighted else ())
+    return names, np.concatenate(results)
+
+
+def bootstrap_intervals(cac_values, target_cac, spend=None, new_customers=None, n_resamples=DEFAULT_RESAMPLES,
+                        confidence=DEFAULT_CONFIDENCE, seed=0, workers=None):
+    """Percentile confidence intervals and standard errors for every statistic
+
+    Returns a dict keyed like ``cac_engine.compute_stats`` whose values are
+    dicts with ``lower``, ``upper`` and ``std_error``.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    names, replicates = bootstrap_replicates(cac_values, target_cac, spend, new_customers,
+                                             n_resamples=n_resamples, seed=seed, workers=workers)
+    tail = (1 - confidence) / 2 * 100
+    with np.errstate(invalid="ignore"):
+        lower, upper = np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+        std_error = np.nanstd(replicates, axis=0, ddof=1)
+    return {
+        name: {'lower': float(lower[i]), 'upper': float(upper[i]), 'std_error': float(std_error[i])}
+        for i, name in enumerate(names)
+    }
@@ -0,0 +1,149 @@
+"""
+CAC Report Cache
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Skip regenerating HTML reports whose inputs have not changed
+
+Rendered reports are stored in a directory keyed by a content hash of the
+analysis inputs (period data, target) and the report options. A report whose
+key is cached is copied into place, or left untouched when the file on disk
+already matches, instead of being rebuilt and re-serialized. Entries are
+evicted least-recently-used once the entry count or total size cap is hit.
+
+Several processes may share one cache directory: every index update re-reads
+the index under an exclusive lock on ``index.lock`` (where ``fcntl`` is
+available), and index and entry files are written to unique temporary files
+and moved into place with ``os.replace``, so readers never see partial files.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+
+def report_key(quarterly_data, target_cac, **options):
+    """Content hash of the analysis inputs and report options"""
+    payload = {
+        "data": {key: list(values) for key, values in quarterly_data.items()},
+        "target_cac": target_cac,
+        "options": options,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Persistent LRU cache of rendered report files"""
+
+    def __init__(self, directory, max_entries=1000, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._lock_path = os.path.join(directory, LOCK_FILE)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _replace(self, write, target):
+        """Write ``target`` through a unique temporary file in the cache directory"""
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                write(handle)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _save_index(self):
+        self._replace(lambda handle: handle.write(json.dumps(self._index).encode("utf-8")), self._index_path)
+
+    @contextmanager
+    def _locked_index(self):
+        """Read-modify-write of the index under an exclusive lock, merging other processes' updates"""
+        with open(self._lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._index = self._load_index()
+                yield self._index
+                self._save_index()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.html")
+
+    def restore(self, key, path):
+        """Put the cached report for ``key`` at ``path``; False on a miss
+
+        When ``path`` already holds the cached content nothing is written.
+        """
+        with self._locked_index() as index:
+            entry = index.get(key)
+            if entry is None or not os.path.exists(self._entry_path(key)):
+                index.pop(key, None)
+                self.misses += 1
+                return False
+            self.hits += 1
+            entry["last_used"] = time.time()
+            if os.path.exists(path) and os.path.getsize(path) == entry["size"] and file_digest(path) == entry["digest"]:
+                self.skipped += 1
+            else:
+                shutil.copyfile(self._entry_path(key), path)
+        return True
+
+    def store(self, key, path):
+        """Cache the freshly rendered report at ``path`` under ``key``"""
+        entry = {"size": os.path.getsize(path), "digest": file_digest(path)}
+        with open(path, "rb") as source:
+            self._replace(lambda handle: shutil.copyfileobj(source, handle), self._entry_path(key))
+        with self._locked_index() as index:
+            index[key] = {**entry, "last_used": time.time()}
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        by_age = sorted(self._index, key=lambda key: self._index[key]["last_used"])
+        while by_age and (len(self._index) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= self._index.pop(key)["size"]
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+
+    def summary(self):
+        """Hit/miss counts for this run"""
+        return {"hits": self.hits, "misses": self.misses, "unchanged": self.skipped, "entries": len(self._index)}
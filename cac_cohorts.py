@@ -0,0 +1,333 @@
+"""
+CAC Cohort Economics
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Per-cohort LTV, LTV:CAC and CAC payback from acquisition and revenue events
+
+Customers are grouped into acquisition cohorts (the analysis period they
+were acquired in). Customer ids are kept as one sorted array, so each chunk
+of revenue events is joined to its customers with a single
+``np.searchsorted`` and folded into a (cohort x months since acquisition)
+revenue matrix with one ``np.bincount``. LTV curves are cumulative sums
+along that matrix and payback is the first month the curve covers the
+cohort's CAC, all vectorized over cohorts. The matrix is the whole revenue
+state: new revenue (or new customers) is added in place and the ledger can
+be saved to and reloaded from an ``.npz`` state file between runs.
+
+Usage:
+    python cac_cohorts.py --state cohorts.npz --customers customers.csv --revenue revenue_today.csv --ledger ledger.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from cac_loader import DEFAULT_CHUNKSIZE, PERIOD_LABELS, detect_format
+
+DEFAULT_COHORT_COLUMNS = {
+    "customer": "customer_id",
+    "acquired": "acquired_at",
+    "date": "date",
+    "revenue": "revenue",
+}
+
+# Months per cohort period; daily cohorts are too fine for monthly payback
+COHORT_MONTHS = {"M": 1, "Q": 3, "Y": 12}
+STATE_VERSION = 1
+
+
+def iter_table_chunks(path, usecols, file_format=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield ``usecols`` of a CSV, Parquet or JSON Lines file one chunk at a time"""
+    import pandas as pd
+
+    file_format = file_format or detect_format(path)
+    if file_format == "csv":
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+    elif file_format == "jsonl":
+        with pd.read_json(path, lines=True, dtype=False, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[usecols]
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet cohort files requires pyarrow: pip install pyarrow") from exc
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=usecols):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported cohort file format: {file_format!r}")
+
+
+def _month_index(dates):
+    """Months since 1970-01 for an array of dates or date strings"""
+    import pandas as pd
+
+    dates = np.asarray(dates)
+    if dates.dtype.kind in "OU":
+        # ISO strings parse several times faster in NumPy than in pandas
+        try:
+            return dates.astype("datetime64[M]").astype(np.int64)
+        except ValueError:
+            pass
+    return pd.to_datetime(dates).to_numpy().astype("datetime64[M]").astype(np.int64)
+
+
+def _ids(customer_ids):
+    customer_ids = np.asarray(customer_ids)
+    # Object arrays (pandas strings) cannot be searched or saved without pickling
+    return customer_ids.astype(str) if customer_ids.dtype == object else customer_ids
+
+
+class CohortLedger:
+    """Acquisition cohorts and their revenue by month since acquisition
+
+    Customers must be added before their revenue; revenue for unknown
+    customers is dropped and totalled in ``unmatched_revenue``. A customer
+    added again keeps their first acquisition date.
+    """
+
+    def __init__(self, freq="Q"):
+        if freq not in COHORT_MONTHS:
+            raise ValueError(f"Unsupported cohort frequency {freq!r}; expected one of {sorted(COHORT_MONTHS)}")
+        self.freq = freq
+        self.customer_ids = np.empty(0, dtype=np.int64)
+        self.customer_cohorts = np.empty(0, dtype=np.int64)
+        self.acquired_months = np.empty(0, dtype=np.int64)
+        # Row ``i`` of ``revenue`` belongs to cohort period ordinal ``cohort_ordinals[i]``
+        self.cohort_ordinals = []
+        self._rows = {}
+        self.revenue = np.zeros((0, 0))
+        self.unmatched_revenue = 0.0
+        self.last_month = None
+
+    @classmethod
+    def from_files(cls, customers, revenue=(), freq="Q", columns=None, file_format=None,
+                   chunksize=DEFAULT_CHUNKSIZE):
+        """Build the ledger from a customer file and any number of revenue event files"""
+        return cls(freq).load_files(customers, revenue, columns, file_format, chunksize)
+
+    def load_files(self, customers=None, revenue=(), columns=None, file_format=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Add customers from ``customers`` and then revenue from each file in ``revenue``"""
+        columns = {**DEFAULT_COHORT_COLUMNS, **(columns or {})}
+        if customers:
+            for chunk in iter_table_chunks(customers, [columns["customer"], columns["acquired"]], file_format,
+                                           chunksize):
+                self.add_customers(chunk[columns["customer"]].to_numpy(), chunk[columns["acquired"]].to_numpy())
+        for path in [revenue] if isinstance(revenue, str) else revenue:
+            usecols = [columns["customer"], columns["date"], columns["revenue"]]
+            for chunk in iter_table_chunks(path, usecols, file_format, chunksize):
+                self.add_revenue(chunk[columns["customer"]].to_numpy(), chunk[columns["date"]].to_numpy(),
+                                 chunk[columns["revenue"]].to_numpy())
+        return self
+
+    def _grow(self, rows, months):
+        rows, months = max(rows, self.revenue.shape[0]), max(months, self.revenue.shape[1])
+        if (rows, months) != self.revenue.shape:
+            grown = np.zeros((rows, months))
+            grown[:self.revenue.shape[0], :self.revenue.shape[1]] = self.revenue
+            self.revenue = grown
+
+    def _seen(self, months):
+        latest = int(months.max())
+        self.last_month = latest if self.last_month is None else max(self.last_month, latest)
+
+    def _align_ids(self, customer_ids):
+        """Bring incoming ids and the stored ids to comparable dtypes
+
+        String and numeric ids never compare equal, so when a chunk's ids are
+        strings but the stored ones are numbers (or the reverse), both sides
+        switch to strings; the stored ids are then re-sorted in string order
+        to keep them searchable.
+        """
+        if not len(self.customer_ids) or (customer_ids.dtype.kind == "U") == (self.customer_ids.dtype.kind == "U"):
+            return customer_ids
+        if self.customer_ids.dtype.kind != "U":
+            stored = self.customer_ids.astype(str)
+            order = np.argsort(stored, kind="stable")
+            self.customer_ids = stored[order]
+            self.customer_cohorts = self.customer_cohorts[order]
+            self.acquired_months = self.acquired_months[order]
+        return customer_ids.astype(str)
+
+    def add_customers(self, customer_ids, acquired_dates):
+        """Add newly acquired customers to their cohorts"""
+        customer_ids = self._align_ids(_ids(customer_ids))
+        if not len(customer_ids):
+            return self
+        months = _month_index(acquired_dates)
+        customer_ids, first = np.unique(customer_ids, return_index=True)
+        months = months[first]
+        if len(self.customer_ids):
+            dtype = np.result_type(customer_ids, self.customer_ids)
+            customer_ids, self.customer_ids = customer_ids.astype(dtype), self.customer_ids.astype(dtype)
+            position = np.searchsorted(self.customer_ids, customer_ids)
+            known = self.customer_ids[np.minimum(position, len(self.customer_ids) - 1)] == customer_ids
+            customer_ids, months, position = customer_ids[~known], months[~known], position[~known]
+        else:
+            position = np.zeros(len(customer_ids), dtype=np.int64)
+
+        ordinals = months // COHORT_MONTHS[self.freq]
+        unique_ordinals, inverse = np.unique(ordinals, return_inverse=True)
+        lookup = np.array([self._rows.setdefault(int(ordinal), len(self._rows)) for ordinal in unique_ordinals],
+                          dtype=np.int64)
+        self.cohort_ordinals = sorted(self._rows, key=self._rows.get)
+        self._grow(len(self._rows), 1)
+        self.customer_ids = np.insert(self.customer_ids.astype(customer_ids.dtype, copy=False), position, customer_ids)
+        self.customer_cohorts = np.insert(self.customer_cohorts, position, lookup[inverse.ravel()])
+        self.acquired_months = np.insert(self.acquired_months, position, months)
+        if len(months):
+            self._seen(months)
+        return self
+
+    def add_revenue(self, customer_ids, dates, amounts):
+        """Fold a chunk of revenue events into the cohort revenue matrix"""
+        customer_ids = self._align_ids(_ids(customer_ids))
+        amounts = np.asarray(amounts, dtype="float64")
+        if not len(customer_ids):
+            return self
+        months = _month_index(dates)
+        self._seen(months)
+        # The fold is order-free, so search in key order: sorted queries hit the cache far more often
+        order = np.argsort(customer_ids, kind="stable")
+        customer_ids, months, amounts = customer_ids[order], months[order], amounts[order]
+        if len(self.customer_ids):
+            position = np.minimum(np.searchsorted(self.customer_ids, customer_ids), len(self.customer_ids) - 1)
+            matched = self.customer_ids[position] == customer_ids
+        else:
+            position = np.zeros(len(customer_ids), dtype=np.int64)
+            matched = np.zeros(len(customer_ids), dtype=bool)
+        self.unmatched_revenue += float(amounts[~matched].sum())
+        position, months, amounts = position[matched], months[matched], amounts[matched]
+        if not len(position):
+            return self
+
+        # Revenue booked before the acquisition date counts toward the acquisition month
+        ages = np.maximum(months - self.acquired_months[position], 0)
+        self._grow(len(self._rows), int(ages.max()) + 1)
+        width = self.revenue.shape[1]
+        cells = self.customer_cohorts[position] * width + ages
+        self.revenue += np.bincount(cells, weights=amounts, minlength=self.revenue.size).reshape(self.revenue.shape)
+        return self
+
+    def cohort_labels(self):
+        """Period label (``Q1 2024`` style) of every cohort row"""
+        import pandas as pd
+
+        step = COHORT_MONTHS[self.freq]
+        return [pd.Period(year=1970 + ordinal * step // 12, month=ordinal * step % 12 + 1, freq="M")
+                .asfreq(self.freq).strftime(PERIOD_LABELS[self.freq]) for ordinal in self.cohort_ordinals]
+
+    def ltv_curves(self, gross_margin=1.0):
+        """Cumulative gross profit per customer by month since acquisition, one row per cohort"""
+        customers = np.bincount(self.customer_cohorts, minlength=len(self._rows))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.cumsum(self.revenue, axis=1) * gross_margin / customers[:, None]
+
+    def metrics(self, cohort_cac=None, gross_margin=1.0):
+        """Per-cohort LTV, LTV:CAC and payback
+
+        ``cohort_cac`` maps cohort labels to CAC (e.g. the analysis period
+        labels and CAC values); cohorts without a CAC get NaN ratios and
+        payback. LTV is cumulative revenue per customer times
+        ``gross_margin`` to date; ``Payback_Months`` is the first month
+        (1 = acquisition month) in which it covers the CAC, NaN while it has
+        not. Rows are in cohort order.
+        """
+        import pandas as pd
+
+        labels = self.cohort_labels()
+        curves = self.ltv_curves(gross_margin)
+        customers = np.bincount(self.customer_cohorts, minlength=len(self._rows))
+        cac_lookup = pd.Series(cohort_cac or {}, dtype="float64")
+        cac = pd.Series(labels, dtype="object").map(cac_lookup).to_numpy(dtype="float64")
+        ltv = curves[:, -1] if curves.shape[1] else np.zeros(len(labels))
+
+        covered = curves >= cac[:, None]
+        paid_back = covered.any(axis=1)
+        payback = np.where(paid_back, covered.argmax(axis=1) + 1.0, np.nan)
+        step = COHORT_MONTHS[self.freq]
+        observed = self.last_month - np.asarray(self.cohort_ordinals, dtype=np.int64) * step + 1 \
+            if self.last_month is not None else np.zeros(len(labels), dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame({
+                "Cohort": labels,
+                "Customers": customers,
+                "CAC": cac,
+                "Revenue": self.revenue.sum(axis=1),
+                "LTV": ltv,
+                "LTV_to_CAC": ltv / cac,
+                "Payback_Months": payback,
+                "Months_Observed": observed,
+            })
+        return frame.iloc[np.argsort(self.cohort_ordinals, kind="stable")].reset_index(drop=True)
+
+    def save(self, path):
+        """Write the ledger state to an ``.npz`` file (atomically)"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path, version=STATE_VERSION, freq=self.freq, customer_ids=self.customer_ids,
+            customer_cohorts=self.customer_cohorts, acquired_months=self.acquired_months,
+            cohort_ordinals=np.asarray(self.cohort_ordinals, dtype=np.int64), revenue=self.revenue,
+            unmatched_revenue=self.unmatched_revenue, last_month=-1 if self.last_month is None else self.last_month,
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Read a ledger written by ``save``"""
+        with np.load(path) as state:
+            if int(state["version"]) != STATE_VERSION:
+                raise ValueError(f"Unsupported cohort state version {int(state['version'])} in {path!r}")
+            ledger = cls(str(state["freq"]))
+            ledger.customer_ids = state["customer_ids"]
+            ledger.customer_cohorts = state["customer_cohorts"]
+            ledger.acquired_months = state["acquired_months"]
+            ledger.cohort_ordinals = state["cohort_ordinals"].tolist()
+            ledger._rows = {ordinal: row for row, ordinal in enumerate(ledger.cohort_ordinals)}
+            ledger.revenue = state["revenue"]
+            ledger.unmatched_revenue = float(state["unmatched_revenue"])
+            last_month = int(state["last_month"])
+            ledger.last_month = None if last_month < 0 else last_month
+        return ledger
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Cohort LTV, LTV:CAC and CAC payback from revenue events")
+    parser.add_argument("--state", help="Cohort state file (.npz) to update; created when missing")
+    parser.add_argument("--customers", help="File with customer_id and acquired_at columns")
+    parser.add_argument("--revenue", action="append", default=[],
+                        help="File with customer_id, date and revenue columns (repeatable)")
+    parser.add_argument("--ledger", help="Spend/acquisition ledger for cohort CAC (see cac_loader.py)")
+    parser.add_argument("--freq", choices=sorted(COHORT_MONTHS), default="Q", help="Cohort period")
+    parser.add_argument("--margin", type=float, default=1.0, help="Gross margin applied to revenue for LTV")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    if args.state and os.path.exists(args.state):
+        ledger = CohortLedger.load(args.state)
+    else:
+        ledger = CohortLedger(args.freq)
+    ledger.load_files(args.customers, args.revenue, chunksize=args.chunksize)
+    if args.state:
+        ledger.save(args.state)
+
+    cohort_cac = None
+    if args.ledger:
+        from cac_loader import load_period_data
+
+        period_data = load_period_data(args.ledger, freq=ledger.freq)
+        cohort_cac = dict(zip(period_data["Quarter"], period_data["CAC"]))
+    print(f"Customers: {len(ledger.customer_ids):,}  Unmatched revenue: ${ledger.unmatched_revenue:,.2f}")
+    print(ledger.metrics(cohort_cac, args.margin).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+CAC Trend Downsampling
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Keep long CAC charts light without losing their peaks
+
+Both methods return sorted indices into the original series, so every trace
+that shares the x axis can be reduced with the same selection.
+
+- ``lttb``: Largest-Triangle-Three-Buckets; keeps the visually dominant
+  point of each bucket, which preserves the shape of the curve.
+- ``minmax``: keeps the minimum and maximum of each bucket (plus the end
+  points), guaranteeing that every peak and trough survives. Fully
+  vectorized.
+"""
+
+import numpy as np
+
+DEFAULT_MAX_POINTS = 2000
+DEFAULT_WEBGL_THRESHOLD = 5000
+
+
+def lttb_indices(y, n_out, x=None):
+    """Indices of ``n_out`` points chosen by Largest-Triangle-Three-Buckets"""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype="float64") if x is None else np.asarray(x, dtype="float64")
+
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        next_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Indices of the end points and the minimum and maximum of ``(n_out - 2) // 2`` equal buckets"""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    buckets = max((n_out - 2) // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size)
+    # Drop all-NaN buckets (nanargmin/nanargmax reject them) but keep each bucket's own offset
+    keep = ~np.all(np.isnan(blocks), axis=1)
+    blocks = blocks[keep]
+    offsets = np.flatnonzero(keep) * size
+    lows = offsets + np.nanargmin(blocks, axis=1)
+    highs = offsets + np.nanargmax(blocks, axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def downsample_indices(y, max_points=DEFAULT_MAX_POINTS, method="lttb"):
+    """Select at most ``max_points`` indices of ``y`` with ``method`` (``'lttb'``, ``'minmax'`` or ``None``)"""
+    n = len(y)
+    if method is None or max_points is None or n <= max_points:
+        return np.arange(n)
+    if method == "lttb":
+        return lttb_indices(y, max_points)
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    raise ValueError(f"Unknown downsampling method: {method!r}")
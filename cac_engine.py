@@ -0,0 +1,352 @@
+"""
+CAC Analysis Engine
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Side-effect-free CAC analysis returning a typed result object
+
+Nothing in this module prints, touches the filesystem or imports plotly.
+``analyze`` returns a frozen CACResult with the period frame, the
+statistics, the insights and plotly-compatible figure specs (plain dicts).
+The freezing is shallow: fields cannot be reassigned, but the DataFrame and
+the nested figure dicts are ordinary mutable objects shared with the caller.
+Console output and HTML files are produced by the sinks in cac_reporting.py.
+"""
+
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from cac_downsample import DEFAULT_MAX_POINTS, DEFAULT_WEBGL_THRESHOLD, downsample_indices
+from cac_profile import stage
+from cac_stats import StreamingStats
+
+DEFAULT_QUARTERLY_DATA = MappingProxyType({
+    'Quarter': ('Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024'),
+    'CAC': (225.6, 228.97, 234.24, 234.71),
+})
+
+DEFAULT_TARGET_CAC = 150
+
+RECOMMENDATIONS = (
+    "Implement data-driven attribution modeling to identify highest-ROI marketing channels",
+    "Optimize digital marketing spend allocation based on channel-specific CAC performance",
+    "Deploy marketing automation and personalization to improve conversion rates",
+    "Conduct comprehensive audit of underperforming marketing channels",
+    "Establish real-time CAC monitoring dashboard with automated alerts",
+    "Develop customer segmentation strategy for high-value, low-cost acquisition",
+    "Launch A/B testing framework for continuous campaign optimization",
+    "Negotiate better rates with marketing partners based on volume commitments",
+)
+
+FIGURE_NAMES = ('trend', 'gap', 'dashboard')
+
+# Subplot grid matching plotly's make_subplots(rows=2, cols=2) defaults
+DASHBOARD_COLUMNS = ([0.0, 0.45], [0.55, 1.0])
+DASHBOARD_ROWS = ([0.625, 1.0], [0.0, 0.375])
+
+
+@dataclass(frozen=True)
+class CACResult:
+    """Outcome of one CAC analysis
+
+    ``frame`` has one row per period with the gap and percentage above target,
+    ``stats`` the summary statistics, ``insights`` the findings and
+    recommendations, and ``figures`` plotly figure specs keyed by report name
+    (``'trend'``, ``'gap'``, ``'dashboard'``).
+
+    Only the top level is immutable: ``stats``, ``insights`` and ``figures``
+    are read-only mappings, but ``frame`` and the figure specs inside
+    ``figures`` are mutable, so treat them as read-only (copy before
+    editing).
+    """
+
+    frame: object
+    stats: MappingProxyType
+    insights: MappingProxyType
+    figures: MappingProxyType
+    target_cac: float
+    average_cac: float
+
+
+def compute_average_cac(quarterly_data, weighted=True):
+    """Average CAC across periods
+
+    When the data carries ``'Spend'`` and ``'New_Customers'`` the average is
+    the ratio of sums (total spend over total new customers), so periods
+    weigh in by customer volume. ``weighted=False``, or data with CAC values
+    only, gives the unweighted mean of the period CACs.
+    """
+    if weighted and 'Spend' in quarterly_data and 'New_Customers' in quarterly_data:
+        from cac_rollup import blended_cac
+
+        return blended_cac(quarterly_data['Spend'], quarterly_data['New_Customers'])
+    return float(np.mean(quarterly_data['CAC']))
+
+
+def build_frame(quarterly_data, target_cac):
+    """Period frame with gap and percentage above target"""
+    import pandas as pd
+
+    df = pd.DataFrame({key: list(values) for key, values in quarterly_data.items()})
+    df['Gap_to_Target'] = df['CAC'] - target_cac
+    df['Percentage_Above_Target'] = ((df['CAC'] - target_cac) / target_cac * 100).round(2)
+    return df
+
+
+def compute_stats(cac_values, average_cac, target_cac, spend=None, new_customers=None):
+    """Summary statistics of the CAC series in a single streaming pass
+
+    The series is already in memory, so the median is exact rather than
+    read from the streaming quantile sketch. With per-period ``spend`` and
+    ``new_customers`` the ratio-of-sums and unweighted averages are reported
+    side by side.
+    """
+    values = np.asarray(cac_values, dtype="float64")
+    observed = values[~np.isnan(values)]
+    summary = StreamingStats().update(observed)
+    stats = {
+        'Mean CAC': summary.mean,
+        'Median CAC': float(np.median(observed)) if observed.size else math.nan,
+        'Standard Deviation': summary.std,
+        'Min CAC': summary.min,
+        'Max CAC': summary.max,
+        'Range': summary.range,
+        'Coefficient of Variation': summary.coefficient_of_variation,
+        'Total Gap from Target': average_cac - target_cac,
+        'Percentage Above Target': ((average_cac - target_cac) / target_cac) * 100
+    }
+    if spend is not None and new_customers is not None:
+        from cac_rollup import blended_cac
+
+        stats['Weighted Average CAC'] = blended_cac(spend, new_customers)
+        stats['Unweighted Average CAC'] = summary.mean
+    return stats
+
+
+def generate_insights(quarterly_data, average_cac, target_cac, rules=None):
+    """Key findings, recommendations and solution focus for the CAC series
+
+    Findings and recommendations come from the rules in cac_rules (the
+    defaults unless ``rules`` is given) that fire for this series;
+    ``alerts`` holds the same findings as structured records with severity
+    and evidence.
+    """
+    from cac_rules import DEFAULT_RULES, series_insights
+
+    findings, triggered, alerts = series_insights(
+        quarterly_data['CAC'], target_cac, level=average_cac,
+        labels=quarterly_data['Quarter'], rules=DEFAULT_RULES if rules is None else rules,
+    )
+    # Keep the playbook's order for the recommendations the rules asked for
+    recommendations = tuple(rec for rec in RECOMMENDATIONS if rec in triggered)
+    recommendations += tuple(rec for rec in triggered if rec not in RECOMMENDATIONS)
+    solution_focus = (
+        "Priority: Reallocate budget to highest-performing channels",
+        f"Target: Reduce CAC to ${target_cac:g} industry benchmark",
+        f"Potential Savings: ${average_cac - target_cac:.2f} per customer acquisition",
+    )
+    return MappingProxyType({
+        'findings': findings,
+        'recommendations': recommendations,
+        'solution_focus': solution_focus,
+        'alerts': tuple(MappingProxyType(alert) for alert in alerts),
+    })
+
+
+def _subplot_title(text, row, col):
+    return dict(
+        text=text, showarrow=False, font=dict(size=16),
+        x=sum(DASHBOARD_COLUMNS[col]) / 2, xref='paper', xanchor='center',
+        y=DASHBOARD_ROWS[row][1], yref='paper', yanchor='bottom',
+    )
+
+
+def _forecast_traces(forecast, last_label, last_cac, scatter):
+    """Prediction band and dashed forecast line continuing from the last actual point"""
+    labels = forecast['labels']
+    band = f"{forecast['level'] * 100:g}% Prediction Interval"
+    return [
+        dict(type=scatter, x=labels, y=forecast['upper'], mode='lines', line=dict(width=0),
+             showlegend=False, hoverinfo='skip', name=band),
+        dict(type=scatter, x=labels, y=forecast['lower'], mode='lines', line=dict(width=0),
+             fill='tonexty', fillcolor='rgba(255, 0, 0, 0.15)', name=band),
+        dict(type=scatter, x=[last_label] + labels, y=[last_cac] + forecast['mean'], mode='lines+markers',
+             name=f"Forecast ({forecast['method']})", line=dict(color='red', width=2, dash='dash')),
+    ]
+
+
+def _simulation_traces(simulation, last_label, last_cac, scatter):
+    """Simulated 5-95% band and median CAC path on the dashboard trend subplot"""
+    labels = simulation['labels']
+    percentiles = simulation['percentiles']
+    band = f"Simulated 5-95% Range ({simulation['paths']:,} paths)"
+    return [
+        dict(type=scatter, x=labels, y=percentiles[95], mode='lines', line=dict(width=0),
+             showlegend=False, hoverinfo='skip', name=band, xaxis='x', yaxis='y'),
+        dict(type=scatter, x=labels, y=percentiles[5], mode='lines', line=dict(width=0),
+             fill='tonexty', fillcolor='rgba(128, 0, 128, 0.15)', name=band, xaxis='x', yaxis='y'),
+        dict(type=scatter, x=[last_label] + labels, y=[last_cac] + percentiles[50], mode='lines+markers',
+             name='Simulated Median', line=dict(color='purple', dash='dash'), xaxis='x', yaxis='y'),
+    ]
+
+
+def build_figures(df, target_cac, average_cac, max_points=DEFAULT_MAX_POINTS, downsample="lttb",
+                  webgl_threshold=DEFAULT_WEBGL_THRESHOLD, forecast_horizon=0, forecast_method="auto",
+                  season_length=None, simulate_paths=0, simulate_horizon=4, spend_factor=1.0, seed=0,
+                  forecast=None, simulation=None, names=None):
+    """Plotly figure specs for the trend chart, gap chart and dashboard
+
+    ``names`` limits the result to those figures (default: all of
+    ``FIGURE_NAMES``), and the forecast and simulation are only computed
+    when the figure drawing them is requested.
+
+    Series longer than ``max_points`` are reduced with ``downsample``
+    (``'lttb'``, ``'minmax'`` or ``None``; see cac_downsample.py) using one
+    index selection for every per-period trace, and line charts switch to
+    WebGL ``scattergl`` when more than ``webgl_threshold`` points remain
+    after downsampling. A positive ``forecast_horizon`` overlays a forecast line and
+    prediction band on the trend chart (see cac_forecast.py). A positive
+    ``simulate_paths`` adds the simulated CAC range for the next
+    ``simulate_horizon`` periods, scaled by the scenario ``spend_factor``, to
+    the dashboard along with the chance of reaching the target (see
+    cac_simulation.py). A ``forecast`` or ``simulation`` dict computed
+    earlier (``forecast_series`` / ``simulate_series``) is drawn as-is
+    instead of being recomputed from those options.
+    """
+    names = FIGURE_NAMES if names is None else tuple(names)
+    figures = {}
+    if forecast is None and forecast_horizon and 'trend' in names:
+        from cac_forecast import forecast_series
+
+        forecast = forecast_series(df['CAC'], df['Quarter'], forecast_horizon, forecast_method, season_length)
+    if simulation is None and simulate_paths and 'dashboard' in names:
+        from cac_simulation import simulate_series
+
+        simulation = simulate_series(df['CAC'], df['Quarter'], target_cac, simulate_horizon, simulate_paths,
+                                     spend_factor, season_length, seed)
+    keep = downsample_indices(df['CAC'].to_numpy(), max_points, downsample)
+    if len(keep) < len(df):
+        df = df.iloc[keep]
+    scatter = 'scattergl' if len(df) > webgl_threshold else 'scatter'
+    quarters = df['Quarter'].tolist()
+    cac = df['CAC'].tolist()
+    gaps = df['Gap_to_Target'].tolist()
+    percentages = df['Percentage_Above_Target'].tolist()
+
+    # 1. Trend Analysis Chart
+    if 'trend' in names:
+        figures['trend'] = trend = dict(
+            data=[
+                dict(type=scatter, x=quarters, y=cac, mode='lines+markers', name='Actual CAC',
+                     line=dict(color='red', width=3), marker=dict(size=10)),
+                dict(type=scatter, x=quarters, y=[target_cac] * len(df), mode='lines',
+                     name=f'Industry Target (${target_cac:g})', line=dict(color='green', width=2, dash='dash')),
+                dict(type=scatter, x=quarters, y=[average_cac] * len(df), mode='lines',
+                     name=f'2024 Average (${average_cac:.2f})', line=dict(color='blue', width=2, dash='dot')),
+            ],
+            layout=dict(
+                title=dict(text='Customer Acquisition Cost (CAC) Trend Analysis - 2024'),
+                xaxis=dict(title=dict(text='Quarter')),
+                yaxis=dict(title=dict(text='CAC ($)')),
+                hovermode='x unified',
+                height=500,
+            ),
+        )
+        if forecast:
+            trend['data'].extend(_forecast_traces(forecast, quarters[-1], cac[-1], scatter))
+
+    # 2. Gap Analysis Chart
+    if 'gap' in names:
+        figures['gap'] = dict(
+            data=[
+                dict(type='bar', x=quarters, y=gaps, name='Gap to Target ($)', marker=dict(color='red'),
+                     text=[f'${value:.2f}' for value in gaps], textposition='auto'),
+            ],
+            layout=dict(
+                title=dict(text=f'CAC Gap Analysis: Difference from Industry Target (${target_cac:g})'),
+                xaxis=dict(title=dict(text='Quarter')),
+                yaxis=dict(title=dict(text='Gap to Target ($)')),
+                height=400,
+            ),
+        )
+
+    # 3. Performance Dashboard
+    if 'dashboard' in names:
+        metrics = ['Average CAC', 'Target CAC', 'Gap', '% Above Target', 'Q4 CAC']
+        values = [f'${average_cac:.2f}', f'${target_cac}', f'${average_cac - target_cac:.2f}',
+                  f'{((average_cac - target_cac) / target_cac * 100):.1f}%', f'${cac[-1]}']
+        if simulation:
+            last = simulation['labels'][-1]
+            metrics += [f'Simulated {last} CAC (median)', f'P(Target reached by {last})']
+            values += [f"${simulation['percentiles'][50][-1]:.2f}", f"{simulation['prob_reached'][-1] * 100:.1f}%"]
+        figures['dashboard'] = dashboard = dict(
+            data=[
+                dict(type=scatter, x=quarters, y=cac, mode='lines+markers', name='CAC',
+                     line=dict(color='red'), xaxis='x', yaxis='y'),
+                dict(type=scatter, x=quarters, y=[target_cac] * len(df), mode='lines', name='Target',
+                     line=dict(color='green', dash='dash'), xaxis='x', yaxis='y'),
+                dict(type='bar', x=quarters, y=gaps, name='Gap', marker=dict(color='red'), xaxis='x2', yaxis='y2'),
+                dict(type='bar', x=quarters, y=percentages, name='% Above Target', marker=dict(color='orange'),
+                     xaxis='x3', yaxis='y3'),
+                dict(
+                    type='table',
+                    domain=dict(x=DASHBOARD_COLUMNS[1], y=DASHBOARD_ROWS[1]),
+                    header=dict(values=['Metric', 'Value'], fill=dict(color='lightblue')),
+                    cells=dict(values=[metrics, values]),
+                ),
+            ],
+            layout=dict(
+                xaxis=dict(anchor='y', domain=DASHBOARD_COLUMNS[0]),
+                yaxis=dict(anchor='x', domain=DASHBOARD_ROWS[0]),
+                xaxis2=dict(anchor='y2', domain=DASHBOARD_COLUMNS[1]),
+                yaxis2=dict(anchor='x2', domain=DASHBOARD_ROWS[0]),
+                xaxis3=dict(anchor='y3', domain=DASHBOARD_COLUMNS[0]),
+                yaxis3=dict(anchor='x3', domain=DASHBOARD_ROWS[1]),
+                annotations=[
+                    _subplot_title('Quarterly CAC Trend', 0, 0),
+                    _subplot_title('Gap to Target', 0, 1),
+                    _subplot_title('Percentage Above Target', 1, 0),
+                    _subplot_title('Key Metrics', 1, 1),
+                ],
+                height=800,
+                showlegend=False,
+                title=dict(text="CAC Performance Dashboard - 2024"),
+            ),
+        )
+
+        if simulation:
+            dashboard['data'][2:2] = _simulation_traces(simulation, quarters[-1], cac[-1], scatter)
+
+    return figures
+
+
+def analyze(quarterly_data=None, target_cac=DEFAULT_TARGET_CAC, include_figures=True, weighted=True,
+            **figure_options):
+    """Run the full CAC analysis without printing or writing anything
+
+    ``quarterly_data`` maps ``'Quarter'`` labels and ``'CAC'`` values (plus
+    any extra per-period columns); it defaults to the 2024 quarters. See
+    ``compute_average_cac`` for ``weighted`` and ``build_figures`` for the
+    ``figure_options``.
+    """
+    if quarterly_data is None:
+        quarterly_data = DEFAULT_QUARTERLY_DATA
+    with stage("frame"):
+        average_cac = compute_average_cac(quarterly_data, weighted)
+        frame = build_frame(quarterly_data, target_cac)
+    with stage("stats"):
+        stats = compute_stats(quarterly_data['CAC'], average_cac, target_cac,
+                              quarterly_data.get('Spend'), quarterly_data.get('New_Customers'))
+    with stage("insights"):
+        insights = generate_insights(quarterly_data, average_cac, target_cac)
+    with stage("figure_build"):
+        figures = build_figures(frame, target_cac, average_cac, **figure_options) if include_figures else {}
+    return CACResult(
+        frame=frame,
+        stats=MappingProxyType(stats),
+        insights=insights,
+        figures=MappingProxyType(figures),
+        target_cac=target_cac,
+        average_cac=average_cac,
+    )
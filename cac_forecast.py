@@ -0,0 +1,294 @@
+"""
+CAC Forecasting
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Batched Holt / Holt-Winters and linear-trend forecasts for many CAC series
+
+Every model is fitted to all series at once: the inputs are a
+segments x periods array and the smoothing recursions run once per period
+over a (parameter grid x segments) state array, so the grid search for
+every segment costs one pass over time rather than one model object per
+series. Forecasts come with normal-approximation prediction intervals.
+"""
+
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+from cac_loader import PERIOD_LABELS, parse_period_label, period_order
+
+DEFAULT_HORIZON = 4
+DEFAULT_LEVEL = 0.95
+SMOOTHING_GRID = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+TREND_GRID = (0.01, 0.05, 0.1, 0.2, 0.3)
+SEASON_LENGTHS = {"Q": 4, "M": 12}
+METHODS = ("auto", "holt", "holt_winters", "linear")
+# Segments per smoothing pass; keeps the (grid x segments) state cache-sized
+SEGMENT_CHUNK = 2048
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """Point forecasts and prediction intervals for a batch of series
+
+    ``mean``, ``lower`` and ``upper`` have shape (segments, horizon);
+    ``params`` maps parameter names to per-segment arrays.
+    """
+
+    method: str
+    mean: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    sigma: np.ndarray
+    params: dict
+
+
+def _prepare(values):
+    """2-D float array with interior/trailing gaps carried forward and leading gaps back-filled"""
+    values = np.atleast_2d(np.asarray(values, dtype="float64"))
+    if not np.isnan(values).any():
+        return values
+    observed = ~np.isnan(values)
+    index = np.where(observed, np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = np.take_along_axis(values, index, axis=1)
+    first = np.take_along_axis(values, observed.argmax(axis=1)[:, None], axis=1)
+    return np.where(np.isnan(filled), first, filled)
+
+
+def _concat(parts):
+    """Join forecasts computed for consecutive blocks of segments"""
+    return Forecast(
+        parts[0].method,
+        *(np.concatenate([getattr(part, name) for part in parts]) for name in ("mean", "lower", "upper", "sigma")),
+        {key: np.concatenate([part.params[key] for part in parts]) for key in parts[0].params},
+    )
+
+
+def _z(level):
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+def linear_trend(values, horizon=DEFAULT_HORIZON, level=DEFAULT_LEVEL):
+    """Ordinary least-squares trend per series with OLS prediction intervals"""
+    values = _prepare(values)
+    n_segments, n_periods = values.shape
+    t = np.arange(n_periods, dtype="float64")
+    t_mean = t.mean()
+    sxx = ((t - t_mean) ** 2).sum()
+    y_mean = values.mean(axis=1)
+    slope = (values - y_mean[:, None]) @ (t - t_mean) / sxx if sxx else np.zeros(n_segments)
+    intercept = y_mean - slope * t_mean
+
+    residuals = values - (intercept[:, None] + slope[:, None] * t)
+    dof = max(n_periods - 2, 1)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+
+    future = np.arange(n_periods, n_periods + horizon, dtype="float64")
+    mean = intercept[:, None] + slope[:, None] * future
+    spread = np.sqrt(1 + 1 / n_periods + ((future - t_mean) ** 2 / sxx if sxx else 0))
+    half_width = _z(level) * sigma[:, None] * spread
+    return Forecast("linear", mean, mean - half_width, mean + half_width, sigma,
+                    {"intercept": intercept, "slope": slope})
+
+
+def _grid(*axes):
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return [axis.ravel()[:, None] for axis in mesh]
+
+
+def holt(values, horizon=DEFAULT_HORIZON, level=DEFAULT_LEVEL, alphas=SMOOTHING_GRID, betas=TREND_GRID):
+    """Holt's linear exponential smoothing, grid-searched per series
+
+    All (alpha, beta) pairs are run together as a (grid x segments) state;
+    each series keeps the pair with the smallest one-step-ahead squared error.
+    """
+    values = _prepare(values)
+    if len(values) > SEGMENT_CHUNK:
+        return _concat([holt(values[start:start + SEGMENT_CHUNK], horizon, level, alphas, betas)
+                        for start in range(0, len(values), SEGMENT_CHUNK)])
+    n_segments, n_periods = values.shape
+    alpha, beta = _grid(np.asarray(alphas, dtype="float64"), np.asarray(betas, dtype="float64"))
+
+    level_state = np.broadcast_to(values[:, 0], (len(alpha), n_segments)).copy()
+    trend_state = np.broadcast_to(values[:, 1] - values[:, 0] if n_periods > 1 else np.zeros(n_segments),
+                                  (len(alpha), n_segments)).copy()
+    sse = np.zeros_like(level_state)
+    for step in range(1, n_periods):
+        observed = values[:, step]
+        predicted = level_state + trend_state
+        sse += (observed - predicted) ** 2
+        previous = level_state
+        level_state = alpha * observed + (1 - alpha) * predicted
+        trend_state = beta * (level_state - previous) + (1 - beta) * trend_state
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_segments)
+    alpha_best, beta_best = alpha[best, 0], beta[best, 0]
+    final_level, final_trend = level_state[best, columns], trend_state[best, columns]
+    sigma = np.sqrt(sse[best, columns] / max(n_periods - 1, 1))
+
+    steps = np.arange(1, horizon + 1, dtype="float64")
+    mean = final_level[:, None] + steps * final_trend[:, None]
+    # ETS(A,A,N) forecast variance: sigma^2 * (1 + sum_{j<h} (alpha * (1 + beta * j))^2)
+    weights = (alpha_best[:, None] * (1 + beta_best[:, None] * np.arange(horizon))) ** 2
+    weights[:, 0] = 0
+    half_width = _z(level) * sigma[:, None] * np.sqrt(1 + np.cumsum(weights, axis=1))
+    return Forecast("holt", mean, mean - half_width, mean + half_width, sigma,
+                    {"alpha": alpha_best, "beta": beta_best})
+
+
+def _check_seasons(season_length, n_periods):
+    """Raise ``ValueError`` unless Holt-Winters can run on ``n_periods`` with ``season_length``"""
+    if season_length is None or int(season_length) < 2:
+        raise ValueError("Holt-Winters needs a season length of at least 2 periods "
+                         f"(known for {', '.join(sorted(SEASON_LENGTHS))} periods), got {season_length!r}")
+    if n_periods < 2 * int(season_length):
+        raise ValueError(f"Holt-Winters needs at least {2 * int(season_length)} periods (two seasons), "
+                         f"got {n_periods}")
+
+
+def holt_winters(values, season_length, horizon=DEFAULT_HORIZON, level=DEFAULT_LEVEL,
+                 alphas=SMOOTHING_GRID, betas=TREND_GRID, gammas=(0.05, 0.1, 0.3, 0.5)):
+    """Additive Holt-Winters, grid-searched per series
+
+    Needs at least two full seasons; the first two seasons initialise the
+    level, trend and seasonal indices.
+    """
+    values = _prepare(values)
+    n_segments, n_periods = values.shape
+    _check_seasons(season_length, n_periods)
+    m = int(season_length)
+    if n_segments > SEGMENT_CHUNK:
+        return _concat([holt_winters(values[start:start + SEGMENT_CHUNK], m, horizon, level, alphas, betas, gammas)
+                        for start in range(0, n_segments, SEGMENT_CHUNK)])
+    alpha, beta, gamma = _grid(*(np.asarray(axis, dtype="float64") for axis in (alphas, betas, gammas)))
+    n_grid = len(alpha)
+
+    first, second = values[:, :m].mean(axis=1), values[:, m:2 * m].mean(axis=1)
+    level_state = np.broadcast_to(first, (n_grid, n_segments)).copy()
+    trend_state = np.broadcast_to((second - first) / m, (n_grid, n_segments)).copy()
+    # Seasonal indices are stored slot-major so each update touches one contiguous block
+    seasonal = np.broadcast_to((values[:, :m] - first[:, None]).T[:, None, :], (m, n_grid, n_segments)).copy()
+    sse = np.zeros_like(level_state)
+    for step in range(m, n_periods):
+        observed = values[:, step]
+        slot = step % m
+        season = seasonal[slot]
+        sse += (observed - (level_state + trend_state + season)) ** 2
+        previous = level_state
+        level_state = alpha * (observed - season) + (1 - alpha) * (previous + trend_state)
+        trend_state = beta * (level_state - previous) + (1 - beta) * trend_state
+        seasonal[slot] = gamma * (observed - level_state) + (1 - gamma) * season
+
+    best = sse.argmin(axis=0)
+    columns = np.arange(n_segments)
+    alpha_best, beta_best, gamma_best = alpha[best, 0], beta[best, 0], gamma[best, 0]
+    final_level, final_trend = level_state[best, columns], trend_state[best, columns]
+    final_seasonal = seasonal[:, best, columns].T
+    sigma = np.sqrt(sse[best, columns] / max(n_periods - m, 1))
+
+    steps = np.arange(1, horizon + 1)
+    slots = (n_periods - 1 + steps) % m
+    mean = final_level[:, None] + steps * final_trend[:, None] + final_seasonal[:, slots]
+    lags = np.arange(horizon)
+    weights = (alpha_best[:, None] * (1 + beta_best[:, None] * lags)
+               + gamma_best[:, None] * ((lags % m == 0) & (lags > 0))) ** 2
+    weights[:, 0] = 0
+    half_width = _z(level) * sigma[:, None] * np.sqrt(1 + np.cumsum(weights, axis=1))
+    return Forecast("holt_winters", mean, mean - half_width, mean + half_width, sigma,
+                    {"alpha": alpha_best, "beta": beta_best, "gamma": gamma_best})
+
+
+def forecast(values, horizon=DEFAULT_HORIZON, method="auto", season_length=None, level=DEFAULT_LEVEL):
+    """Forecast every series with ``method``
+
+    ``auto`` uses Holt-Winters when ``season_length`` is given and there are
+    two full seasons of history, Holt otherwise; ``linear`` is the
+    least-squares trend baseline. An explicit ``holt_winters`` without a
+    season length or two seasons of history raises ``ValueError``.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown forecast method {method!r}; expected one of {METHODS}")
+    n_periods = np.atleast_2d(values).shape[1]
+    if n_periods < 2:
+        raise ValueError("Forecasting needs at least two periods of history")
+    if method == "holt_winters":
+        _check_seasons(season_length, n_periods)
+    if method == "linear":
+        return linear_trend(values, horizon, level)
+    if method == "holt_winters" or (method == "auto" and season_length and n_periods >= 2 * season_length):
+        return holt_winters(values, season_length, horizon, level)
+    return holt(values, horizon, level)
+
+
+def future_labels(labels, horizon):
+    """Labels for the ``horizon`` periods after ``labels`` in the same style
+
+    Understands the loader's period label formats (``Q1 2024``, ``Jan 2024``,
+    ``2024``, ``2024-01-31``); anything else falls back to ``+1``, ``+2``...
+    """
+    try:
+        start = parse_period_label(labels[-1])
+    except ValueError:
+        return [f"+{step}" for step in range(1, horizon + 1)]
+    # pandas < 2.2 spells annual periods 'A-DEC' rather than 'Y-DEC'
+    label_format = PERIOD_LABELS["Y" if start.freqstr[0] == "A" else start.freqstr[0]]
+    return [(start + step).strftime(label_format) for step in range(1, horizon + 1)]
+
+
+def forecast_series(cac_values, labels, horizon=DEFAULT_HORIZON, method="auto", season_length=None,
+                    level=DEFAULT_LEVEL):
+    """Forecast one CAC series; returns a dict of future labels, mean, lower and upper lists"""
+    result = forecast([list(cac_values)], horizon, method, season_length, level)
+    return {
+        "method": result.method,
+        "level": level,
+        "labels": future_labels(list(labels), horizon),
+        "mean": result.mean[0].tolist(),
+        "lower": result.lower[0].tolist(),
+        "upper": result.upper[0].tolist(),
+    }
+
+
+def forecast_segments(frame, by=None, horizon=DEFAULT_HORIZON, method="auto", season_length=None,
+                      level=DEFAULT_LEVEL, include_baseline=True, cac_column="CAC", period_column="Period"):
+    """Forecast every segment of a long segment/period frame
+
+    Returns a tidy frame with the segment columns, ``Step``, ``Period`` (when
+    the frame's periods are pandas periods), ``Method``, ``Forecast``,
+    ``Lower`` and ``Upper``. With ``include_baseline`` the linear-trend
+    baseline is stacked beneath the smoothing forecast. Periods are fitted in
+    chronological order (``cac_loader.period_order``).
+    """
+    import pandas as pd
+
+    from cac_segments import DEFAULT_SEGMENT_COLUMNS
+
+    by = list(by or DEFAULT_SEGMENT_COLUMNS)
+    matrix = frame.pivot_table(index=by, columns=period_column, values=cac_column,
+                               aggfunc="mean", observed=True, sort=True)
+    matrix = matrix.iloc[:, period_order(matrix.columns)]
+    values = matrix.to_numpy(dtype="float64")
+    if season_length is None and isinstance(matrix.columns, pd.PeriodIndex):
+        season_length = SEASON_LENGTHS.get(matrix.columns.freqstr[0])
+
+    results = [forecast(values, horizon, method, season_length, level)]
+    if include_baseline and method != "linear":
+        results.append(linear_trend(values, horizon, level))
+
+    segments = matrix.index.to_frame(index=False)
+    repeated = segments.loc[segments.index.repeat(horizon)].reset_index(drop=True)
+    steps = np.tile(np.arange(1, horizon + 1), len(segments))
+    parts = []
+    for result in results:
+        part = repeated.copy()
+        part["Step"] = steps
+        if isinstance(matrix.columns, pd.PeriodIndex):
+            part["Period"] = matrix.columns[-1] + steps
+        part["Method"] = result.method
+        part["Forecast"] = result.mean.ravel()
+        part["Lower"] = result.lower.ravel()
+        part["Upper"] = result.upper.ravel()
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Incremental CAC Analysis
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Keep CAC statistics current as periods are appended or restated
+
+IncrementalCAC keeps running aggregates in a JSON state file: Welford
+count/mean/M2 (with the matching removal step for restatements), a sorted
+copy of the period CAC values for median/min/max, spend and customer totals
+for the ratio-of-sums CAC, and the per-period spend, customer, gap and
+percentage figures. Appending or restating a period only
+touches that period, so a daily refresh over years of history costs
+O(new rows) plus a binary search, not a rescan.
+
+Usage:
+    python cac_incremental.py state.json --append ledger_today.csv --freq D
+    python cac_incremental.py state.json --restate ledger_revised.csv --freq D
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import sys
+
+STATE_VERSION = 1
+
+
+class IncrementalCAC:
+    """Running CAC aggregates that update in O(new periods)"""
+
+    def __init__(self, target_cac=150, freq=None):
+        self.target_cac = target_cac
+        # Period frequency of the labels (``cac_loader.PERIOD_LABELS``); None until first set
+        self.freq = freq
+        self.periods = {}
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._sorted = []
+        self.total_spend = 0.0
+        self.total_customers = 0
+
+    # Welford add/remove on the period CAC values
+
+    def _add_value(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        bisect.insort(self._sorted, value)
+
+    def _remove_value(self, value):
+        if self.count == 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+        else:
+            previous_mean = self.mean
+            self.count -= 1
+            self.mean = (previous_mean * (self.count + 1) - value) / self.count
+            self._m2 = max(self._m2 - (value - previous_mean) * (value - self.mean), 0.0)
+        del self._sorted[bisect.bisect_left(self._sorted, value)]
+
+    def upsert(self, label, cac=None, spend=None, new_customers=None, replace=True):
+        """Append period ``label`` or update it if it already exists
+
+        Pass either ``cac`` directly or the period's ``spend`` and
+        ``new_customers``. With ``replace=False`` spend and customers are added
+        to the period's existing totals (more ledger rows for the same period);
+        otherwise they restate the period.
+        """
+        existing = self.periods.get(label)
+        if spend is not None and new_customers is not None:
+            if existing is not None and not replace:
+                spend += existing.get("Spend") or 0.0
+                new_customers += existing.get("New_Customers") or 0
+            cac = round(spend / new_customers, 2) if new_customers > 0 else math.nan
+        elif cac is None:
+            raise ValueError("upsert needs either cac or spend and new_customers")
+
+        if existing is not None and not math.isnan(existing["CAC"]):
+            self._remove_value(existing["CAC"])
+        if not math.isnan(cac):
+            self._add_value(cac)
+        if existing is not None and existing["Spend"] is not None:
+            self.total_spend -= existing["Spend"]
+            self.total_customers -= existing["New_Customers"]
+        if spend is not None:
+            self.total_spend += spend
+            self.total_customers += new_customers
+
+        gap = cac - self.target_cac
+        self.periods[label] = {
+            "CAC": cac,
+            "Spend": spend,
+            "New_Customers": new_customers,
+            "Gap_to_Target": gap,
+            "Percentage_Above_Target": round(gap / self.target_cac * 100, 2),
+        }
+        return self.periods[label]
+
+    def set_target(self, target_cac):
+        """Change the target CAC and recompute every period's gap and percentage above target"""
+        self.target_cac = target_cac
+        for period in self.periods.values():
+            period["Gap_to_Target"] = period["CAC"] - target_cac
+            period["Percentage_Above_Target"] = round(period["Gap_to_Target"] / target_cac * 100, 2)
+        return self
+
+    def update(self, period_data, replace=True):
+        """Upsert every period of a loader-style dict (``cac_loader.load_period_data``)"""
+        spends = period_data.get("Spend")
+        customers = period_data.get("New_Customers")
+        for i, label in enumerate(period_data["Quarter"]):
+            if spends is not None and customers is not None:
+                self.upsert(label, spend=spends[i], new_customers=customers[i], replace=replace)
+            else:
+                self.upsert(label, cac=period_data["CAC"][i], replace=replace)
+        return self
+
+    @property
+    def weighted_cac(self):
+        """Ratio-of-sums CAC over all periods with spend and customer totals"""
+        return self.total_spend / self.total_customers if self.total_customers else math.nan
+
+    @property
+    def average_cac(self):
+        """Ratio-of-sums CAC when spend totals are known, else the mean period CAC"""
+        if self.total_customers:
+            return self.weighted_cac
+        return self.mean if self.count else math.nan
+
+    @property
+    def stats(self):
+        """Same statistics as ``cac_engine.compute_stats``, from the running aggregates"""
+        if not self.count:
+            return {}
+        values = self._sorted
+        middle = len(values) // 2
+        median = values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+        std = math.sqrt(self._m2 / self.count)
+        stats = {
+            'Mean CAC': self.mean,
+            'Median CAC': median,
+            'Standard Deviation': std,
+            'Min CAC': values[0],
+            'Max CAC': values[-1],
+            'Range': values[-1] - values[0],
+            'Coefficient of Variation': std / self.mean * 100,
+            'Total Gap from Target': self.average_cac - self.target_cac,
+            'Percentage Above Target': (self.average_cac - self.target_cac) / self.target_cac * 100,
+        }
+        if self.total_customers:
+            stats['Weighted Average CAC'] = self.weighted_cac
+            stats['Unweighted Average CAC'] = self.mean
+        return stats
+
+    def period_data(self):
+        """Periods in the CACAnalysis input layout"""
+        labels = list(self.periods)
+        data = {"Quarter": labels, "CAC": [self.periods[label]["CAC"] for label in labels]}
+        if all(self.periods[label]["Spend"] is not None for label in labels):
+            data["Spend"] = [self.periods[label]["Spend"] for label in labels]
+            data["New_Customers"] = [self.periods[label]["New_Customers"] for label in labels]
+        return data
+
+    def save(self, path):
+        """Persist the state atomically as JSON"""
+        state = {
+            "version": STATE_VERSION,
+            "target_cac": self.target_cac,
+            "freq": self.freq,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "total_spend": self.total_spend,
+            "total_customers": self.total_customers,
+            "periods": self.periods,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, target_cac=None, freq=None):
+        """Restore saved state, or start empty when ``path`` does not exist
+
+        A ``freq`` different from the one the state was built with raises
+        ``ValueError``, since the period labels would not line up. A
+        ``target_cac`` different from the saved one is applied with
+        ``set_target``; ``None`` keeps the saved target (150 for a new state).
+        """
+        if not os.path.exists(path):
+            return cls(150 if target_cac is None else target_cac, freq)
+        with open(path, encoding="utf-8") as handle:
+            state = json.load(handle)
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported incremental state version in {path!r}")
+        saved_freq = state.get("freq")
+        if freq is not None and saved_freq is not None and freq != saved_freq:
+            raise ValueError(f"State {path!r} holds {saved_freq!r} periods; cannot update it with {freq!r} periods")
+        engine = cls(state["target_cac"], saved_freq or freq)
+        engine.count, engine.mean, engine._m2 = state["count"], state["mean"], state["m2"]
+        engine.total_spend, engine.total_customers = state["total_spend"], state["total_customers"]
+        engine.periods = state["periods"]
+        engine._sorted = sorted(period["CAC"] for period in engine.periods.values() if not math.isnan(period["CAC"]))
+        if target_cac is not None and target_cac != engine.target_cac:
+            engine.set_target(target_cac)
+        return engine
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Incrementally update CAC statistics from new ledger rows")
+    parser.add_argument("state", help="JSON state file (created if missing)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--append", help="Ledger with new rows; added to existing period totals")
+    group.add_argument("--restate", help="Ledger with revised periods; replaces those periods' totals")
+    parser.add_argument("--freq", choices=["Q", "M", "Y", "D"], default=None,
+                        help="Period the ledger is aggregated into (default: the state's, or Q for a new state)")
+    parser.add_argument("--target", type=float, default=None,
+                        help="Target CAC (default: the state's, or 150 for a new state); a new value restates the gaps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    from cac_loader import load_period_data
+
+    args = parse_args(argv)
+    try:
+        engine = IncrementalCAC.load(args.state, target_cac=args.target, freq=args.freq)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    engine.freq = engine.freq or "Q"
+    ledger = args.append or args.restate
+    if ledger:
+        new_periods = load_period_data(ledger, freq=engine.freq)
+        engine.update(new_periods, replace=bool(args.restate))
+        print(f"✓ {'Restated' if args.restate else 'Updated'} {len(new_periods['Quarter'])} periods "
+              f"({len(engine.periods)} in state)")
+    if ledger or args.target is not None:
+        engine.save(args.state)
+    print(f"Target CAC: ${engine.target_cac:g} ({engine.freq} periods)")
+
+    print("\nStatistical Analysis:")
+    for key, value in engine.stats.items():
+        print(f"{key:.<30} ${value:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+CAC Data Loader
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Build CACAnalysis input from spend and acquisition ledgers on disk
+
+Ledgers are read in chunks with explicit column dtypes. Each chunk is reduced
+to per-period spend and new-customer totals before the next one is read, so
+only one chunk of raw rows is ever held in memory.
+"""
+
+import os
+import re
+
+import numpy as np
+
+DEFAULT_COLUMNS = {
+    "date": "date",
+    "spend": "spend",
+    "customers": "new_customers",
+}
+
+DEFAULT_DTYPES = {
+    "spend": "float64",
+    "customers": "int64",
+}
+
+PERIOD_LABELS = {
+    "Q": "Q%q %Y",
+    "M": "%b %Y",
+    "Y": "%Y",
+    "D": "%Y-%m-%d",
+}
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def detect_format(path):
+    """Infer the ledger format from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot infer ledger format from {path!r}; pass file_format='csv', 'parquet' or 'jsonl'")
+    return FORMATS[extension]
+
+
+def iter_ledger_chunks(path, file_format=None, columns=None, dtypes=None, chunksize=DEFAULT_CHUNKSIZE,
+                       segment_columns=None):
+    """Yield the date, spend, customer (and segment) columns of a ledger one chunk at a time"""
+    import pandas as pd
+
+    file_format = file_format or detect_format(path)
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    dtypes = {**DEFAULT_DTYPES, **(dtypes or {})}
+    segment_columns = list(segment_columns or [])
+    usecols = [columns["date"], columns["spend"], columns["customers"], *segment_columns]
+    column_dtypes = {
+        columns["date"]: "string",
+        columns["spend"]: dtypes["spend"],
+        columns["customers"]: dtypes["customers"],
+        **{column: "string" for column in segment_columns},
+    }
+
+    if file_format == "csv":
+        yield from pd.read_csv(path, usecols=usecols, dtype=column_dtypes, chunksize=chunksize)
+    elif file_format == "jsonl":
+        with pd.read_json(path, lines=True, dtype=False, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk[usecols].astype(column_dtypes)
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Reading Parquet ledgers requires pyarrow: pip install pyarrow") from exc
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=usecols):
+            chunk = batch.to_pandas()
+            chunk[columns["spend"]] = chunk[columns["spend"]].astype(dtypes["spend"])
+            chunk[columns["customers"]] = chunk[columns["customers"]].astype(dtypes["customers"])
+            for column in segment_columns:
+                chunk[column] = chunk[column].astype("string")
+            yield chunk
+    else:
+        raise ValueError(f"Unsupported ledger format: {file_format!r}")
+
+
+def aggregate_chunk(chunk, freq="Q", columns=None, segment_columns=None):
+    """Reduce one chunk of ledger rows to per-period (and per-segment) spend and new-customer totals"""
+    import pandas as pd
+
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    periods = pd.to_datetime(chunk[columns["date"]]).dt.to_period(freq).rename("Period")
+    keys = [periods, *(chunk[column] for column in segment_columns or [])]
+    totals = chunk[[columns["spend"], columns["customers"]]].groupby(keys, observed=True).sum()
+    totals.columns = ["Spend", "New_Customers"]
+    return totals
+
+
+def load_period_frame(path, freq="Q", file_format=None, columns=None, dtypes=None, chunksize=DEFAULT_CHUNKSIZE,
+                      segment_columns=None):
+    """Aggregate a ledger into one row per period (and segment) in a single pass
+
+    Returns a frame with a ``Period`` column (pandas periods at ``freq``),
+    the segment columns, and summed ``Spend`` and ``New_Customers``. Sums are
+    additive, so coarser rollups (see ``cac_rollup``) derive from this frame
+    without reading the ledger again.
+    """
+    if freq not in PERIOD_LABELS:
+        raise ValueError(f"Unsupported period frequency {freq!r}; expected one of {sorted(PERIOD_LABELS)}")
+
+    chunks = iter_ledger_chunks(path, file_format, columns, dtypes, chunksize, segment_columns)
+    frame = aggregate_chunks(chunks, freq, columns, segment_columns)
+    if frame is None:
+        raise ValueError(f"No ledger rows found in {path!r}")
+    return frame
+
+
+def aggregate_chunks(chunks, freq="Q", columns=None, segment_columns=None):
+    """Fold ledger chunks into one period (and segment) totals frame; None when there are no rows"""
+    totals = None
+    for chunk in chunks:
+        partial = aggregate_chunk(chunk, freq, columns, segment_columns)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+
+    if totals is None or totals.empty:
+        return None
+
+    frame = totals.sort_index().reset_index()
+    frame["New_Customers"] = frame["New_Customers"].astype("int64")
+    return frame
+
+
+def period_data_from_frame(frame, freq="Q"):
+    """Convert an unsegmented period frame into the CACAnalysis input layout
+
+    Returns a dict with period labels under ``'Quarter'`` (formatted for
+    ``freq``, e.g. ``'Q1 2024'`` or ``'Jan 2024'``), the period ``'CAC'`` and
+    the underlying ``'Spend'`` and ``'New_Customers'`` totals. Periods without
+    new customers have an undefined CAC and are reported as NaN.
+    """
+    spend = frame["Spend"].to_numpy(dtype="float64")
+    customers = frame["New_Customers"].to_numpy(dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cac = np.where(customers > 0, spend / customers, np.nan)
+
+    return {
+        "Quarter": [period.strftime(PERIOD_LABELS[freq]) for period in frame["Period"]],
+        "CAC": cac.round(2).tolist(),
+        "Spend": spend.tolist(),
+        "New_Customers": customers.astype("int64").tolist(),
+    }
+
+
+def parse_period_label(label):
+    """``pd.Period`` for a label in one of the ``PERIOD_LABELS`` formats; raises ``ValueError`` otherwise"""
+    import pandas as pd
+
+    label = str(label)
+    quarter = re.fullmatch(r"Q([1-4]) (\d{4})", label)
+    if quarter:
+        return pd.Period(year=int(quarter.group(2)), quarter=int(quarter.group(1)), freq="Q")
+    for freq in ("M", "Y", "D"):
+        try:
+            return pd.Period(pd.to_datetime(label, format=PERIOD_LABELS[freq]), freq=freq)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized period label {label!r}; expected one of the formats {sorted(PERIOD_LABELS.values())}")
+
+
+def period_order(periods):
+    """Positions that put ``periods`` in chronological order
+
+    Pandas periods, timestamps and numbers are ordered as they are; string
+    labels are parsed with ``parse_period_label``, so ``'Q4 2023'`` comes
+    before ``'Q1 2024'``. Raises ``ValueError`` when a label cannot be parsed
+    or labels of different frequencies are mixed.
+    """
+    import pandas as pd
+
+    index = pd.Index(periods)
+    if not (isinstance(index, (pd.PeriodIndex, pd.DatetimeIndex)) or pd.api.types.is_numeric_dtype(index)):
+        parsed = [label if isinstance(label, pd.Period) else parse_period_label(label) for label in index]
+        if len({period.freqstr for period in parsed}) > 1:
+            raise ValueError("Cannot order period labels of different frequencies")
+        index = pd.PeriodIndex(parsed)
+    return index.argsort(kind="stable")
+
+
+def load_period_data(path, freq="Q", file_format=None, columns=None, dtypes=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Aggregate a spend/acquisition ledger into the CACAnalysis input layout
+
+    See ``period_data_from_frame`` for the returned layout.
+    """
+    frame = load_period_frame(path, freq, file_format, columns, dtypes, chunksize)
+    return period_data_from_frame(frame, freq)
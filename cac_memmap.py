@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped CAC Backend
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Bounded-memory CAC analysis over very large series stored as .npy
+
+CAC values live in a ``.npy`` file and every kernel walks it through
+fixed-size memory-mapped windows: statistics stream through StreamingStats, and the gap
+and percentage-above-target series are written block by block into output
+memmaps with in-place ufuncs. Peak memory is a few blocks no matter how long
+the series is, instead of several full DataFrame columns.
+
+Usage:
+    python cac_memmap.py cac_daily.npy --target 150 --gaps gaps.npy --percentages pct.npy
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from cac_stats import StreamingStats
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def write_series(path, chunks, dtype="float64"):
+    """Write an iterable of value chunks to a ``.npy`` file without holding them all
+
+    Chunks are spooled to a raw side file first (the .npy header needs the
+    final length), then copied into the .npy memmap. Returns the length.
+    """
+    raw_path = f"{path}.raw"
+    length = 0
+    with open(raw_path, "wb") as raw:
+        for chunk in chunks:
+            block = np.ascontiguousarray(chunk, dtype=dtype)
+            raw.write(block.tobytes())
+            length += block.size
+    try:
+        target = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(length,))
+        if length:
+            source = np.memmap(raw_path, dtype=dtype, mode="r", shape=(length,))
+            for start in range(0, length, DEFAULT_BLOCK_SIZE):
+                target[start:start + DEFAULT_BLOCK_SIZE] = source[start:start + DEFAULT_BLOCK_SIZE]
+            del source
+        target.flush()
+        del target
+    finally:
+        os.remove(raw_path)
+    return length
+
+
+def _npy_layout(path):
+    """dtype, shape and data offset of a .npy file"""
+    with open(path, "rb") as handle:
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(handle)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(handle)
+        return dtype, shape, handle.tell()
+
+
+class MemmapCACSeries:
+    """A CAC series backed by a memory-mapped .npy file
+
+    Kernels map one block-sized window of the file at a time and drop it
+    before mapping the next, so resident memory (including mapped file
+    pages) stays at a few blocks.
+    """
+
+    def __init__(self, path, block_size=DEFAULT_BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self.dtype, shape, self._offset = _npy_layout(path)
+        if len(shape) != 1:
+            raise ValueError(f"Expected a 1-D CAC series in {path!r}, got shape {shape}")
+        self.length = shape[0]
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def values(self):
+        """The whole series as a read-only memmap (for random access)"""
+        return np.load(self.path, mmap_mode="r")
+
+    def _windows(self, path, dtype, offset, mode):
+        for start in range(0, self.length, self.block_size):
+            count = min(self.block_size, self.length - start)
+            window = np.memmap(path, dtype=dtype, mode=mode, offset=offset + start * dtype.itemsize, shape=(count,))
+            yield start, window
+            if mode != "r":
+                window.flush()
+            del window
+
+    def blocks(self):
+        """Yield ``(start, block)`` read-only windows over the series"""
+        yield from self._windows(self.path, self.dtype, self._offset, "r")
+
+    def _map_into(self, out_path, kernel):
+        """Create a float64 .npy at ``out_path`` and fill it block by block with ``kernel(block, out)``"""
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype="float64", shape=(self.length,))
+        del out
+        dtype, _, offset = _npy_layout(out_path)
+        outputs = self._windows(out_path, dtype, offset, "r+")
+        for (_, block), (_, window) in zip(self.blocks(), outputs):
+            kernel(block, window)
+        return np.load(out_path, mmap_mode="r")
+
+    def gaps(self, target_cac, out_path):
+        """Write ``CAC - target`` to a .npy file; returns it as a read-only memmap"""
+        return self._map_into(out_path, lambda block, out: np.subtract(block, target_cac, out=out))
+
+    def percentages_above(self, target_cac, out_path):
+        """Write the percentage above target (rounded to 2 places) to a .npy file"""
+        def kernel(block, out):
+            np.subtract(block, target_cac, out=out)
+            np.multiply(out, 100 / target_cac, out=out)
+            np.round(out, 2, out=out)
+
+        return self._map_into(out_path, kernel)
+
+    def stats(self, target_cac):
+        """Same statistics as ``cac_engine.compute_stats``, streamed block by block
+
+        Also reports how many observations sit above target. The median is
+        approximate once the series outgrows the quantile sketch.
+        """
+        summary = StreamingStats()
+        above = 0
+        for _, block in self.blocks():
+            summary.update(block)
+            above += int(np.count_nonzero(block > target_cac))
+        average_cac = summary.mean
+        return {
+            'Mean CAC': summary.mean,
+            'Median CAC': summary.median,
+            'Standard Deviation': summary.std,
+            'Min CAC': summary.min,
+            'Max CAC': summary.max,
+            'Range': summary.range,
+            'Coefficient of Variation': summary.coefficient_of_variation,
+            'Total Gap from Target': average_cac - target_cac,
+            'Percentage Above Target': ((average_cac - target_cac) / target_cac) * 100,
+            'Observations Above Target': above,
+        }
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Analyze a memory-mapped CAC series")
+    parser.add_argument("series", help="1-D .npy file of CAC values")
+    parser.add_argument("--target", type=float, default=150, help="Target CAC")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Values per processing block")
+    parser.add_argument("--gaps", help="Write the gap-to-target series to this .npy file")
+    parser.add_argument("--percentages", help="Write the percentage-above-target series to this .npy file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    series = MemmapCACSeries(args.series, block_size=args.block_size)
+    print(f"Analyzing {len(series):,} CAC observations from '{args.series}'")
+
+    print("\nStatistical Analysis:")
+    for key, value in series.stats(args.target).items():
+        if isinstance(value, float):
+            print(f"{key:.<30} ${value:.2f}")
+        else:
+            print(f"{key:.<30} {value}")
+
+    if args.gaps:
+        series.gaps(args.target, args.gaps)
+        print(f"\n✓ Gap to target saved as '{args.gaps}'")
+    if args.percentages:
+        series.percentages_above(args.target, args.percentages)
+        print(f"✓ Percentage above target saved as '{args.percentages}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
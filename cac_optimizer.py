@@ -0,0 +1,315 @@
+"""
+CAC Budget Optimizer
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Reallocate channel spend to minimize blended CAC or reach the target CAC
+
+Each channel's response is a power curve ``customers = scale * spend **
+elasticity`` (0 < elasticity < 1, i.e. diminishing returns) fitted by
+log-log least squares on the channel's period history, all channels at once.
+With concave curves, the allocation that minimizes blended CAC for a budget
+equalizes marginal customers per dollar across channels (water-filling):
+every channel's spend is a closed-form function of one multiplier, clipped to
+its bounds, and the multiplier is found by a safeguarded Newton search in log
+space warm-started from the previous solve. Re-solving after a constraint
+change typically takes a few vectorized iterations.
+
+Usage:
+    python cac_optimizer.py exports/ledger.csv --channel-column channel --budget 250000 --target 150
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+DEFAULT_ELASTICITY = 0.6
+ELASTICITY_BOUNDS = (0.05, 0.95)
+MAX_ITERATIONS = 100
+# Each expansion triples the multiplier bracket; more than this means no root exists
+MAX_BRACKET_STEPS = 60
+TOLERANCE = 1e-9
+
+
+def fit_response_curves(frame, channel_column="Channel", spend_column="Spend", customers_column="New_Customers"):
+    """Power-law spend-response curve per channel from period history
+
+    Fits ``log(customers) = log(scale) + elasticity * log(spend)`` for every
+    channel with grouped sums (no per-channel loop). Channels with fewer than
+    two distinct positive spend levels keep ``DEFAULT_ELASTICITY`` and are
+    scaled through their mean point. Returns ``Channel``, ``Scale``,
+    ``Elasticity``, ``Periods`` and ``Average_Spend`` (mean spend per period).
+    """
+    import pandas as pd
+
+    history = frame[[channel_column, spend_column, customers_column]]
+    average_spend = history.groupby(channel_column, observed=True, sort=True)[spend_column].mean()
+    positive = history[(history[spend_column] > 0) & (history[customers_column] > 0)]
+    logs = pd.DataFrame({
+        "channel": positive[channel_column].to_numpy(),
+        "x": np.log(positive[spend_column].to_numpy(dtype="float64")),
+        "y": np.log(positive[customers_column].to_numpy(dtype="float64")),
+    })
+    logs["xx"] = logs["x"] ** 2
+    logs["xy"] = logs["x"] * logs["y"]
+    sums = logs.groupby("channel", sort=True).agg(n=("x", "size"), x=("x", "sum"), y=("y", "sum"),
+                                                   xx=("xx", "sum"), xy=("xy", "sum"))
+    sums = sums.reindex(average_spend.index.rename("channel"), fill_value=0)
+
+    n = sums["n"].to_numpy(dtype="float64")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sxx = sums["xx"].to_numpy() - sums["x"].to_numpy() ** 2 / n
+        sxy = sums["xy"].to_numpy() - sums["x"].to_numpy() * sums["y"].to_numpy() / n
+        slope = np.where((n >= 2) & (sxx > 1e-12), sxy / sxx, DEFAULT_ELASTICITY)
+        elasticity = np.clip(np.nan_to_num(slope, nan=DEFAULT_ELASTICITY), *ELASTICITY_BOUNDS)
+        # Refit the intercept through the mean point so clipped slopes still match the data's level
+        log_scale = np.where(n > 0, (sums["y"].to_numpy() - elasticity * sums["x"].to_numpy()) / n, -np.inf)
+    return pd.DataFrame({
+        "Channel": average_spend.index.to_numpy(),
+        "Scale": np.exp(log_scale),
+        "Elasticity": elasticity,
+        "Periods": sums["n"].to_numpy(dtype="int64"),
+        "Average_Spend": average_spend.to_numpy(dtype="float64"),
+    })
+
+
+@dataclass(frozen=True)
+class Allocation:
+    """Optimal spend per channel with expected customers and blended CAC"""
+
+    channels: tuple
+    spend: np.ndarray
+    customers: np.ndarray
+    marginal_cac: np.ndarray
+    budget: float
+    blended_cac: float
+    feasible: bool
+    iterations: int
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({
+            "Channel": self.channels,
+            "Optimal_Spend": self.spend,
+            "Expected_Customers": self.customers,
+            "Channel_CAC": np.divide(self.spend, self.customers, out=np.full(len(self.spend), np.nan),
+                                     where=self.customers > 0),
+            "Marginal_CAC": self.marginal_cac,
+        })
+
+
+class BudgetOptimizer:
+    """Water-filling spend allocation over fitted response curves
+
+    ``lower`` and ``upper`` are per-channel spend bounds (arrays aligned with
+    the curves, or dicts keyed by channel); they can be changed between
+    solves with ``set_bounds`` and the next solve warm-starts from the last
+    multiplier.
+    """
+
+    def __init__(self, curves, lower=None, upper=None):
+        self.channels = tuple(curves["Channel"])
+        self.scale = curves["Scale"].to_numpy(dtype="float64")
+        self.elasticity = curves["Elasticity"].to_numpy(dtype="float64")
+        self.lower = np.zeros(len(self.channels))
+        self.upper = np.full(len(self.channels), np.inf)
+        # Channels that never converted cannot earn customers; pin them to their lower bound
+        self._active = self.scale > 0
+        self._exponent = 1 / (1 - self.elasticity)
+        self._coefficient = np.log(np.where(self._active, self.scale * self.elasticity, 1.0)) * self._exponent
+        self._log_multiplier = None
+        self.set_bounds(lower, upper)
+
+    def _aligned(self, bounds, default):
+        if bounds is None:
+            return None
+        if isinstance(bounds, dict):
+            unknown = set(bounds) - set(self.channels)
+            if unknown:
+                raise KeyError(f"Unknown channels in bounds: {sorted(map(str, unknown))}")
+            return np.array([bounds.get(channel, default[i]) for i, channel in enumerate(self.channels)],
+                            dtype="float64")
+        return np.broadcast_to(np.asarray(bounds, dtype="float64"), default.shape).copy()
+
+    def set_bounds(self, lower=None, upper=None):
+        """Update per-channel spend bounds (unspecified channels keep theirs)"""
+        lower = self._aligned(lower, self.lower)
+        upper = self._aligned(upper, self.upper)
+        if lower is not None:
+            self.lower = np.maximum(lower, 0)
+        if upper is not None:
+            self.upper = upper
+        if (self.lower > self.upper).any():
+            raise ValueError("Every channel's lower spend bound must not exceed its upper bound")
+        return self
+
+    def customers(self, spend):
+        """Expected customers per channel at ``spend``"""
+        return self.scale * np.power(spend, self.elasticity)
+
+    def _spend_at(self, log_multiplier):
+        """Spend where each channel's marginal customers per dollar equals exp(log_multiplier), clipped"""
+        with np.errstate(over="ignore"):
+            unclipped = np.exp(self._coefficient - self._exponent * log_multiplier)
+        spend = np.clip(np.where(self._active, unclipped, 0.0), self.lower, self.upper)
+        free = self._active & (spend > self.lower) & (spend < self.upper)
+        return spend, free
+
+    @property
+    def reachable_upper(self):
+        """Largest spend per channel: the upper bound, or the lower bound for channels that cannot convert"""
+        return np.where(self._active, self.upper, self.lower)
+
+    def _solve_multiplier(self, residual, start):
+        """Find log(multiplier) where ``residual`` (relative, decreasing in it) crosses zero
+
+        ``residual`` returns ``(value, slope)``. Newton steps in log space,
+        safeguarded by a bracket grown from the warm start; returns the root
+        and the iteration count. Raises ``ValueError`` when no bracket is found
+        within ``MAX_BRACKET_STEPS`` expansions.
+        """
+        low, high = start - 1.0, start + 1.0
+        for _ in range(MAX_BRACKET_STEPS):
+            if residual(low)[0] >= 0:
+                break
+            low -= 2 * (high - low)
+        else:
+            raise ValueError("No spend multiplier reaches the requested allocation")
+        for _ in range(MAX_BRACKET_STEPS):
+            if residual(high)[0] <= 0:
+                break
+            high += 2 * (high - low)
+        else:
+            raise ValueError("No spend multiplier reaches the requested allocation")
+        point = min(max(start, low), high)
+        for iteration in range(1, MAX_ITERATIONS + 1):
+            value, slope = residual(point)
+            if abs(value) <= TOLERANCE:
+                return point, iteration
+            if value > 0:
+                low = point
+            else:
+                high = point
+            step = point - value / slope if slope < 0 else None
+            point = step if step is not None and low < step < high else (low + high) / 2
+            if high - low < 1e-12:
+                break
+        return point, iteration
+
+    def _allocation(self, spend, iterations, feasible):
+        customers = self.customers(spend)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            marginal = np.where(self._active, 1 / (self.scale * self.elasticity * np.power(spend, self.elasticity - 1)),
+                                np.inf)
+            blended = spend.sum() / customers.sum() if customers.sum() > 0 else np.nan
+        return Allocation(self.channels, spend, customers, marginal, float(spend.sum()), float(blended),
+                          feasible, iterations)
+
+    def solve(self, budget):
+        """Allocation of ``budget`` that maximizes customers, i.e. minimizes blended CAC
+
+        Channels that never converted stay at their lower bound, so the budget
+        must lie between the lower bounds' total and ``reachable_upper``'s.
+        """
+        ceiling = self.reachable_upper
+        if not self.lower.sum() <= budget <= ceiling.sum():
+            raise ValueError(f"Budget {budget:,.2f} is outside the reachable range "
+                             f"[{self.lower.sum():,.2f}, {ceiling.sum():,.2f}]")
+
+        def residual(log_multiplier):
+            spend, free = self._spend_at(log_multiplier)
+            # d(spend)/d(log multiplier) = -exponent * spend on unclipped channels
+            return spend.sum() / budget - 1, -(self._exponent * spend)[free].sum() / budget
+
+        if budget == self.lower.sum() or budget == ceiling.sum():
+            bound = self.lower if budget == self.lower.sum() else ceiling
+            return self._allocation(bound.copy(), 0, True)
+        start = self._log_multiplier if self._log_multiplier is not None else 0.0
+        self._log_multiplier, iterations = self._solve_multiplier(residual, start)
+        spend, _ = self._spend_at(self._log_multiplier)
+        return self._allocation(spend, iterations, True)
+
+    def solve_for_target(self, target_cac):
+        """Largest-budget optimal allocation whose blended CAC meets ``target_cac``
+
+        Blended CAC of the optimal allocation rises with the budget, so the
+        multiplier is searched for where it equals the target. When even the
+        lower bounds miss the target, returns the lower-bound allocation with
+        ``feasible=False``; when the upper bounds beat it, the upper bounds.
+        """
+        def log_blended(log_multiplier):
+            spend, _ = self._spend_at(log_multiplier)
+            customers = self.customers(spend).sum()
+            return np.log(spend.sum() / customers) if customers > 0 else -np.inf
+
+        # With zero spend allowed, blended CAC tends to zero as spend shrinks (elasticity < 1)
+        floor = self._allocation(self.lower.copy(), 0, True)
+        if floor.customers.sum() > 0 and floor.blended_cac > target_cac:
+            return self._allocation(self.lower.copy(), 0, False)
+        ceiling = self._allocation(self.reachable_upper, 0, True)
+        if np.isfinite(ceiling.budget) and ceiling.blended_cac <= target_cac:
+            return ceiling
+
+        def residual(log_multiplier, step=1e-6):
+            value = log_blended(log_multiplier) - np.log(target_cac)
+            return value, (log_blended(log_multiplier + step) - np.log(target_cac) - value) / step
+
+        start = self._log_multiplier if self._log_multiplier is not None else 0.0
+        self._log_multiplier, iterations = self._solve_multiplier(residual, start)
+        spend, _ = self._spend_at(self._log_multiplier)
+        return self._allocation(spend, iterations, True)
+
+
+def parse_bounds(entries):
+    """``channel=low:high`` strings to lower/upper dicts (either side may be empty)"""
+    lower, upper = {}, {}
+    for entry in entries or []:
+        channel, _, bounds = entry.partition("=")
+        low, _, high = bounds.partition(":")
+        if not channel or not bounds:
+            raise ValueError(f"Bounds expect CHANNEL=LOW:HIGH, got {entry!r}")
+        if low:
+            lower[channel] = float(low)
+        if high:
+            upper[channel] = float(high)
+    return lower, upper
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Optimize channel spend allocation for blended CAC")
+    parser.add_argument("ledger", help="CSV, Parquet or JSON Lines ledger with a channel column")
+    parser.add_argument("--channel-column", default="channel", help="Ledger column holding the channel")
+    parser.add_argument("--freq", choices=["Q", "M", "Y", "D"], default="Q", help="Period for the response fit")
+    parser.add_argument("--budget", type=float, help="Total spend per period (default: current average)")
+    parser.add_argument("--target", type=float, default=150, help="Target blended CAC")
+    parser.add_argument("--bounds", action="append", default=[], metavar="CHANNEL=LOW:HIGH",
+                        help="Per-channel spend bounds per period (repeatable)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    from cac_loader import load_period_frame
+
+    args = parse_args(argv)
+    frame = load_period_frame(args.ledger, freq=args.freq, segment_columns=[args.channel_column])
+    curves = fit_response_curves(frame, channel_column=args.channel_column)
+    lower, upper = parse_bounds(args.bounds)
+    optimizer = BudgetOptimizer(curves, lower, upper)
+    budget = args.budget if args.budget is not None else curves["Average_Spend"].sum()
+
+    print(curves.to_string(index=False))
+    for label, allocation in (
+        (f"Minimum blended CAC for budget ${budget:,.2f}", optimizer.solve(budget)),
+        (f"Largest budget meeting target ${args.target:g}", optimizer.solve_for_target(args.target)),
+    ):
+        print(f"\n{label}: blended CAC ${allocation.blended_cac:.2f}, budget ${allocation.budget:,.2f}"
+              f"{'' if allocation.feasible else ' (target not reachable within bounds)'}")
+        print(allocation.to_frame().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
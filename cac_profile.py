@@ -0,0 +1,178 @@
+"""
+CAC Pipeline Profiling
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Per-stage and per-figure timing for the CAC pipeline
+
+A Profiler records wall time, CPU time, peak RSS and allocation counters
+for every stage it wraps. Install one with ``profiling(profiler)`` and the
+pipeline's ``stage(...)`` hooks report into it; without an active profiler
+the hooks are no-ops. Results print as a summary table and export as a
+Chrome trace (``chrome://tracing``, Perfetto, speedscope).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Profiler:
+    """Collects timing events for pipeline stages
+
+    With ``trace_allocations=True`` tracemalloc is switched on while the
+    profiler is active, and each stage also records the peak bytes allocated
+    inside it. Allocation tracing slows Python code down noticeably, so it
+    is off by default; the net allocated block count is always recorded.
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.trace_allocations = trace_allocations
+        self.events = []
+        self._lock = threading.Lock()
+        # Per-thread stack of the traced peak seen so far by each open stage
+        self._peaks = threading.local()
+
+    def _enter_peak(self):
+        stack = self._peaks.__dict__.setdefault("stack", [])
+        if stack:
+            # tracemalloc has one peak counter: bank it for the parent before the child resets it
+            stack[-1] = max(stack[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        stack.append(0)
+
+    def _exit_peak(self):
+        stack = self._peaks.stack
+        peak = max(stack.pop(), tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        tracemalloc.reset_peak()
+        return peak
+
+    @contextmanager
+    def stage(self, name, category="stage", **details):
+        """Time the enclosed block as one event
+
+        Stages may nest; an outer stage's ``peak_traced_mb`` covers its
+        children as well as its own allocations.
+        """
+        tracing = self.trace_allocations and tracemalloc.is_tracing()
+        if tracing:
+            self._enter_peak()
+        blocks = sys.getallocatedblocks()
+        start = time.time()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            details["allocated_blocks"] = sys.getallocatedblocks() - blocks
+            if tracing:
+                details["peak_traced_mb"] = self._exit_peak() / (1024 * 1024)
+            self.record(name, start, wall, cpu, category=category, **details)
+
+    def record(self, name, start, wall, cpu, category="stage", pid=None, **details):
+        """Add an event measured elsewhere, e.g. in a worker process
+
+        ``start`` is an epoch timestamp (``time.time()``), ``wall`` and
+        ``cpu`` are durations in seconds.
+        """
+        event = {
+            "name": name,
+            "category": category,
+            "start": start,
+            "wall": wall,
+            "cpu": cpu,
+            "pid": pid or os.getpid(),
+            "tid": threading.get_ident() if pid is None else 0,
+            "peak_rss_mb": peak_rss_mb() if pid is None else details.pop("peak_rss_mb", None),
+            **details,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def summary_table(self):
+        """Events as a fixed-width text table, in start order"""
+        header = f"{'Stage':<34}{'Wall (ms)':>12}{'CPU (ms)':>12}{'Peak RSS (MB)':>15}{'Net blocks':>12}"
+        lines = [header, "-" * len(header)]
+        for event in sorted(self.events, key=lambda event: event["start"]):
+            rss = event["peak_rss_mb"]
+            blocks = event.get("allocated_blocks")
+            lines.append(
+                f"{event['name'][:33]:<34}{event['wall'] * 1000:>12.2f}{event['cpu'] * 1000:>12.2f}"
+                f"{'' if rss is None else f'{rss:.1f}':>15}{'' if blocks is None else blocks:>12}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self):
+        """Events in Chrome trace event format (complete events, microseconds)"""
+        origin = min((event["start"] for event in self.events), default=0)
+        trace_events = []
+        for event in self.events:
+            args = {key: value for key, value in event.items()
+                    if key not in ("name", "category", "start", "wall", "pid", "tid")}
+            trace_events.append({
+                "name": event["name"],
+                "cat": event["category"],
+                "ph": "X",
+                "ts": (event["start"] - origin) * 1e6,
+                "dur": event["wall"] * 1e6,
+                "pid": event["pid"],
+                "tid": event["tid"],
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path):
+        """Write the Chrome trace JSON to ``path``"""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_chrome_trace(), handle)
+        return path
+
+
+@contextmanager
+def profiling(profiler):
+    """Make ``profiler`` the target of the pipeline's ``stage`` hooks"""
+    global _active
+    previous, _active = _active, profiler
+    started_tracing = profiler.trace_allocations and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield profiler
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _active = previous
+
+
+def active_profiler():
+    """The profiler installed with ``profiling``, if any"""
+    return _active
+
+
+def stage(name, category="stage", **details):
+    """Hook used by the pipeline: times the block when a profiler is active"""
+    if _active is None:
+        return nullcontext()
+    return _active.stage(name, category, **details)
@@ -0,0 +1,267 @@
+"""
+CAC Report Sinks
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Optional console and HTML outputs layered on top of cac_engine
+
+The engine only computes; these sinks are where printing and file writing
+happen. Each takes the pieces of a CACResult it needs, so callers can
+embed the engine and opt into exactly the outputs they want.
+"""
+
+import hashlib
+import os
+import time
+from functools import lru_cache
+
+from cac_profile import active_profiler, stage
+
+FIGURE_FILES = {
+    'trend': "cac_trend_analysis.html",
+    'gap': "cac_gap_analysis.html",
+    'dashboard': "cac_performance_dashboard.html",
+}
+
+
+@lru_cache(maxsize=1)
+def _plotlyjs_filename():
+    """Versioned, content-hashed file name of the installed plotly.js bundle (hashed once per process)"""
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    digest = hashlib.sha256(get_plotlyjs().encode("utf-8")).hexdigest()[:12]
+    return f"plotly-{get_plotlyjs_version()}.{digest}.min.js"
+
+
+def write_plotlyjs_asset(output_dir="."):
+    """Write the shared plotly.js bundle next to the reports and return its file name
+
+    The file name carries the plotly.js version and a hash of the bundle, so
+    reports always reference the exact source they were rendered against and
+    an unchanged bundle is only written once. The hash is computed once per
+    process; later calls only check that the file is still there.
+    """
+    filename = _plotlyjs_filename()
+    path = os.path.join(output_dir, filename)
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return filename
+
+
+def print_analysis(df, stats, cohorts=None):
+    """Print the period table and statistics
+
+    With per-cohort ``cohorts`` metrics (see ``cac_cohorts``) each period's
+    acquisition cohort LTV, LTV:CAC and payback are shown beside its CAC.
+    """
+    print("\n" + "="*60)
+    print("FINANCIAL SERVICES CAC ANALYSIS - 2024")
+    print("="*60)
+
+    print("\nQuarterly Performance:")
+    if cohorts is not None:
+        columns = cohorts[['Cohort', 'Customers', 'LTV', 'LTV_to_CAC', 'Payback_Months']].rename(
+            columns={'Cohort': 'Quarter', 'Customers': 'Cohort_Customers'}).round({'LTV': 2, 'LTV_to_CAC': 2})
+        df = df.merge(columns, on='Quarter', how='left')
+        unmatched = len(cohorts) - int(cohorts['Cohort'].isin(df['Quarter']).sum())
+        print(df.to_string(index=False))
+        if unmatched:
+            print(f"({unmatched} cohorts fall outside the analysis periods)")
+    else:
+        print(df.to_string(index=False))
+
+    print("\nStatistical Analysis:")
+    for key, value in stats.items():
+        if isinstance(value, float):
+            print(f"{key:.<30} ${value:.2f}")
+        else:
+            print(f"{key:.<30} {value}")
+
+
+def print_attribution(attribution, average_cac, method="Markov removal effect"):
+    """Print attributed conversions and channel CAC beside the blended average"""
+    print(f"\nAttributed Channel CAC ({method}; blended average ${average_cac:.2f}):")
+    print(attribution.sort_values('Credit_Share', ascending=False).to_string(index=False))
+
+
+def print_allocation(allocation, title):
+    """Print an optimized channel spend allocation"""
+    status = "" if allocation.feasible else " (target not reachable within the spend bounds)"
+    print(f"\n{title}: ${allocation.budget:,.2f} per period at blended CAC ${allocation.blended_cac:.2f}{status}")
+    print(allocation.to_frame().to_string(index=False))
+
+
+def print_simulation(simulation, target_cac):
+    """Print simulated CAC percentiles and the chance of reaching the target per period"""
+    percentiles = simulation['percentiles']
+    print(f"\nSimulated CAC ({simulation['paths']:,} paths, CAC factor {simulation['factor']:.3f}; "
+          f"target ${target_cac:g}):")
+    for i, label in enumerate(simulation['labels']):
+        print(f"{label}: median ${percentiles[50][i]:.2f} (5-95%: ${percentiles[5][i]:.2f} - "
+              f"${percentiles[95][i]:.2f})  P(at/below target) {simulation['prob_below'][i] * 100:.1f}%  "
+              f"P(reached by then) {simulation['prob_reached'][i] * 100:.1f}%")
+
+
+def print_intervals(stats, intervals, confidence):
+    """Print each statistic beside its bootstrap confidence interval"""
+    print(f"\nBootstrap {confidence * 100:g}% Confidence Intervals:")
+    for key, value in stats.items():
+        if key not in intervals:
+            continue
+        interval = intervals[key]
+        print(f"{key:.<30} ${value:.2f}  [${interval['lower']:.2f}, ${interval['upper']:.2f}]"
+              f"  (SE {interval['std_error']:.2f})")
+
+
+def print_insights(insights):
+    """Print findings, recommendations and solution focus"""
+    print("\n" + "="*60)
+    print("BUSINESS INSIGHTS & RECOMMENDATIONS")
+    print("="*60)
+
+    print("\nKEY FINDINGS:")
+    for i, finding in enumerate(insights['findings'], 1):
+        print(f"{i}. {finding}")
+
+    print("\nSTRATEGIC RECOMMENDATIONS:")
+    for i, rec in enumerate(insights['recommendations'], 1):
+        print(f"{i}. {rec}")
+
+    print("\nSOLUTION FOCUS: OPTIMIZE DIGITAL MARKETING CHANNELS")
+    for line in insights['solution_focus']:
+        print(f"- {line}")
+
+
+def print_result(result):
+    """Console sink for a complete CACResult"""
+    print_analysis(result.frame, result.stats)
+    print_insights(result.insights)
+
+
+def render_report(spec, path, include_plotlyjs=True):
+    """Build one figure from its spec and write it as HTML; returns ``path``
+
+    Module-level so it can run in worker processes.
+    """
+    import plotly.graph_objects as go
+
+    go.Figure(spec).write_html(path, include_plotlyjs=include_plotlyjs)
+    return path
+
+
+def _timed_render(name, spec, path, include_plotlyjs):
+    """Render one report in a worker and return its timings for the profiler"""
+    from cac_profile import peak_rss_mb
+
+    start = time.time()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    render_report(spec, path, include_plotlyjs)
+    return {
+        "name": f"render {name}",
+        "start": start,
+        "wall": time.perf_counter() - wall,
+        "cpu": time.thread_time() - cpu,
+        "pid": os.getpid(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _render_all(jobs, max_workers=None, executor="process"):
+    """Render ``(name, spec, path, include_plotlyjs)`` jobs, concurrently when worthwhile"""
+    if executor not in ("process", "thread"):
+        raise ValueError(f"Unknown executor: {executor!r}")
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        for name, spec, path, include_plotlyjs in jobs:
+            with stage(f"render {name}", category="figure"):
+                render_report(spec, path, include_plotlyjs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    profiler = active_profiler()
+    pool_class = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        for future in [pool.submit(_timed_render, *job) for job in jobs]:
+            timings = future.result()
+            if profiler is not None:
+                profiler.record(category="figure", **timings)
+
+
+def _report_path(output_dir, name):
+    return os.path.join(output_dir, FIGURE_FILES.get(name, f"cac_{name}.html"))
+
+
+def _figure_key(cache_key, name, include_plotlyjs):
+    return hashlib.sha256(f"{cache_key}:{name}:{include_plotlyjs}".encode("utf-8")).hexdigest()
+
+
+def restore_reports(names, output_dir=".", plotlyjs="inline", cache=None, cache_key=None):
+    """Restore cached reports before any figure is built
+
+    Returns the paths of the figures in ``names`` whose report for
+    ``cache_key`` was restored; build only the others and pass them to
+    ``write_reports`` with ``restore=False``.
+    """
+    if plotlyjs not in ("inline", "shared"):
+        raise ValueError(f"Unknown plotlyjs mode: {plotlyjs!r}")
+    if cache is None or cache_key is None:
+        return {}
+    os.makedirs(output_dir, exist_ok=True)
+    include_plotlyjs = write_plotlyjs_asset(output_dir) if plotlyjs == "shared" else True
+    paths = {}
+    for name in names:
+        path = _report_path(output_dir, name)
+        if cache.restore(_figure_key(cache_key, name, include_plotlyjs), path):
+            paths[name] = path
+    return paths
+
+
+def write_reports(figures, output_dir=".", plotlyjs="inline", cache=None, cache_key=None,
+                  max_workers=None, executor="process", restore=True):
+    """Render figure specs to HTML files and return their paths keyed by figure name
+
+    ``plotlyjs="inline"`` embeds the full plotly.js bundle in every report.
+    ``plotlyjs="shared"`` writes one versioned, content-hashed bundle into
+    ``output_dir`` and has each report load it by relative path, which keeps
+    the reports small and still works offline. Figures without an entry in
+    ``FIGURE_FILES`` are written as ``cac_<name>.html``.
+
+    With a ``cac_cache.ReportCache`` and a ``cache_key`` describing the
+    inputs (see ``cac_cache.report_key``), figures already rendered for the
+    same inputs and options are restored from the cache instead of rebuilt,
+    and freshly rendered ones are stored. ``restore=False`` skips the lookup
+    for callers that already restored the hits with ``restore_reports``.
+
+    Figures are independent, so the remaining ones are built and serialized
+    concurrently on a ``"process"`` (default) or ``"thread"`` pool of up to
+    ``max_workers`` workers (default: one per CPU). ``max_workers=1`` renders
+    them one after another in this process.
+    """
+    if plotlyjs not in ("inline", "shared"):
+        raise ValueError(f"Unknown plotlyjs mode: {plotlyjs!r}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    include_plotlyjs = write_plotlyjs_asset(output_dir) if plotlyjs == "shared" else True
+
+    paths = {}
+    jobs = []
+    uncached = []
+    for name, spec in figures.items():
+        path = _report_path(output_dir, name)
+        paths[name] = path
+        if cache is not None and cache_key is not None:
+            figure_key = _figure_key(cache_key, name, include_plotlyjs)
+            if restore and cache.restore(figure_key, path):
+                continue
+            uncached.append((figure_key, path))
+        jobs.append((name, spec, path, include_plotlyjs))
+
+    _render_all(jobs, max_workers=max_workers, executor=executor)
+    for figure_key, path in uncached:
+        cache.store(figure_key, path)
+    return paths
@@ -0,0 +1,61 @@
+"""
+CAC Rollups
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Ratio-of-sums CAC at any rollup level from spend and customer totals
+
+CAC for a group of periods or segments is total spend over total new
+customers, not the mean of the member CACs: a quarter with ten times the
+customers carries ten times the weight. Rollups are vectorized group-bys
+over the additive totals from ``cac_loader.load_period_frame``, so one pass
+over the ledger yields correct CAC at every granularity. The unweighted mean
+of member CACs is reported next to it for comparison.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def ratio_of_sums(spend, customers):
+    """Total spend over total new customers; NaN when there are no customers"""
+    spend = np.asarray(spend, dtype="float64")
+    customers = np.asarray(customers, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(customers > 0, spend / customers, np.nan)
+
+
+def blended_cac(spend, new_customers):
+    """Ratio-of-sums CAC over whole series"""
+    return float(ratio_of_sums(np.sum(spend), np.sum(new_customers)))
+
+
+def rollup_cac(frame, freq=None, by=None):
+    """Roll a period frame up to a coarser ``freq`` and/or segment columns ``by``
+
+    ``frame`` needs ``Spend`` and ``New_Customers`` columns, plus a
+    ``Period`` column of pandas periods when ``freq`` is given (e.g. ``'Y'``
+    to roll quarters or days up to years). Returns one row per group with the
+    summed totals, the member count, the ratio-of-sums ``CAC`` and the
+    ``Unweighted_CAC`` mean of member CACs. Without ``freq`` or ``by`` the
+    whole frame is one group.
+    """
+    keys = []
+    if freq is not None:
+        keys.append(frame["Period"].dt.asfreq(freq).rename("Period"))
+    keys.extend(frame[column] for column in by or [])
+
+    member_cac = pd.Series(ratio_of_sums(frame["Spend"], frame["New_Customers"]), index=frame.index)
+    if not keys:
+        return pd.DataFrame({
+            "Spend": [frame["Spend"].sum()],
+            "New_Customers": [frame["New_Customers"].sum()],
+            "Members": [len(frame)],
+            "CAC": [blended_cac(frame["Spend"], frame["New_Customers"])],
+            "Unweighted_CAC": [member_cac.mean()],
+        })
+
+    grouped = frame.groupby(keys, sort=True, observed=True)
+    rollup = grouped[["Spend", "New_Customers"]].sum()
+    rollup["Members"] = grouped.size()
+    rollup["CAC"] = ratio_of_sums(rollup["Spend"], rollup["New_Customers"])
+    rollup["Unweighted_CAC"] = member_cac.groupby(keys, sort=True, observed=True).mean()
+    return rollup.reset_index()
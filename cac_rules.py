@@ -0,0 +1,297 @@
+"""
+CAC Insight Rules
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Declarative rules evaluated as vectorized predicates over many segments
+
+Each rule names a condition ("above target by more than X%", "rising for N
+consecutive periods", "growth decelerating"), a threshold, severity bands,
+message templates and the recommendations it supports. Conditions are
+evaluated with numpy over a segments x periods CAC matrix, so every segment
+is tested in one pass; a single series is just a one-row matrix.
+"""
+
+from dataclasses import dataclass
+from string import Formatter
+
+import numpy as np
+
+SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+RULE_KINDS = ("above_target", "rising", "decelerating")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One declarative insight rule
+
+    ``kind`` selects the metric: ``above_target`` is the premium of the
+    segment's CAC level over its target in percent, ``rising`` the number of
+    consecutive period-over-period increases ending at the latest period, and
+    ``decelerating`` the number of consecutive periods in which positive CAC
+    growth slowed. The rule fires where the metric exceeds ``threshold``
+    (``rising``/``decelerating``: reaches it). ``severity`` is a tuple of
+    ``(minimum_metric, severity)`` bands, highest first; the first band the
+    metric meets wins. ``messages`` are ``str.format`` templates over the
+    evidence fields (``level``, ``target``, ``gap``, ``premium_pct``,
+    ``first``, ``last``, ``first_label``, ``last_label``, ``run``,
+    ``run_start``, ``run_start_label``, ``growth_prev``, ``growth_last``).
+    """
+
+    name: str
+    kind: str
+    threshold: float
+    severity: tuple
+    messages: tuple
+    recommendations: tuple = ()
+
+    def __post_init__(self):
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule kind {self.kind!r}; expected one of {RULE_KINDS}")
+        for _, severity in self.severity:
+            if severity not in SEVERITY_ORDER:
+                raise ValueError(f"Unknown severity {severity!r}; expected one of {SEVERITY_ORDER}")
+
+
+DEFAULT_RULES = (
+    Rule(
+        name="above_target",
+        kind="above_target",
+        threshold=0.0,
+        severity=((50.0, "critical"), (20.0, "high"), (0.0, "medium")),
+        messages=(
+            "Average CAC of ${level:.2f} is ${gap:.2f} above industry target",
+            "Company is paying {premium_pct:.1f}% premium over industry benchmark",
+        ),
+        recommendations=(
+            "Implement data-driven attribution modeling to identify highest-ROI marketing channels",
+            "Optimize digital marketing spend allocation based on channel-specific CAC performance",
+            "Conduct comprehensive audit of underperforming marketing channels",
+            "Negotiate better rates with marketing partners based on volume commitments",
+        ),
+    ),
+    Rule(
+        name="rising",
+        kind="rising",
+        threshold=2,
+        severity=((3, "high"), (2, "medium")),
+        messages=(
+            "Consistent upward trend from {run_start_label} (${run_start:g}) to {last_label} (${last:g})",
+            "Rising marketing costs indicate urgent need for channel optimization",
+        ),
+        recommendations=(
+            "Deploy marketing automation and personalization to improve conversion rates",
+            "Establish real-time CAC monitoring dashboard with automated alerts",
+            "Develop customer segmentation strategy for high-value, low-cost acquisition",
+            "Launch A/B testing framework for continuous campaign optimization",
+        ),
+    ),
+    Rule(
+        name="growth_decelerating",
+        kind="decelerating",
+        threshold=1,
+        severity=((1, "low"),),
+        messages=(
+            "CAC growth slowed from {growth_prev:.1f}% to {growth_last:.1f}% in {last_label}",
+        ),
+    ),
+)
+
+
+def _trailing_run(mask):
+    """Length of the run of True values ending at the last column of each row"""
+    if mask.shape[1] == 0:
+        return np.zeros(mask.shape[0], dtype=np.int64)
+    reversed_mask = mask[:, ::-1]
+    return np.where(reversed_mask.all(axis=1), mask.shape[1], reversed_mask.argmin(axis=1))
+
+
+def evidence(values, targets, level=None, labels=None):
+    """Evidence arrays (one entry per row of ``values``) used by every rule
+
+    ``values`` is a segments x periods CAC array (NaN for missing periods),
+    ``targets`` a scalar or per-segment array and ``level`` the CAC each
+    segment is judged on (defaults to the mean over its periods). Trends are
+    measured on the trailing periods, so a missing latest period breaks a run.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype="float64"))
+    n_segments, n_periods = values.shape
+    labels = np.asarray(labels if labels is not None else np.arange(1, n_periods + 1).astype(str), dtype=object)
+    targets = np.broadcast_to(np.asarray(targets, dtype="float64"), (n_segments,))
+    observed = ~np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if level is None:
+            level = np.nanmean(values, axis=1)
+        level = np.broadcast_to(np.asarray(level, dtype="float64"), (n_segments,))
+
+        rows = np.arange(n_segments)
+        first_index = observed.argmax(axis=1)
+        last_index = n_periods - 1 - observed[:, ::-1].argmax(axis=1)
+
+        growth = values[:, 1:] / values[:, :-1] * 100 - 100
+        rising = np.diff(values, axis=1) > 0
+        slowing = (growth[:, 1:] < growth[:, :-1]) & (growth[:, 1:] > 0)
+        rising_run = _trailing_run(rising)
+        run_start_index = n_periods - 1 - rising_run
+
+    return {
+        "level": level,
+        "target": targets,
+        "gap": level - targets,
+        "premium_pct": (level - targets) / targets * 100,
+        "first": values[rows, first_index],
+        "last": values[rows, last_index],
+        "first_label": labels[first_index],
+        "last_label": labels[last_index],
+        "run_start": values[rows, run_start_index],
+        "run_start_label": labels[run_start_index],
+        "rising_run": rising_run,
+        "slowing_run": _trailing_run(slowing),
+        "growth_prev": growth[:, -2] if n_periods > 2 else np.full(n_segments, np.nan),
+        "growth_last": growth[:, -1] if n_periods > 1 else np.full(n_segments, np.nan),
+    }
+
+
+def _metric(rule, fields):
+    if rule.kind == "above_target":
+        return fields["premium_pct"]
+    if rule.kind == "rising":
+        return fields["rising_run"]
+    return fields["slowing_run"]
+
+
+def evaluate(values, targets, rules=DEFAULT_RULES, level=None, labels=None):
+    """Evaluate ``rules`` over a segments x periods CAC array
+
+    Returns the evidence dict and, per rule, ``(rule, rows, metric, severity)``
+    where ``rows`` are the indices of the segments it fired for.
+    """
+    fields = evidence(values, targets, level=level, labels=labels)
+    fired = []
+    for rule in rules:
+        metric = np.asarray(_metric(rule, fields), dtype="float64")
+        with np.errstate(invalid="ignore"):
+            hit = metric > rule.threshold if rule.kind == "above_target" else metric >= rule.threshold
+            rows = np.flatnonzero(hit)
+            metric = metric[rows]
+            conditions = [metric >= minimum for minimum, _ in rule.severity]
+        severity = np.select(conditions, [name for _, name in rule.severity], default=rule.severity[-1][1])
+        fired.append((rule, rows, metric, severity))
+    return fields, fired
+
+
+def _template_fields(rule, fields, rows):
+    """Evidence arrays for ``rows``, with ``run`` bound to the rule's own run length"""
+    selected = {key: array[rows] for key, array in fields.items()}
+    selected["run"] = selected["rising_run" if rule.kind == "rising" else "slowing_run"]
+    return selected
+
+
+def render(rule, fields, row):
+    """Format a rule's message templates for one segment"""
+    values = {key: array[0] for key, array in _template_fields(rule, fields, [row]).items()}
+    return tuple(template.format(**values) for template in rule.messages)
+
+
+def render_column(rule, fields, rows):
+    """Format a rule's headline template for many segments"""
+    template = rule.messages[0]
+    used = {name for _, name, _, _ in Formatter().parse(template) if name}
+    selected = _template_fields(rule, fields, rows)
+    columns = [(name, selected[name]) for name in used]
+    return [template.format(**{name: array[i] for name, array in columns}) for i in range(len(rows))]
+
+
+def series_insights(cac_values, target_cac, level=None, labels=None, rules=DEFAULT_RULES):
+    """Findings, triggered recommendations and structured alerts for one CAC series"""
+    fields, fired = evaluate([list(cac_values)], target_cac, rules=rules, level=level, labels=labels)
+    findings = []
+    recommendations = []
+    alerts = []
+    for rule, rows, metric, severity in fired:
+        if not len(rows):
+            continue
+        messages = render(rule, fields, 0)
+        findings.extend(messages)
+        recommendations.extend(rec for rec in rule.recommendations if rec not in recommendations)
+        alerts.append({
+            "rule": rule.name,
+            "severity": str(severity[0]),
+            "metric": float(metric[0]),
+            "threshold": rule.threshold,
+            "message": messages[0] if messages else rule.name,
+        })
+    return tuple(findings), tuple(recommendations), tuple(alerts)
+
+
+def cac_matrix(frame, by, cac_column="CAC", period_column="Period"):
+    """Pivot a long segment/period frame into ``(segment_index, period_labels, values)``
+
+    Periods run in chronological order (``cac_loader.period_order``), so
+    string labels such as ``'Q4 2023'`` and ``'Q1 2024'`` are not sorted
+    alphabetically; labels that cannot be ordered raise ``ValueError``.
+    """
+    from cac_loader import period_order
+
+    matrix = frame.pivot_table(index=by, columns=period_column, values=cac_column,
+                               aggfunc="mean", observed=True, sort=True)
+    matrix = matrix.iloc[:, period_order(matrix.columns)]
+    labels = [str(period) for period in matrix.columns]
+    return matrix.index, labels, matrix.to_numpy(dtype="float64")
+
+
+def evaluate_rules(frame, by=None, target_cac=150, targets=None, rules=DEFAULT_RULES,
+                   cac_column="CAC", period_column="Period", messages=True):
+    """Evaluate ``rules`` for every segment of a long segment/period frame
+
+    Returns a tidy findings frame: the segment columns, ``Rule``,
+    ``Severity``, ``Metric`` (the quantity compared with the threshold),
+    ``Threshold``, evidence columns (``Level_CAC``, ``Target_CAC``,
+    ``Premium_Pct``, ``First_CAC``, ``Latest_CAC``, ``Rising_Periods``,
+    ``Growth_Last_Pct``) and, unless ``messages=False``, the rendered
+    headline ``Message``. Segments are judged on their ratio-of-sums CAC when
+    ``Spend`` and ``New_Customers`` are present, otherwise on mean CAC.
+    Rows are ordered by severity, then metric.
+    """
+    import pandas as pd
+
+    from cac_segments import DEFAULT_SEGMENT_COLUMNS, segment_targets
+
+    by = list(by or DEFAULT_SEGMENT_COLUMNS)
+    index, labels, values = cac_matrix(frame, by, cac_column=cac_column, period_column=period_column)
+    level = None
+    if "Spend" in frame.columns and "New_Customers" in frame.columns:
+        from cac_rollup import ratio_of_sums
+
+        totals = frame.groupby(by, sort=True, observed=True)[["Spend", "New_Customers"]].sum().reindex(index)
+        level = ratio_of_sums(totals["Spend"], totals["New_Customers"])
+    segment_target = segment_targets(targets, index, target_cac).to_numpy()
+
+    fields, fired = evaluate(values, segment_target, rules=rules, level=level, labels=labels)
+    segments = index.to_frame(index=False)
+    parts = []
+    for rule, rows, metric, severity in fired:
+        if not len(rows):
+            continue
+        part = segments.iloc[rows].reset_index(drop=True)
+        part["Rule"] = rule.name
+        part["Severity"] = severity
+        part["Metric"] = metric
+        part["Threshold"] = rule.threshold
+        part["Level_CAC"] = fields["level"][rows]
+        part["Target_CAC"] = fields["target"][rows]
+        part["Premium_Pct"] = fields["premium_pct"][rows]
+        part["First_CAC"] = fields["first"][rows]
+        part["Latest_CAC"] = fields["last"][rows]
+        part["Rising_Periods"] = fields["rising_run"][rows]
+        part["Growth_Last_Pct"] = fields["growth_last"][rows]
+        if messages and rule.messages:
+            part["Message"] = render_column(rule, fields, rows)
+        parts.append(part)
+
+    columns = by + ["Rule", "Severity", "Metric", "Threshold", "Level_CAC", "Target_CAC", "Premium_Pct",
+                    "First_CAC", "Latest_CAC", "Rising_Periods", "Growth_Last_Pct"] + (["Message"] if messages else [])
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    findings = pd.concat(parts, ignore_index=True)
+    findings["Severity"] = pd.Categorical(findings["Severity"], categories=SEVERITY_ORDER, ordered=True)
+    return findings.sort_values(["Severity", "Metric"], ascending=[True, False], ignore_index=True)
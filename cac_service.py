@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+CAC Analysis Service
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Long-running local HTTP service for CAC stats and figures
+
+One warm process answers the BI tool's requests instead of a fresh
+interpreter per call. Loaded datasets, CACResults and rendered HTML live in
+in-process LRU caches, and concurrent requests for the same result share a
+single computation. Heavy work runs in a thread pool so the asyncio loop
+keeps serving.
+
+Endpoints (all GET; ``dataset``, ``target`` and ``freq`` query parameters
+select the analysis, defaulting to the built-in 2024 quarters and $150):
+    /health
+    /datasets
+    /stats
+    /figures/<trend|gap|dashboard>.json
+    /figures/<trend|gap|dashboard>.html
+    /assets/plotly.min.js
+
+Usage:
+    python cac_service.py --port 8050 --dataset emea=exports/emea.csv --dataset apac=exports/apac.parquet
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_DATASET = "default"
+PLOTLYJS_ROUTE = "/assets/plotly.min.js"
+MAX_HEADER_LINES = 100
+
+
+class LRUCache:
+    """Small ordered-dict LRU used for datasets, results and rendered HTML"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_safe(value):
+    """Replace NaN/inf with None so the payload is strict JSON"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+class CACService:
+    """Cached, request-coalescing front end over cac_engine"""
+
+    def __init__(self, datasets=None, cache_size=128):
+        self.datasets = dict(datasets or {})
+        self.data_cache = LRUCache(cache_size)
+        self.result_cache = LRUCache(cache_size)
+        self.html_cache = LRUCache(cache_size)
+        self._inflight = {}
+        self._plotlyjs = None
+
+    async def _coalesced(self, cache, key, compute):
+        """Return the cached value for ``key`` or compute it once for all concurrent callers"""
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await asyncio.get_running_loop().run_in_executor(None, compute)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so waiter-less failures are not logged as unhandled
+            future.exception()
+            raise
+        else:
+            cache.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def _dataset_key(self, name, freq):
+        if name == DEFAULT_DATASET and name not in self.datasets:
+            return (name, freq, None)
+        if name not in self.datasets:
+            raise HTTPError(404, f"Unknown dataset: {name}")
+        # Including the modification time picks up refreshed exports
+        return (name, freq, os.path.getmtime(self.datasets[name]))
+
+    async def period_data(self, name, freq):
+        key = self._dataset_key(name, freq)
+        if key[2] is None:
+            from cac_engine import DEFAULT_QUARTERLY_DATA
+
+            return DEFAULT_QUARTERLY_DATA
+
+        def load():
+            from cac_loader import load_period_data
+
+            return load_period_data(self.datasets[name], freq=freq)
+
+        return await self._coalesced(self.data_cache, key, load)
+
+    async def result(self, name, freq, target_cac):
+        data_key = self._dataset_key(name, freq)
+        data = await self.period_data(name, freq)
+
+        def compute():
+            from cac_engine import analyze
+
+            return analyze(data, target_cac=target_cac)
+
+        return await self._coalesced(self.result_cache, (data_key, target_cac), compute)
+
+    async def figure_html(self, name, freq, target_cac, figure):
+        result = await self.result(name, freq, target_cac)
+        if figure not in result.figures:
+            raise HTTPError(404, f"Unknown figure: {figure}")
+
+        def render():
+            import plotly.io as pio
+
+            return pio.to_html(result.figures[figure], include_plotlyjs=PLOTLYJS_ROUTE, full_html=True)
+
+        key = (self._dataset_key(name, freq), target_cac, figure)
+        return await self._coalesced(self.html_cache, key, render)
+
+    async def plotlyjs(self):
+        if self._plotlyjs is None:
+            def load():
+                from plotly.offline import get_plotlyjs
+
+                return get_plotlyjs().encode("utf-8")
+
+            self._plotlyjs = await asyncio.get_running_loop().run_in_executor(None, load)
+        return self._plotlyjs
+
+    async def dispatch(self, path, query):
+        """Route one GET request; returns ``(content_type, body_bytes)``"""
+        name = query.get("dataset", [DEFAULT_DATASET])[0]
+        freq = query.get("freq", ["Q"])[0]
+        try:
+            target_cac = float(query.get("target", ["150"])[0])
+        except ValueError:
+            raise HTTPError(400, "target must be a number")
+        if target_cac <= 0:
+            raise HTTPError(400, "target must be positive")
+        if freq not in ("Q", "M", "Y", "D"):
+            raise HTTPError(400, "freq must be one of Q, M, Y, D")
+
+        if path == "/health":
+            return self._json({
+                "status": "ok",
+                "cache": {
+                    "datasets": len(self.data_cache),
+                    "results": len(self.result_cache),
+                    "html": len(self.html_cache),
+                    "result_hits": self.result_cache.hits,
+                    "result_misses": self.result_cache.misses,
+                },
+            })
+        if path == "/datasets":
+            return self._json({"datasets": [DEFAULT_DATASET, *sorted(set(self.datasets) - {DEFAULT_DATASET})]})
+        if path == "/stats":
+            result = await self.result(name, freq, target_cac)
+            return self._json({
+                "dataset": name,
+                "target_cac": result.target_cac,
+                "average_cac": result.average_cac,
+                "stats": dict(result.stats),
+                "periods": result.frame.to_dict(orient="records"),
+                "insights": {
+                    key: [dict(item) if isinstance(item, Mapping) else item for item in value]
+                    for key, value in result.insights.items()
+                },
+            })
+        if path.startswith("/figures/"):
+            figure, _, extension = path[len("/figures/"):].rpartition(".")
+            if extension == "json":
+                result = await self.result(name, freq, target_cac)
+                if figure not in result.figures:
+                    raise HTTPError(404, f"Unknown figure: {figure}")
+                return self._json(result.figures[figure])
+            if extension == "html":
+                html = await self.figure_html(name, freq, target_cac, figure)
+                return "text/html; charset=utf-8", html.encode("utf-8")
+        if path == PLOTLYJS_ROUTE:
+            return "application/javascript; charset=utf-8", await self.plotlyjs()
+        raise HTTPError(404, f"Not found: {path}")
+
+    @staticmethod
+    def _json(payload):
+        return "application/json", json.dumps(_json_safe(payload), default=float).encode("utf-8")
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection (keep-alive aware)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, "text/plain", b"Bad request", False)
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                if method != "GET":
+                    status, content_type, body = 405, "text/plain", b"Only GET is supported"
+                else:
+                    url = urlsplit(target)
+                    try:
+                        content_type, body = await self.dispatch(url.path, parse_qs(url.query))
+                        status = 200
+                    except HTTPError as exc:
+                        status, content_type, body = exc.status, "text/plain", exc.message.encode("utf-8")
+                    except Exception as exc:
+                        status, content_type, body = 500, "text/plain", f"{type(exc).__name__}: {exc}".encode("utf-8")
+                await self._respond(writer, status, content_type, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, content_type, body, keep_alive):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(service, host="127.0.0.1", port=8050):
+    """Run the service until cancelled"""
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"✓ CAC service listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Serve CAC stats and figures over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8050, help="Port to listen on")
+    parser.add_argument("--dataset", action="append", default=[], metavar="NAME=PATH",
+                        help="Register a CSV, Parquet or JSON Lines ledger under NAME (repeatable)")
+    parser.add_argument("--cache-size", type=int, default=128, help="Entries per in-process LRU cache")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    datasets = {}
+    for entry in args.dataset:
+        name, _, path = entry.partition("=")
+        if not name or not path:
+            raise SystemExit(f"--dataset expects NAME=PATH, got {entry!r}")
+        datasets[name] = os.path.abspath(path)
+    try:
+        asyncio.run(serve(CACService(datasets, args.cache_size), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+CAC Shapley Attribution
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Shapley-value channel attribution and per-channel CAC
+
+A coalition's value is the number of converted paths whose channels it
+covers. That game is a sum of unanimity games, one per converted path: a
+path pays its conversion only once every one of its channels is present. The
+Shapley value of a unanimity game splits its payoff evenly across the
+members, so each channel's exact Shapley value is the sum, over converted
+paths that touched it, of the path's conversions divided by its number of
+distinct channels. Paths are reduced to channel bitmasks as touchpoints
+stream in, and the values take one vectorized pass over the distinct masks.
+
+Usage:
+    python cac_shapley.py touchpoints.parquet --channel-spend channel_spend.csv
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from cac_attribution import (ChannelEncoder, DEFAULT_TOUCHPOINT_COLUMNS, attributed_cac, iter_touchpoint_chunks,
+                             path_boundaries, read_channel_spend)
+from cac_loader import DEFAULT_CHUNKSIZE
+
+MAX_CHANNELS = 64
+
+
+class ShapleyAttribution:
+    """Converted-path channel sets built incrementally from touchpoint chunks
+
+    Each path is reduced to the bitmask of channels it touched; only the
+    distinct masks of converted paths and their counts are kept.
+    """
+
+    def __init__(self):
+        self.encoder = ChannelEncoder()
+        self.path_masks = np.empty(0, dtype=np.uint64)
+        self.path_conversions = np.empty(0, dtype=np.int64)
+        self.touchpoints = 0
+        self._carry = None
+
+    @classmethod
+    def from_file(cls, path, file_format=None, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Build the path masks from a CSV, Parquet or JSON Lines touchpoint export"""
+        columns = {**DEFAULT_TOUCHPOINT_COLUMNS, **(columns or {})}
+        model = cls()
+        for chunk in iter_touchpoint_chunks(path, file_format, columns, chunksize):
+            model.update(chunk[columns["path"]].to_numpy(), chunk[columns["channel"]].to_numpy(),
+                         chunk[columns["converted"]].to_numpy())
+        return model.finish()
+
+    @property
+    def conversions(self):
+        return int(self.path_conversions.sum())
+
+    def _add(self, masks, converted):
+        masks = np.asarray(masks, dtype=np.uint64)[np.asarray(converted, dtype=bool)]
+        if not len(masks):
+            return
+        merged, inverse = np.unique(np.concatenate([self.path_masks, masks]), return_inverse=True)
+        weights = np.concatenate([self.path_conversions, np.ones(len(masks), dtype=np.int64)])
+        self.path_masks = merged
+        self.path_conversions = np.bincount(inverse.ravel(), weights=weights, minlength=len(merged)).astype(np.int64)
+
+    def update(self, path_ids, channels, converted):
+        """Fold one chunk of touchpoints (sorted by path) into the converted-path masks"""
+        path_ids = np.asarray(path_ids)
+        if not len(path_ids):
+            return self
+        codes = self.encoder.encode(channels)
+        if codes.max() >= MAX_CHANNELS:
+            raise ValueError(f"Shapley attribution supports at most {MAX_CHANNELS} channels")
+        bits = np.left_shift(np.uint64(1), codes.astype(np.uint64))
+        converted = np.asarray(converted).astype(bool)
+        self.touchpoints += len(path_ids)
+
+        new_path, continues = path_boundaries(path_ids, self._carry[0] if self._carry else None)
+        if self._carry is not None and not continues:
+            self._add([self._carry[1]], [self._carry[2]])
+        starts = np.flatnonzero(new_path)
+        segment_starts = np.concatenate(([0], starts)) if continues else starts
+        masks = np.bitwise_or.reduceat(bits, segment_starts)
+        path_converted = np.logical_or.reduceat(converted, segment_starts)
+        if continues:
+            masks[0] |= np.uint64(self._carry[1])
+            path_converted[0] |= self._carry[2]
+        self._add(masks[:-1], path_converted[:-1])
+        self._carry = (path_ids[-1], int(masks[-1]), bool(path_converted[-1]))
+        return self
+
+    def finish(self):
+        """Close the last open path; call once after the final chunk"""
+        if self._carry is not None:
+            self._add([self._carry[1]], [self._carry[2]])
+            self._carry = None
+        return self
+
+    def shapley_values(self):
+        """Exact Shapley values per channel
+
+        Returns a frame with ``Channel``, ``Attributed_Conversions`` (the
+        Shapley value) and ``Credit_Share``; channels seen only on
+        unconverted paths get zero credit.
+        """
+        import pandas as pd
+
+        names = self.encoder.names()
+        n_channels = max(self.encoder.codes.values(), default=-1) + 1
+        if n_channels == 0:
+            return pd.DataFrame(columns=["Channel", "Attributed_Conversions", "Credit_Share"])
+
+        members = (self.path_masks[:, None] >> np.arange(n_channels, dtype=np.uint64)) & np.uint64(1)
+        members = members.astype("float64")
+        # Each converted path splits its conversions evenly across the channels it touched
+        shares = self.path_conversions / np.maximum(members.sum(axis=1), 1)
+        values = shares @ members
+        present = np.array(sorted(names))
+        total = values[present].sum()
+        return pd.DataFrame({
+            "Channel": [names[code] for code in present],
+            "Attributed_Conversions": values[present],
+            "Credit_Share": values[present] / total if total else values[present],
+        })
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Shapley-value channel attribution from touchpoint paths")
+    parser.add_argument("touchpoints", help="CSV, Parquet or JSON Lines touchpoints sorted by path and time")
+    parser.add_argument("--channel-spend", help="File with channel and spend columns for per-channel CAC")
+    parser.add_argument("--average-cac", type=float, help="Blended CAC to compare channel CAC against")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Touchpoints per chunk")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    model = ShapleyAttribution.from_file(args.touchpoints, chunksize=args.chunksize)
+    credit = model.shapley_values()
+    spend = read_channel_spend(args.channel_spend) if args.channel_spend else None
+    print(f"Touchpoints: {model.touchpoints:,}  Conversions: {model.conversions:,}")
+    print(attributed_cac(credit, spend, args.average_cac).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+CAC Scenario Simulation
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Monte Carlo CAC trajectories under spend-shift scenarios
+
+CAC is modeled as a geometric random walk: each period's log change is
+normal with a drift and volatility fitted from the history, per slot of the
+season (quarter of the year) when there are enough observations for it.
+A spend scenario moves the whole path by the CAC factor implied by the
+power-law response curves of ``cac_optimizer``. Paths are drawn as a
+(paths x horizon) tensor in chunks bounded by ``MAX_CHUNK_ELEMENTS``:
+hitting probabilities are counted from running minima and per-period
+percentiles are folded into one ``QuantileSketch`` per period, so memory is
+flat however many paths are drawn. Chunks are seeded from
+``SeedSequence.spawn`` with a fixed chunk size, so a seed always gives the
+same result.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from cac_stats import QuantileSketch
+
+DEFAULT_PATHS = 1_000_000
+DEFAULT_HORIZON = 4
+PERCENTILES = (5, 25, 50, 75, 95)
+# Upper bound on path-tensor elements held at once
+MAX_CHUNK_ELEMENTS = 2_000_000
+SKETCH_SIZE = 400
+
+
+def fit_steps(cac_values, season_length=None):
+    """Drift and volatility of log CAC changes, one pair per season slot
+
+    The change into period ``i`` belongs to slot ``i % season_length``.
+    Slots get their own fit only when every slot has at least two changes;
+    otherwise all changes are pooled into a single slot. Returns two arrays
+    of equal length (1 or ``season_length``).
+    """
+    values = np.asarray(cac_values, dtype="float64")
+    observed = np.flatnonzero(np.isfinite(values) & (values > 0))
+    if len(observed) < 2:
+        return np.zeros(1), np.zeros(1)
+    changes = np.diff(np.log(values[observed]))
+    positions = observed[1:]
+    if season_length and season_length > 1 and len(changes) >= 2 * season_length:
+        slots = positions % season_length
+        counts = np.bincount(slots, minlength=season_length)
+        if counts.min() >= 2:
+            drift = np.bincount(slots, weights=changes, minlength=season_length) / counts
+            squares = np.bincount(slots, weights=(changes - drift[slots]) ** 2, minlength=season_length)
+            return drift, np.sqrt(squares / (counts - 1))
+    volatility = changes.std(ddof=1) if len(changes) > 1 else 0.0
+    return np.array([changes.mean()]), np.array([volatility])
+
+
+def scenario_factor(spend_shift=0.0, curves=None, elasticity=None):
+    """CAC multiplier for a relative spend change
+
+    ``spend_shift`` is either one fraction applied to every channel
+    (``0.1`` = +10%) or a mapping of channel to fraction. With response
+    ``curves`` (see ``cac_optimizer.fit_response_curves``) the blended CAC is
+    recomputed from each channel's curve at its shifted average spend;
+    without them, CAC scales as ``spend ** (1 - elasticity)``.
+    """
+    from cac_optimizer import DEFAULT_ELASTICITY
+
+    if curves is None:
+        if not np.isscalar(spend_shift):
+            raise ValueError("Per-channel spend shifts need fitted response curves")
+        elasticity = DEFAULT_ELASTICITY if elasticity is None else elasticity
+        return float((1 + spend_shift) ** (1 - elasticity))
+
+    channels = curves['Channel'].map(str)
+    if np.isscalar(spend_shift):
+        shifts = np.full(len(curves), float(spend_shift))
+    else:
+        unknown = set(map(str, spend_shift)) - set(channels)
+        if unknown:
+            raise ValueError(f"Unknown channels in spend shift: {', '.join(sorted(unknown))}")
+        shifts = channels.map({str(key): value for key, value in spend_shift.items()}).fillna(0.0).to_numpy()
+    if (shifts <= -1).any():
+        raise ValueError("Spend shifts must be greater than -100%")
+    scale = curves['Scale'].to_numpy()
+    exponent = curves['Elasticity'].to_numpy()
+    current = curves['Average_Spend'].to_numpy()
+    shifted = current * (1 + shifts)
+    current_cac = current.sum() / (scale * current ** exponent).sum()
+    return float(shifted.sum() / (scale * shifted ** exponent).sum() / current_cac)
+
+
+@dataclass(frozen=True)
+class Simulation:
+    """Summary of simulated CAC paths, one entry per future period
+
+    ``percentiles`` maps each percentile to an array of CAC values;
+    ``prob_below`` is the share of paths at or below the target in that
+    period and ``prob_reached`` the share that have been at or below it in
+    any period so far.
+    """
+
+    percentiles: dict
+    prob_below: np.ndarray
+    prob_reached: np.ndarray
+    paths: int
+    factor: float
+
+
+def simulate(start_cac, drift, volatility, horizon, target_cac, n_paths=DEFAULT_PATHS, factor=1.0,
+             first_slot=0, seed=0, percentiles=PERCENTILES):
+    """Draw ``n_paths`` CAC paths of ``horizon`` periods starting after ``start_cac``
+
+    Period ``t`` (0-based) uses slot ``(first_slot + t) % len(drift)`` of
+    ``drift`` and ``volatility``; ``factor`` scales every simulated period.
+    """
+    if horizon < 1 or n_paths < 1:
+        raise ValueError("Simulation needs a positive horizon and path count")
+    drift = np.asarray(drift, dtype="float64")
+    volatility = np.asarray(volatility, dtype="float64")
+    slots = (first_slot + np.arange(horizon)) % len(drift)
+    step_drift, step_volatility = drift[slots], volatility[slots]
+    origin = math.log(start_cac) + math.log(factor)
+    log_target = math.log(target_cac)
+
+    chunk = max(1, MAX_CHUNK_ELEMENTS // horizon)
+    sizes = [min(chunk, n_paths - begin) for begin in range(0, n_paths, chunk)]
+    sketches = [QuantileSketch(k=SKETCH_SIZE, seed=period) for period in range(horizon)]
+    below = np.zeros(horizon, dtype=np.int64)
+    reached = np.zeros(horizon, dtype=np.int64)
+    for child, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes):
+        paths = np.random.default_rng(child).standard_normal((size, horizon))
+        paths *= step_volatility
+        paths += step_drift
+        np.cumsum(paths, axis=1, out=paths)
+        paths += origin
+        hit = paths <= log_target
+        below += hit.sum(axis=0)
+        reached += np.logical_or.accumulate(hit, axis=1).sum(axis=0)
+        for period, sketch in enumerate(sketches):
+            sketch.update(paths[:, period])
+
+    # Sketches hold log CAC; percentiles commute with the monotone exp
+    return Simulation(
+        percentiles={p: np.exp([sketch.quantile(p / 100) for sketch in sketches]) for p in percentiles},
+        prob_below=below / n_paths,
+        prob_reached=reached / n_paths,
+        paths=n_paths,
+        factor=factor,
+    )
+
+
+def simulate_series(cac_values, labels, target_cac, horizon=DEFAULT_HORIZON, n_paths=DEFAULT_PATHS, factor=1.0,
+                    season_length=None, seed=0):
+    """Simulate one CAC series from its last value; returns a dict of future labels and per-period lists"""
+    from cac_forecast import future_labels
+
+    values = np.asarray(cac_values, dtype="float64")
+    observed = values[np.isfinite(values) & (values > 0)]
+    if not len(observed):
+        raise ValueError("Simulation needs at least one positive CAC value")
+    drift, volatility = fit_steps(values, season_length)
+    result = simulate(observed[-1], drift, volatility, horizon, target_cac, n_paths, factor,
+                      first_slot=len(values), seed=seed)
+    return {
+        "labels": future_labels(list(labels), horizon),
+        "percentiles": {p: cac.tolist() for p, cac in result.percentiles.items()},
+        "prob_below": result.prob_below.tolist(),
+        "prob_reached": result.prob_reached.tolist(),
+        "paths": result.paths,
+        "factor": result.factor,
+    }
+
+
+def parse_shifts(entries):
+    """``channel=percent`` strings to a dict of channel to fractional spend shift"""
+    shifts = {}
+    for entry in entries or []:
+        channel, _, percent = entry.partition("=")
+        if not channel or not percent:
+            raise ValueError(f"Spend shifts expect CHANNEL=PERCENT, got {entry!r}")
+        shifts[channel] = float(percent.rstrip("%")) / 100
+    return shifts
@@ -0,0 +1,174 @@
+"""
+CAC Streaming Statistics
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Single-pass, mergeable summary statistics for CAC series of any size
+
+StreamingStats keeps count, mean, variance (Welford), min and max in O(1)
+memory and can be fed one value or one chunk at a time. Accumulators built on
+separate chunks or partitions merge exactly (Chan et al. parallel update).
+The median comes from a KLL quantile sketch, which is exact until the sketch
+first compacts and approximate with bounded memory after that.
+"""
+
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch
+
+    Level ``h`` holds items that each stand for ``2**h`` observations. When a
+    level outgrows its capacity it is sorted and every other item is promoted,
+    so memory stays at roughly ``3 * k`` items regardless of the input size.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            leftover = items[len(items) - len(items) % 2:]
+            promoted = items[self._rng.integers(2):len(items) - len(leftover):2]
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Adding a level lowers the capacity of every level below it
+            level = 0
+
+    def update(self, values):
+        """Add a scalar or an array of observations"""
+        values = np.asarray(values, dtype="float64").ravel()
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    @property
+    def is_exact(self):
+        """True while no observation has been compacted away"""
+        return len(self.levels) == 1
+
+    def quantile(self, q):
+        """Estimate the ``q`` quantile (0 <= q <= 1)"""
+        if self.count == 0:
+            return math.nan
+        if self.is_exact:
+            return float(np.quantile(self.levels[0], q))
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(index, len(items) - 1)])
+
+
+class StreamingStats:
+    """Single-pass, mergeable count/mean/variance/min/max/median accumulator
+
+    NaN observations (for example periods without new customers) are ignored.
+    Variance and standard deviation are population statistics, matching
+    ``np.var`` and ``np.std``.
+    """
+
+    def __init__(self, sketch_size=200, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(sketch_size, seed)
+
+    def add(self, value):
+        """Add one observation with Welford's update"""
+        value = float(value)
+        if math.isnan(value):
+            return self
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.update(value)
+        return self
+
+    def update(self, values):
+        """Add a chunk of observations"""
+        values = np.asarray(values, dtype="float64").ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        chunk_mean = float(values.mean())
+        chunk = StreamingStats.__new__(StreamingStats)
+        chunk.count = values.size
+        chunk.mean = chunk_mean
+        chunk._m2 = float(np.dot(values - chunk_mean, values - chunk_mean))
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        chunk.sketch = QuantileSketch(self.sketch.k).update(values)
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """Fold another accumulator into this one (Chan et al. pairwise update)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self._m2 = other.count, other.mean, other._m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self._m2 += other._m2 + delta * delta * self.count * other.count / count
+            self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count else math.nan
+
+    @property
+    def range(self):
+        return self.max - self.min if self.count else math.nan
+
+    @property
+    def median(self):
+        return self.sketch.quantile(0.5)
+
+    @property
+    def coefficient_of_variation(self):
+        """Standard deviation as a percentage of the mean"""
+        return self.std / self.mean * 100 if self.count else math.nan
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+CAC History Store
+Contact: 22f3002203@ds.study.iitm.ac.in
+Purpose: Columnar spend/acquisition history with partition pruning
+
+Ledgers are ingested once into a Parquet dataset partitioned by
+year/month/channel (hive layout: ``year=2024/month=10/channel=search/``).
+Reads push the time window and segment filters down to pyarrow, so a
+Q4-only or single-channel analysis opens only the matching partitions and
+row groups, then aggregates them chunk by chunk like the file loader.
+Requires pyarrow.
+
+Usage:
+    python cac_store.py ingest cac_history exports/ledger_2024.csv
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import uuid
+
+from cac_loader import DEFAULT_CHUNKSIZE, DEFAULT_COLUMNS, aggregate_chunks, iter_ledger_chunks
+
+PARTITION_COLUMNS = ["year", "month", "channel"]
+
+
+def _as_date(value):
+    if value is None or isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value))
+
+
+class CACStore:
+    """Parquet dataset of ledger rows partitioned by year, month and channel"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def ingest(self, path, file_format=None, columns=None, channel_column="channel", chunksize=DEFAULT_CHUNKSIZE):
+        """Append a CSV, Parquet or JSON Lines ledger to the store; returns the rows written
+
+        Ledger columns are normalized to ``date``, ``spend``, ``new_customers``
+        and ``channel``. Ledgers without a channel column are stored under
+        ``channel=all``.
+        """
+        import pandas as pd
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("The CAC history store requires pyarrow: pip install pyarrow") from exc
+
+        columns = {**DEFAULT_COLUMNS, **(columns or {})}
+        segment_columns = [channel_column] if channel_column else []
+        batch_id = uuid.uuid4().hex
+        rows = 0
+        for chunk in iter_ledger_chunks(path, file_format, columns, None, chunksize, segment_columns):
+            dates = pd.to_datetime(chunk[columns["date"]])
+            table = pa.Table.from_pandas(pd.DataFrame({
+                "date": dates.dt.normalize(),
+                "spend": chunk[columns["spend"]].to_numpy(),
+                "new_customers": chunk[columns["customers"]].to_numpy(),
+                "year": dates.dt.year.astype("int32"),
+                "month": dates.dt.month.astype("int32"),
+                "channel": chunk[channel_column].fillna("unknown") if channel_column else "all",
+            }), preserve_index=False)
+            pq.write_to_dataset(
+                table,
+                self.root,
+                partition_cols=PARTITION_COLUMNS,
+                basename_template=f"part-{batch_id}-{rows}-{{i}}.parquet",
+            )
+            rows += table.num_rows
+        return rows
+
+    def _dataset(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+        except ImportError as exc:
+            raise ImportError("The CAC history store requires pyarrow: pip install pyarrow") from exc
+
+        partitioning = ds.partitioning(
+            pa.schema([("year", pa.int32()), ("month", pa.int32()), ("channel", pa.string())]),
+            flavor="hive",
+        )
+        return ds.dataset(self.root, format="parquet", partitioning=partitioning)
+
+    def filter_expression(self, start=None, end=None, channels=None):
+        """pyarrow filter for a date window and channel list
+
+        The year/month terms only reference partition columns, which lets
+        pyarrow skip whole directories; the date terms trim the edge months.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+        except ImportError as exc:
+            raise ImportError("The CAC history store requires pyarrow: pip install pyarrow") from exc
+
+        year, month, date = ds.field("year"), ds.field("month"), ds.field("date")
+        expression = None
+
+        def both(left, right):
+            return right if left is None else left & right
+
+        start, end = _as_date(start), _as_date(end)
+        if start is not None:
+            expression = both(expression, (year > start.year) | ((year == start.year) & (month >= start.month)))
+            expression = both(expression, date >= pa.scalar(datetime.datetime.combine(start, datetime.time()),
+                                                           type=pa.timestamp("ns")))
+        if end is not None:
+            expression = both(expression, (year < end.year) | ((year == end.year) & (month <= end.month)))
+            expression = both(expression, date <= pa.scalar(datetime.datetime.combine(end, datetime.time()),
+                                                           type=pa.timestamp("ns")))
+        if channels:
+            expression = both(expression, ds.field("channel").isin(list(channels)))
+        return expression
+
+    def scan(self, start=None, end=None, channels=None, batch_size=DEFAULT_CHUNKSIZE):
+        """Yield ledger rows inside the window and channels as pandas chunks"""
+        dataset = self._dataset()
+        expression = self.filter_expression(start, end, channels)
+        for batch in dataset.to_batches(columns=["date", "spend", "new_customers", "channel"],
+                                        filter=expression, batch_size=batch_size):
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def files(self, start=None, end=None, channels=None):
+        """Parquet files a scan with these predicates would open"""
+        dataset = self._dataset()
+        expression = self.filter_expression(start, end, channels)
+        return [fragment.path for fragment in dataset.get_fragments(filter=expression)]
+
+    def load_period_frame(self, freq="Q", start=None, end=None, channels=None, by_channel=False):
+        """Period (and optionally channel) totals for the selected history
+
+        Same layout as ``cac_loader.load_period_frame``.
+        """
+        segment_columns = ["channel"] if by_channel else None
+        frame = aggregate_chunks(self.scan(start, end, channels), freq, segment_columns=segment_columns)
+        if frame is None:
+            raise ValueError(f"No stored rows match start={start}, end={end}, channels={channels}")
+        return frame
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Manage the partitioned CAC history store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Append a ledger to the store")
+    ingest.add_argument("root", help="Store directory")
+    ingest.add_argument("ledger", help="CSV, Parquet or JSON Lines ledger")
+    ingest.add_argument("--channel-column", default="channel", help="Ledger column holding the channel ('' for none)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    store = CACStore(args.root)
+    rows = store.ingest(args.ledger, channel_column=args.channel_column or None)
+    print(f"✓ Ingested {rows:,} rows from '{args.ledger}' into '{os.path.abspath(args.root)}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
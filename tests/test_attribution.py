@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cac_attribution import CHANNEL_OFFSET, CONVERSION, NULL, MarkovAttribution, attributed_cac
+
+PATHS = [
+    (1, ["search", "social"], True),
+    (2, ["search"], True),
+    (3, ["social", "email", "search"], False),
+    (4, ["email"], True),
+    (5, ["social", "social"], False),
+    (6, ["email", "search"], True),
+]
+
+
+def _touchpoints():
+    rows = [(path_id, channel, outcome and i == len(touches) - 1)
+            for path_id, touches, outcome in PATHS for i, channel in enumerate(touches)]
+    return pd.DataFrame(rows, columns=["path_id", "channel", "converted"])
+
+
+def _model(chunk_size):
+    frame = _touchpoints()
+    model = MarkovAttribution()
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+        model.update(chunk["path_id"].to_numpy(), chunk["channel"].to_numpy(), chunk["converted"].to_numpy())
+    return model.finish()
+
+
+def _conversion_probability(probabilities, removed=None):
+    probabilities = probabilities.copy()
+    if removed is not None:
+        # Removing a channel sends everything that would enter it to NULL
+        probabilities[:, NULL] += probabilities[:, removed]
+        probabilities[:, removed] = 0
+    transient = [0] + list(range(CHANNEL_OFFSET, len(probabilities)))
+    q = probabilities[np.ix_(transient, transient)]
+    absorbed = np.linalg.solve(np.eye(len(transient)) - q, probabilities[transient, CONVERSION])
+    return absorbed[0]
+
+
+def test_removal_effects_match_removing_each_channel():
+    model = _model(chunk_size=100)
+    effects = model.removal_effects().set_index("Channel")
+    probabilities = model.transition_matrix()
+    base = _conversion_probability(probabilities)
+    for channel, code in model.encoder.codes.items():
+        expected = 1 - _conversion_probability(probabilities, code + CHANNEL_OFFSET) / base
+        assert effects.loc[channel, "Removal_Effect"] == pytest.approx(expected)
+    assert effects["Attributed_Conversions"].sum() == pytest.approx(4)
+    assert effects.loc["search", "Touchpoints"] == 4
+
+
+def test_paths_spanning_chunks_count_the_same_transitions():
+    assert np.array_equal(_model(chunk_size=100).counts, _model(chunk_size=1).counts)
+    assert _model(chunk_size=2).conversions == 4
+
+
+def test_from_file_and_attributed_cac(tmp_path):
+    path = tmp_path / "touchpoints.csv"
+    _touchpoints().assign(converted=lambda frame: frame["converted"].astype(int)).to_csv(path, index=False)
+    credit = MarkovAttribution.from_file(str(path), chunksize=3).removal_effects()
+    frame = attributed_cac(credit, {"search": 400.0, "social": 300.0}, average_cac=200)
+    by_channel = frame.set_index("Channel")
+    expected = 400.0 / by_channel.loc["search", "Attributed_Conversions"]
+    assert by_channel.loc["search", "Attributed_CAC"] == pytest.approx(expected)
+    assert by_channel.loc["search", "Gap_to_Average"] == pytest.approx(expected - 200)
+    # Channels missing from the spend file get no CAC rather than a free one
+    assert np.isnan(by_channel.loc["email", "Attributed_CAC"])
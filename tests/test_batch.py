@@ -0,0 +1,49 @@
+import json
+import os
+
+import pandas as pd
+
+import cac_batch
+from cac_batch import read_manifest, run_batch
+
+
+def _crash_or_succeed(task, timeout=None):
+    if task["unit"] == "crash":
+        os._exit(1)
+    return {"unit": task["unit"], "status": "ok"}
+
+
+def test_units_run_and_failures_are_recorded(tmp_path):
+    pd.DataFrame({"date": ["2024-01-05", "2024-04-05"], "spend": [1000.0, 2000.0],
+                  "new_customers": [5, 10]}).to_csv(tmp_path / "a.csv", index=False)
+    (tmp_path / "manifest.csv").write_text("unit,path,target_cac\na,a.csv,180\nmissing,missing.csv,\n")
+    output = tmp_path / "results.jsonl"
+    summary = run_batch(read_manifest(str(tmp_path / "manifest.csv")), output, workers=2)
+    results = {row["unit"]: row for row in map(json.loads, output.read_text().splitlines())}
+    assert summary == {"ok": 1, "error": 1}
+    assert results["a"]["average_cac"] == 200.0
+    assert results["a"]["target_cac"] == 180.0
+    assert "FileNotFoundError" in results["missing"]["error"]
+
+
+def test_a_crash_only_reruns_the_units_in_flight(tmp_path, monkeypatch):
+    isolated = []
+    run_isolated = cac_batch._run_isolated
+
+    def counting_run_isolated(tasks, timeout, record):
+        isolated.extend(task["unit"] for task in tasks)
+        return run_isolated(tasks, timeout, record)
+
+    monkeypatch.setattr(cac_batch, "analyze_unit", _crash_or_succeed)
+    monkeypatch.setattr(cac_batch, "_run_isolated", counting_run_isolated)
+    tasks = [{"unit": name} for name in ["u0", "u1", "crash"] + [f"u{i}" for i in range(2, 40)]]
+    output = tmp_path / "results.jsonl"
+    summary = run_batch(tasks, output, workers=2, max_retries=1)
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert summary == {"ok": 40, "error": 1}
+    assert sorted(row["unit"] for row in results) == sorted(task["unit"] for task in tasks)
+    assert [row["error"] for row in results if row["status"] == "error"] == ["worker process died"]
+    # The crashing unit runs isolated twice (retry included); at most one other unit was in flight
+    assert isolated.count("crash") == 2
+    assert len(isolated) <= 3
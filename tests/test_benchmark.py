@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+
+from cac_benchmark import STAGES, benchmark_pipeline, compare_runs, generate_ledger
+
+
+def test_generated_ledgers_are_seeded_and_chunked(tmp_path):
+    first = generate_ledger(str(tmp_path / "a.csv"), "daily", rows=250, seed=3, chunksize=100)
+    again = generate_ledger(str(tmp_path / "b.csv"), "daily", rows=250, seed=3, chunksize=100)
+    other = generate_ledger(str(tmp_path / "c.csv"), "daily", rows=250, seed=4, chunksize=100)
+    frame = pd.read_csv(first)
+    assert len(frame) == 250
+    assert list(frame.columns) == ["date", "spend", "new_customers"]
+    assert frame.equals(pd.read_csv(again))
+    assert not frame.equals(pd.read_csv(other))
+
+
+def test_pipeline_times_every_stage(tmp_path):
+    path = generate_ledger(str(tmp_path / "ledger.csv"), "quarterly", rows=40)
+    timings = benchmark_pipeline(path, "quarterly", repeat=1, output_dir=str(tmp_path / "reports"))
+    assert list(timings) == STAGES
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def _run(**seconds):
+    return {"results": [{"granularity": "daily", "rows": 1000, "stage": stage, "seconds": value}
+                        for stage, value in seconds.items()]}
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = _run(load=0.100, stats=0.0001, insights=0.050)
+    current = _run(load=0.125, stats=0.0005, insights=0.052)
+    regressions = compare_runs(baseline, current, threshold=0.10)
+    # stats is below the timer-noise floor; insights is within the threshold
+    assert [regression["stage"] for regression in regressions] == ["load"]
+    assert regressions[0]["change"] == pytest.approx(0.25)
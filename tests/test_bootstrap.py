@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from cac_bootstrap import STAT_NAMES, TASK_RESAMPLES, bootstrap_intervals, bootstrap_replicates
+from cac_engine import compute_stats
+
+CAC = np.array([210.0, 180.0, np.nan, 250.0, 199.5, 230.0, 205.0])
+SPEND = np.array([2100.0, 1800.0, 500.0, 2500.0, 1995.0, 2300.0, 2050.0])
+CUSTOMERS = np.array([10, 10, 0, 10, 10, 10, 10])
+
+
+def test_a_seed_gives_the_same_replicates_for_any_worker_count():
+    n_resamples = 2 * TASK_RESAMPLES + 17
+    _, in_process = bootstrap_replicates(CAC, 150, n_resamples=n_resamples, seed=7, workers=1)
+    _, pooled = bootstrap_replicates(CAC, 150, n_resamples=n_resamples, seed=7, workers=2)
+    _, other = bootstrap_replicates(CAC, 150, n_resamples=n_resamples, seed=8, workers=1)
+    assert in_process.shape == (n_resamples, len(STAT_NAMES))
+    assert np.array_equal(in_process, pooled, equal_nan=True)
+    assert not np.array_equal(in_process, other, equal_nan=True)
+
+
+def test_replicates_match_compute_stats_on_each_resample():
+    order = np.argsort(CAC, kind="stable")
+    rng = np.random.default_rng(np.random.SeedSequence(3).spawn(1)[0])
+    index = rng.integers(0, len(CAC), size=(50, len(CAC)), dtype=np.int32)
+    names, replicates = bootstrap_replicates(CAC, 150, SPEND, CUSTOMERS, n_resamples=50, seed=3, workers=1)
+    for row, positions in zip(replicates, index):
+        picked = order[positions]
+        weighted = SPEND[picked].sum() / CUSTOMERS[picked].sum()
+        expected = compute_stats(CAC[picked], weighted, 150, SPEND[picked], CUSTOMERS[picked])
+        assert dict(zip(names, row)) == pytest.approx(expected, nan_ok=True)
+
+
+def test_intervals_bracket_the_point_estimates():
+    intervals = bootstrap_intervals(CAC, 150, SPEND, CUSTOMERS, n_resamples=2000, seed=1, workers=1)
+    point = compute_stats(CAC, float(np.nansum(SPEND) / CUSTOMERS.sum()), 150, SPEND, CUSTOMERS)
+    for name in ('Mean CAC', 'Median CAC', 'Weighted Average CAC'):
+        assert intervals[name]['lower'] <= point[name] <= intervals[name]['upper']
+        assert intervals[name]['std_error'] > 0
+    with pytest.raises(ValueError, match="confidence"):
+        bootstrap_intervals(CAC, 150, confidence=1.5)
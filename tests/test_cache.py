@@ -0,0 +1,92 @@
+import itertools
+import multiprocessing
+
+import pytest
+
+import cac_cache
+from cac_cache import ReportCache, report_key
+
+
+@pytest.fixture(autouse=True)
+def ordered_clock(monkeypatch):
+    # Strictly increasing timestamps make the LRU order deterministic
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cac_cache.time, "time", lambda: float(next(ticks)))
+
+
+def _report(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def test_miss_store_then_hit(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"))
+    target = tmp_path / "out.html"
+    assert not cache.restore("k1", str(target))
+    cache.store("k1", _report(tmp_path, "rendered.html", "<html>one</html>"))
+
+    assert cache.restore("k1", str(target))
+    assert target.read_text() == "<html>one</html>"
+    # An identical file already in place is left untouched
+    assert cache.restore("k1", str(target))
+    assert cache.summary() == {"hits": 2, "misses": 1, "unchanged": 1, "entries": 1}
+
+    reopened = ReportCache(str(tmp_path / "cache"))
+    target.write_text("stale")
+    assert reopened.restore("k1", str(target))
+    assert target.read_text() == "<html>one</html>"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"), max_entries=2)
+    for key in ("a", "b"):
+        cache.store(key, _report(tmp_path, f"{key}.html", key))
+    assert cache.restore("a", str(tmp_path / "restored.html"))
+    cache.store("c", _report(tmp_path, "c.html", "c"))
+
+    assert not cache.restore("b", str(tmp_path / "restored.html"))
+    assert not (tmp_path / "cache" / "b.html").exists()
+    assert cache.restore("a", str(tmp_path / "restored.html"))
+    assert cache.restore("c", str(tmp_path / "restored.html"))
+
+
+def test_size_cap_evicts_oldest_first(tmp_path):
+    cache = ReportCache(str(tmp_path / "cache"), max_bytes=250)
+    for key in ("a", "b", "c"):
+        cache.store(key, _report(tmp_path, f"{key}.html", key * 100))
+    assert cache.summary()["entries"] == 2
+    assert not cache.restore("a", str(tmp_path / "restored.html"))
+
+
+def test_report_key_tracks_data_target_and_options():
+    data = {"Quarter": ["Q1 2024"], "CAC": [210.0]}
+    key = report_key(data, 150, plotlyjs="shared")
+    assert key == report_key({"Quarter": ["Q1 2024"], "CAC": [210.0]}, 150, plotlyjs="shared")
+    assert key != report_key(data, 160, plotlyjs="shared")
+    assert key != report_key(data, 150, plotlyjs="inline")
+    assert key != report_key({"Quarter": ["Q1 2024"], "CAC": [211.0]}, 150, plotlyjs="shared")
+
+
+def _store_many(directory, worker, count):
+    cache = ReportCache(directory)
+    for i in range(count):
+        path = f"{directory}/../src-{worker}-{i}.html"
+        with open(path, "w") as handle:
+            handle.write(f"{worker}-{i}")
+        cache.store(f"{worker}-{i}", path)
+
+
+@pytest.mark.skipif(cac_cache.fcntl is None, reason="index locking needs fcntl")
+def test_concurrent_writers_keep_every_entry(tmp_path, monkeypatch):
+    monkeypatch.undo()
+    directory = str(tmp_path / "cache")
+    ReportCache(directory)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_store_many, args=(directory, worker, 20)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    assert all(process.exitcode == 0 for process in workers)
+    assert ReportCache(directory).summary()["entries"] == 80
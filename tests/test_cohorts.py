@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from cac_cohorts import CohortLedger
+
+
+def _ledger():
+    ledger = CohortLedger("Q")
+    ledger.add_customers(["c2", "c1", "c3"], ["2024-01-15", "2024-02-01", "2024-04-10"])
+    return ledger
+
+
+def test_ltv_and_payback_per_cohort():
+    ledger = _ledger()
+    ledger.add_revenue(["c1", "c2", "c2", "c3"], ["2024-02-20", "2024-01-30", "2024-03-05", "2024-05-01"],
+                       [100.0, 60.0, 80.0, 50.0])
+    metrics = ledger.metrics({"Q1 2024": 100.0, "Q2 2024": 200.0}).set_index("Cohort")
+    assert metrics.loc["Q1 2024", "Customers"] == 2
+    assert metrics.loc["Q1 2024", "LTV"] == pytest.approx(120.0)
+    assert metrics.loc["Q1 2024", "LTV_to_CAC"] == pytest.approx(1.2)
+    # c1 pays 100 in month 1, c2 60 in month 1 and 80 in month 3: 80 then 120 per customer
+    assert metrics.loc["Q1 2024", "Payback_Months"] == 3
+    assert np.isnan(metrics.loc["Q2 2024", "Payback_Months"])
+    assert metrics.loc["Q2 2024", "Months_Observed"] == 2
+
+
+@pytest.mark.parametrize("unknown", ["c0", "c15", "c9"])
+def test_revenue_for_unknown_customers_is_set_aside(unknown):
+    ledger = _ledger()
+    ledger.add_revenue([unknown, "c1"], ["2024-02-20", "2024-02-20"], [70.0, 100.0])
+    assert ledger.unmatched_revenue == pytest.approx(70.0)
+    assert ledger.revenue.sum() == pytest.approx(100.0)
+
+
+def test_revenue_before_any_customer_is_unmatched():
+    ledger = CohortLedger("M")
+    ledger.add_revenue([7, 8], ["2024-01-01", "2024-01-02"], [10.0, 5.0])
+    assert ledger.unmatched_revenue == pytest.approx(15.0)
+    assert ledger.revenue.size == 0
+
+
+def test_state_round_trip_keeps_accumulating(tmp_path):
+    ledger = _ledger()
+    ledger.add_revenue(["c1"], ["2024-02-20"], [100.0])
+    # A customer added again keeps their first acquisition date
+    ledger.add_customers(["c1", "c4"], ["2024-07-01", "2024-07-02"])
+    path = ledger.save(str(tmp_path / "cohorts.npz"))
+
+    restored = CohortLedger.load(path)
+    restored.add_revenue(["c4", "c1"], ["2024-07-10", "2024-08-01"], [40.0, 20.0])
+    metrics = restored.metrics().set_index("Cohort")
+    assert list(metrics.index) == ["Q1 2024", "Q2 2024", "Q3 2024"]
+    assert metrics.loc["Q1 2024", "Revenue"] == pytest.approx(120.0)
+    assert metrics.loc["Q3 2024", "Revenue"] == pytest.approx(40.0)
+
+
+def test_rejects_unsupported_frequencies():
+    with pytest.raises(ValueError, match="Unsupported cohort frequency"):
+        CohortLedger("D")
+
+
+def test_numeric_and_string_ids_are_matched_across_chunks():
+    ledger = CohortLedger("Q")
+    ledger.add_customers(np.array([9, 10, 11]), ["2024-01-15"] * 3)
+    # A later chunk carries string ids (for example one with a non-numeric id)
+    ledger.add_customers(np.array(["12", "x7"]), ["2024-04-01"] * 2)
+    ledger.add_revenue(np.array([9, 12]), ["2024-05-01"] * 2, [10.0, 20.0])
+    ledger.add_revenue(np.array(["10", "x7", "13"]), ["2024-05-01"] * 3, [1.0, 2.0, 4.0])
+    assert list(ledger.customer_ids) == sorted(ledger.customer_ids)
+    assert ledger.unmatched_revenue == pytest.approx(4.0)
+    assert ledger.revenue.sum() == pytest.approx(33.0)
+    assert ledger.metrics().set_index("Cohort")["Customers"].to_dict() == {"Q1 2024": 3, "Q2 2024": 2}
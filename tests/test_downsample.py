@@ -0,0 +1,37 @@
+import numpy as np
+
+from cac_downsample import minmax_indices
+
+
+def test_minmax_keeps_bucket_extremes_after_an_all_nan_bucket():
+    rng = np.random.default_rng(0)
+    y = rng.uniform(100, 200, size=99)
+    y[10:20] = np.nan
+    y[93] = 1.0
+    y[95] = 500.0
+
+    # 10 buckets of 10 points; bucket 10-19 is all NaN
+    keep = minmax_indices(y, 22)
+
+    assert not np.isnan(y[keep]).any()
+    assert {93, 95} <= set(keep.tolist())
+    for start in range(0, 99, 10):
+        block = y[start:start + 10]
+        if np.isnan(block).all():
+            continue
+        assert start + int(np.nanargmin(block)) in keep
+        assert start + int(np.nanargmax(block)) in keep
+
+
+def test_webgl_is_chosen_from_the_downsampled_length():
+    import pandas as pd
+
+    from cac_engine import build_figures
+
+    cac = np.linspace(100, 300, 6000)
+    df = pd.DataFrame({"Quarter": [f"P{i}" for i in range(len(cac))], "CAC": cac,
+                       "Gap_to_Target": cac - 150, "Percentage_Above_Target": (cac - 150) / 150 * 100})
+    reduced = build_figures(df, 150, cac.mean(), max_points=2000, webgl_threshold=5000, names=["trend"])
+    full = build_figures(df, 150, cac.mean(), max_points=None, webgl_threshold=5000, names=["trend"])
+    assert reduced["trend"]["data"][0]["type"] == "scatter"
+    assert full["trend"]["data"][0]["type"] == "scattergl"
@@ -0,0 +1,48 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from cac_engine import DEFAULT_QUARTERLY_DATA, FIGURE_NAMES, analyze, build_figures, build_frame, compute_average_cac
+
+PERIODS = {
+    'Quarter': ['Q1 2024', 'Q2 2024', 'Q3 2024'],
+    'CAC': [200.0, 100.0, 160.0],
+    'Spend': [2000.0, 3000.0, 1600.0],
+    'New_Customers': [10, 30, 10],
+}
+
+
+def test_average_cac_weighs_periods_by_new_customers():
+    assert compute_average_cac(PERIODS) == pytest.approx(6600 / 50)
+    assert compute_average_cac(PERIODS, weighted=False) == pytest.approx(460 / 3)
+    assert compute_average_cac(DEFAULT_QUARTERLY_DATA) == pytest.approx(np.mean(DEFAULT_QUARTERLY_DATA['CAC']))
+
+
+def test_frame_has_gap_and_percentage_above_target():
+    frame = build_frame(PERIODS, 160)
+    assert frame['Gap_to_Target'].tolist() == [40.0, -60.0, 0.0]
+    assert frame['Percentage_Above_Target'].tolist() == [25.0, -37.5, 0.0]
+
+
+def test_analyze_is_a_read_only_result_without_side_effects(capsys, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = analyze(PERIODS, target_cac=150)
+    assert capsys.readouterr().out == ""
+    assert list(tmp_path.iterdir()) == []
+    assert result.average_cac == pytest.approx(132.0)
+    assert result.stats['Weighted Average CAC'] == pytest.approx(132.0)
+    assert result.stats['Unweighted Average CAC'] == pytest.approx(460 / 3)
+    assert tuple(result.figures) == FIGURE_NAMES
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.target_cac = 100
+    with pytest.raises(TypeError):
+        result.stats['Mean CAC'] = 0
+
+
+def test_analyze_without_figures_and_figure_subsets():
+    assert analyze(include_figures=False).figures == {}
+    frame = build_frame(DEFAULT_QUARTERLY_DATA, 150)
+    figures = build_figures(frame, 150, 230.88, names=['gap'])
+    assert list(figures) == ['gap']
+    assert figures['gap']['data'][0]['y'] == pytest.approx(frame['Gap_to_Target'].tolist())
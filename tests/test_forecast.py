@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from cac_forecast import forecast, forecast_segments, future_labels
+
+
+def test_segments_forecast_string_periods_in_chronological_order():
+    periods = ["Oct 2023", "Nov 2023", "Dec 2023", "Jan 2024", "Feb 2024", "Mar 2024"]
+    frame = pd.DataFrame({"Channel": "search", "Period": periods, "CAC": [100.0, 110, 120, 130, 140, 150]})
+    result = forecast_segments(frame.sample(frac=1, random_state=0), by=["Channel"], horizon=2, method="linear",
+                               include_baseline=False)
+    assert result["Forecast"].tolist() == pytest.approx([160.0, 170.0])
+
+
+def test_future_labels_follow_the_label_format():
+    assert future_labels(["Q4 2023"], 2) == ["Q1 2024", "Q2 2024"]
+    assert future_labels(["Dec 2023"], 1) == ["Jan 2024"]
+    assert future_labels(["2023"], 1) == ["2024"]
+    assert future_labels(["week 3"], 2) == ["+1", "+2"]
+
+
+@pytest.mark.parametrize("season_length, periods", [(None, 12), (4, 4)])
+def test_holt_winters_rejects_missing_seasons_cleanly(season_length, periods):
+    with pytest.raises(ValueError, match="Holt-Winters needs"):
+        forecast([100.0 + step for step in range(periods)], 2, "holt_winters", season_length)
+
+
+def test_cli_rejects_holt_winters_without_a_seasonal_freq(capsys):
+    from cac_analysis_github import parse_args
+
+    with pytest.raises(SystemExit):
+        parse_args(["--forecast", "2", "--forecast-method", "holt_winters", "--freq", "D"])
+    assert "seasonal --freq" in capsys.readouterr().err
@@ -0,0 +1,27 @@
+import pytest
+
+from cac_incremental import IncrementalCAC
+
+
+def _engine(freq="Q"):
+    engine = IncrementalCAC(target_cac=150, freq=freq)
+    engine.update({"Quarter": ["Q1 2024", "Q2 2024"], "Spend": [3000.0, 1500.0], "New_Customers": [15, 6]})
+    return engine
+
+
+def test_load_rejects_a_different_freq(tmp_path):
+    path = tmp_path / "state.json"
+    _engine("Q").save(path)
+    assert IncrementalCAC.load(path, freq="Q").freq == "Q"
+    with pytest.raises(ValueError, match="'Q' periods"):
+        IncrementalCAC.load(path, freq="M")
+
+
+def test_load_applies_a_new_target(tmp_path):
+    path = tmp_path / "state.json"
+    _engine().save(path)
+    assert IncrementalCAC.load(path).target_cac == 150
+    engine = IncrementalCAC.load(path, target_cac=200)
+    assert engine.target_cac == 200
+    assert engine.periods["Q2 2024"]["Gap_to_Target"] == pytest.approx(50.0)
+    assert engine.periods["Q2 2024"]["Percentage_Above_Target"] == pytest.approx(25.0)
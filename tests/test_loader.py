@@ -0,0 +1,57 @@
+import math
+
+import pandas as pd
+import pytest
+
+from cac_loader import load_period_data, load_period_frame, parse_period_label
+
+LEDGER = pd.DataFrame({
+    "date": ["2023-12-30", "2024-01-05", "2024-02-10", "2024-04-01", "2024-05-20", "2024-08-01"],
+    "spend": [500.0, 1000.0, 2000.0, 1500.0, 600.0, 900.0],
+    "new_customers": [5, 10, 10, 6, 4, 0],
+    "channel": ["search", "search", "social", "search", "social", "search"],
+})
+
+
+@pytest.fixture(params=["csv", "jsonl", "parquet"])
+def ledger_path(request, tmp_path):
+    path = tmp_path / f"ledger.{request.param}"
+    if request.param == "csv":
+        LEDGER.to_csv(path, index=False)
+    elif request.param == "jsonl":
+        LEDGER.to_json(path, orient="records", lines=True)
+    else:
+        pytest.importorskip("pyarrow")
+        LEDGER.to_parquet(path, index=False)
+    return str(path)
+
+
+def test_chunked_load_matches_whole_file_totals(ledger_path):
+    data = load_period_data(ledger_path, freq="Q", chunksize=2)
+    assert data["Quarter"] == ["Q4 2023", "Q1 2024", "Q2 2024", "Q3 2024"]
+    assert data["Spend"] == [500.0, 3000.0, 2100.0, 900.0]
+    assert data["New_Customers"] == [5, 20, 10, 0]
+    assert data["CAC"][:3] == [100.0, 150.0, 210.0]
+    # A period without new customers has an undefined CAC
+    assert math.isnan(data["CAC"][3])
+
+
+def test_segment_columns_and_monthly_periods(ledger_path):
+    frame = load_period_frame(ledger_path, freq="M", chunksize=4, segment_columns=["channel"])
+    assert len(frame) == 6
+    search = frame[frame["channel"] == "search"]
+    assert search["Spend"].sum() == pytest.approx(3900.0)
+
+
+def test_rejects_unknown_formats_and_frequencies(tmp_path):
+    with pytest.raises(ValueError, match="Cannot infer ledger format"):
+        load_period_data(str(tmp_path / "ledger.txt"))
+    with pytest.raises(ValueError, match="Unsupported period frequency"):
+        load_period_frame(str(tmp_path / "ledger.csv"), freq="W")
+
+
+@pytest.mark.parametrize("label, expected", [("Q4 2023", pd.Period("2023Q4", freq="Q")),
+                                             ("Jan 2024", pd.Period("2024-01", freq="M")),
+                                             ("2024-01-31", pd.Period("2024-01-31", freq="D"))])
+def test_parse_period_label(label, expected):
+    assert parse_period_label(label) == expected
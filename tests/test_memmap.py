@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from cac_engine import compute_stats
+from cac_memmap import MemmapCACSeries, write_series
+
+
+@pytest.fixture
+def series(tmp_path):
+    values = np.random.default_rng(5).lognormal(5, 0.3, size=1003)
+    path = tmp_path / "cac.npy"
+    assert write_series(str(path), np.array_split(values, 7)) == len(values)
+    return values, MemmapCACSeries(str(path), block_size=64)
+
+
+def test_write_series_round_trips(series):
+    values, mapped = series
+    assert len(mapped) == len(values)
+    assert np.array_equal(mapped.values, values)
+    assert [start for start, _ in mapped.blocks()][:3] == [0, 64, 128]
+
+
+def test_blocked_kernels_match_whole_array_arithmetic(series, tmp_path):
+    values, mapped = series
+    gaps = mapped.gaps(150, str(tmp_path / "gaps.npy"))
+    percentages = mapped.percentages_above(150, str(tmp_path / "pct.npy"))
+    assert np.array_equal(gaps, values - 150)
+    assert np.allclose(percentages, np.round((values - 150) * (100 / 150), 2))
+
+
+def test_stats_match_compute_stats(series):
+    values, mapped = series
+    stats = mapped.stats(150)
+    expected = compute_stats(values, values.mean(), 150)
+    for key in ('Mean CAC', 'Standard Deviation', 'Min CAC', 'Max CAC', 'Total Gap from Target'):
+        assert stats[key] == pytest.approx(expected[key])
+    assert stats['Observations Above Target'] == int((values > 150).sum())
+
+
+def test_rejects_multidimensional_arrays(tmp_path):
+    path = tmp_path / "grid.npy"
+    np.save(path, np.zeros((2, 3)))
+    with pytest.raises(ValueError, match="1-D"):
+        MemmapCACSeries(str(path))
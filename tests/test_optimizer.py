@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cac_optimizer import BudgetOptimizer, fit_response_curves
+
+
+def _curves(scale=(2.0, 3.0), elasticity=(0.6, 0.5)):
+    return pd.DataFrame({"Channel": ["a", "b"], "Scale": list(scale), "Elasticity": list(elasticity)})
+
+
+def test_fit_recovers_power_curves():
+    spend = np.array([100.0, 200.0, 400.0, 800.0])
+    frame = pd.DataFrame({"Channel": ["a"] * 4 + ["b"] * 4, "Spend": np.tile(spend, 2),
+                          "New_Customers": np.concatenate([2 * spend ** 0.6, 3 * spend ** 0.5])})
+    curves = fit_response_curves(frame)
+    assert curves["Elasticity"].tolist() == pytest.approx([0.6, 0.5])
+    assert curves["Scale"].tolist() == pytest.approx([2.0, 3.0])
+
+
+def test_solve_spends_the_budget_and_equalizes_marginal_cac():
+    allocation = BudgetOptimizer(_curves()).solve(5000)
+    assert allocation.spend.sum() == pytest.approx(5000)
+    assert allocation.marginal_cac[0] == pytest.approx(allocation.marginal_cac[1], rel=1e-6)
+
+
+def test_solve_respects_bounds():
+    allocation = BudgetOptimizer(_curves(), upper={"a": 1000}).solve(5000)
+    assert allocation.spend.tolist() == pytest.approx([1000, 4000])
+
+
+def test_infeasible_budget_is_rejected_instead_of_hanging():
+    # b never converts, so only a's upper bound of 1000 can be spent
+    optimizer = BudgetOptimizer(_curves(scale=(2.0, 0.0)), upper={"a": 1000})
+    with pytest.raises(ValueError, match="reachable range"):
+        optimizer.solve(5000)
+    assert optimizer.solve(1000).spend.tolist() == [1000, 0]
+
+
+def test_solve_for_target_meets_the_target():
+    allocation = BudgetOptimizer(_curves()).solve_for_target(150)
+    assert allocation.feasible
+    assert allocation.blended_cac == pytest.approx(150, rel=1e-6)
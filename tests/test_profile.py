@@ -0,0 +1,38 @@
+from cac_profile import Profiler, profiling, stage
+
+MB = 1024 * 1024
+
+
+def _peaks(profiler):
+    return {event["name"]: event["peak_traced_mb"] for event in profiler.events}
+
+
+def test_nested_stage_peak_includes_child_allocations():
+    profiler = Profiler(trace_allocations=True)
+    with profiling(profiler):
+        with stage("outer"):
+            with stage("inner"):
+                block = bytearray(20 * MB)
+                del block
+            with stage("after"):
+                pass
+
+    peaks = _peaks(profiler)
+    assert peaks["inner"] >= 20
+    assert peaks["after"] < 5
+    # The 20 MB freed inside "inner" still counts toward the enclosing stage
+    assert peaks["outer"] >= 20
+
+
+def test_parent_allocations_before_child_are_kept():
+    profiler = Profiler(trace_allocations=True)
+    with profiling(profiler):
+        with stage("outer"):
+            block = bytearray(10 * MB)
+            del block
+            with stage("inner"):
+                pass
+
+    peaks = _peaks(profiler)
+    assert peaks["inner"] < 5
+    assert peaks["outer"] >= 10
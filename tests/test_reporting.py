@@ -0,0 +1,29 @@
+import hashlib
+import os
+
+import cac_reporting
+from cac_reporting import write_plotlyjs_asset
+
+
+def test_plotlyjs_bundle_is_hashed_once_and_rewritten_when_missing(tmp_path, monkeypatch):
+    calls = []
+    sha256 = hashlib.sha256
+
+    def counting_sha256(data):
+        calls.append(len(data))
+        return sha256(data)
+
+    cac_reporting._plotlyjs_filename.cache_clear()
+    monkeypatch.setattr(cac_reporting.hashlib, "sha256", counting_sha256)
+    first = write_plotlyjs_asset(tmp_path)
+    assert write_plotlyjs_asset(tmp_path) == first
+    assert first.startswith("plotly-") and first.endswith(".min.js")
+
+    os.remove(tmp_path / first)
+    other = tmp_path / "other"
+    other.mkdir()
+    assert write_plotlyjs_asset(tmp_path) == first
+    assert write_plotlyjs_asset(other) == first
+    assert (tmp_path / first).stat().st_size > 1_000_000
+    assert (other / first).exists()
+    assert len(calls) == 1
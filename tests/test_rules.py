@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from cac_rules import cac_matrix, evaluate_rules
+
+
+def _frame(periods):
+    cac = [100.0 + 10 * step for step in range(len(periods))]
+    return pd.DataFrame({"Channel": "search", "Period": periods, "CAC": cac})
+
+
+def test_matrix_orders_string_periods_across_years():
+    frame = _frame(["Q3 2023", "Q4 2023", "Q1 2024", "Q2 2024"]).sample(frac=1, random_state=0)
+    _, labels, values = cac_matrix(frame, ["Channel"])
+    assert labels == ["Q3 2023", "Q4 2023", "Q1 2024", "Q2 2024"]
+    assert values[0].tolist() == [100.0, 110.0, 120.0, 130.0]
+
+
+def test_rules_read_the_latest_period_chronologically():
+    findings = evaluate_rules(_frame(["Nov 2023", "Dec 2023", "Jan 2024", "Feb 2024"]), by=["Channel"],
+                              target_cac=100)
+    assert (findings["Latest_CAC"] == 130.0).all()
+
+
+def test_matrix_rejects_labels_it_cannot_order():
+    with pytest.raises(ValueError, match="Unrecognized period label"):
+        cac_matrix(_frame(["early", "late"]), ["Channel"])
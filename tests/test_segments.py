@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cac_segments import segment_summary, segment_targets
+
+
+def _frame():
+    # search: 1000/10 and 9000/30 -> mean 200, ratio-of-sums 250
+    return pd.DataFrame({
+        "Channel": ["search", "search", "social", "social"],
+        "Period": ["Q1 2024", "Q2 2024", "Q1 2024", "Q2 2024"],
+        "CAC": [100.0, 300.0, 120.0, 130.0],
+        "Spend": [1000.0, 9000.0, 1200.0, 1300.0],
+        "New_Customers": [10, 30, 10, 10],
+    })
+
+
+def test_gap_is_measured_from_weighted_cac_when_totals_exist():
+    summary = segment_summary(_frame(), by=["Channel"], target_cac=200).set_index("Channel")
+    assert summary.loc["search", "Mean_CAC"] == pytest.approx(200)
+    assert summary.loc["search", "Weighted_CAC"] == pytest.approx(250)
+    assert summary.loc["search", "Gap_to_Target"] == pytest.approx(50)
+    assert summary.loc["search", "Percentage_Above_Target"] == pytest.approx(25)
+
+
+def test_gap_falls_back_to_mean_cac_without_totals():
+    frame = _frame().drop(columns=["Spend", "New_Customers"])
+    summary = segment_summary(frame, by=["Channel"], target_cac=200).set_index("Channel")
+    assert "Weighted_CAC" not in summary
+    assert summary.loc["search", "Gap_to_Target"] == pytest.approx(0)
+
+
+def test_numpy_scalar_targets_apply_to_every_segment():
+    index = pd.Index(["search", "social"], name="Channel")
+    targets = segment_targets(np.float32(175), index, 150)
+    assert targets.tolist() == [175, 175]
+    per_segment = segment_targets({"search": 120}, index, 150)
+    assert per_segment.tolist() == [120, 150]
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import cac_engine
+from cac_service import CACService, HTTPError, LRUCache
+
+
+def _get(service, path, **query):
+    return asyncio.run(service.dispatch(path, {key: [str(value)] for key, value in query.items()}))
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, 1, 3)
+    assert (len(cache), cache.hits, cache.misses) == (2, 3, 1)
+
+
+def test_concurrent_requests_share_one_analysis(monkeypatch):
+    calls = []
+    analyze = cac_engine.analyze
+
+    def slow_analyze(*args, **kwargs):
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return analyze(*args, **kwargs)
+
+    monkeypatch.setattr(cac_engine, "analyze", slow_analyze)
+    service = CACService()
+
+    async def burst():
+        return await asyncio.gather(*(service.result("default", "Q", 150.0) for _ in range(8)))
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert _get(service, "/stats")[1] == _get(service, "/stats")[1]
+    assert len(calls) == 1
+    assert service.result_cache.hits == 2
+
+
+def test_failed_computation_is_not_cached(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(cac_engine, "analyze", broken)
+    service = CACService()
+    with pytest.raises(RuntimeError):
+        _get(service, "/stats")
+    assert len(service.result_cache) == 0 and service._inflight == {}
+
+
+def test_stats_payload_and_refreshed_dataset(tmp_path):
+    export = tmp_path / "periods.csv"
+    export.write_text("date,spend,new_customers\n2024-01-15,2000,10\n2024-04-15,1000,10\n")
+    service = CACService({"emea": str(export)})
+    content_type, body = _get(service, "/stats", dataset="emea", target=100)
+    payload = json.loads(body)
+    assert content_type == "application/json"
+    assert payload["average_cac"] == pytest.approx(150.0)
+    assert [period["Gap_to_Target"] for period in payload["periods"]] == [100.0, 0.0]
+
+    export.write_text("date,spend,new_customers\n2024-01-15,4000,10\n2024-04-15,1000,10\n")
+    stamp = export.stat().st_mtime + 10
+    os.utime(export, (stamp, stamp))
+    assert json.loads(_get(service, "/stats", dataset="emea", target=100)[1])["average_cac"] == pytest.approx(250.0)
+
+
+@pytest.mark.parametrize("path, query, status", [
+    ("/stats", {"target": "abc"}, 400),
+    ("/stats", {"target": "-5"}, 400),
+    ("/stats", {"freq": "W"}, 400),
+    ("/stats", {"dataset": "missing"}, 404),
+    ("/figures/pie.json", {}, 404),
+    ("/nowhere", {}, 404),
+])
+def test_bad_requests(path, query, status):
+    with pytest.raises(HTTPError) as error:
+        _get(CACService(), path, **query)
+    assert error.value.status == status
+
+
+def test_http_round_trip_with_keep_alive():
+    async def exchange():
+        server = await asyncio.start_server(CACService().handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            replies = []
+            for path in ("/health", "/figures/gap.json"):
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                replies.append((head.split(b"\r\n")[0], json.loads(await reader.readexactly(length))))
+            writer.close()
+            return replies
+
+    (health_status, health), (figure_status, figure) = asyncio.run(exchange())
+    assert health_status == figure_status == b"HTTP/1.1 200 OK"
+    assert health["status"] == "ok"
+    assert figure["data"][0]["type"] == "bar"
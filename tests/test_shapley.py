@@ -0,0 +1,64 @@
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from cac_shapley import ShapleyAttribution
+
+PATHS = [
+    (1, ["search", "social"], True),
+    (2, ["search"], True),
+    (3, ["social", "email", "search"], True),
+    (4, ["email"], False),
+    (5, ["display", "social"], True),
+    (6, ["display"], False),
+]
+
+
+def _model(chunk_size=3):
+    path_ids, channels, converted = [], [], []
+    for path_id, touches, outcome in PATHS:
+        path_ids += [path_id] * len(touches)
+        channels += touches
+        converted += [False] * (len(touches) - 1) + [outcome]
+    model = ShapleyAttribution()
+    for start in range(0, len(path_ids), chunk_size):
+        model.update(path_ids[start:start + chunk_size], channels[start:start + chunk_size],
+                     converted[start:start + chunk_size])
+    return model.finish()
+
+
+def _exact_shapley(channels):
+    converted = [set(touches) for _, touches, outcome in PATHS if outcome]
+
+    def value(coalition):
+        return sum(path <= coalition for path in converted)
+
+    totals = dict.fromkeys(channels, 0.0)
+    orders = list(permutations(channels))
+    for order in orders:
+        coalition = set()
+        for channel in order:
+            before = value(coalition)
+            coalition.add(channel)
+            totals[channel] += value(coalition) - before
+    return {channel: total / len(orders) for channel, total in totals.items()}
+
+
+def test_closed_form_matches_permutation_shapley():
+    credit = _model().shapley_values().set_index("Channel")
+    exact = _exact_shapley(list(credit.index))
+    assert credit["Attributed_Conversions"].to_dict() == pytest.approx(exact)
+    assert credit["Attributed_Conversions"].sum() == pytest.approx(4.0)
+    assert credit.loc["email", "Attributed_Conversions"] == pytest.approx(1 / 3)
+
+
+def test_paths_split_across_chunks_give_the_same_values():
+    one_chunk = _model(chunk_size=100).shapley_values()
+    small_chunks = _model(chunk_size=1).shapley_values()
+    assert np.allclose(one_chunk["Attributed_Conversions"], small_chunks["Attributed_Conversions"])
+    assert one_chunk["Credit_Share"].sum() == pytest.approx(1.0)
+
+
+def test_empty_model_returns_an_empty_frame():
+    assert ShapleyAttribution().shapley_values().empty
@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cac_simulation
+from cac_simulation import fit_steps, parse_shifts, scenario_factor, simulate, simulate_series
+
+
+def test_fit_steps_pools_short_histories_and_splits_seasons():
+    drift, volatility = fit_steps([100, 110, np.nan, 121])
+    assert drift == pytest.approx([math.log(1.1)])
+    assert volatility == pytest.approx([0.0])
+
+    seasonal = 100 * np.exp(np.cumsum([0.0] + [0.1, -0.1] * 4))
+    drift, volatility = fit_steps(seasonal, season_length=2)
+    assert drift == pytest.approx([-0.1, 0.1])
+    assert volatility == pytest.approx([0.0, 0.0])
+    assert fit_steps([100.0])[0].tolist() == [0.0]
+
+
+def test_same_seed_gives_the_same_simulation(monkeypatch):
+    monkeypatch.setattr(cac_simulation, "MAX_CHUNK_ELEMENTS", 1000)
+    first = simulate(200, [0.0], [0.1], 4, 190, n_paths=5000, seed=11)
+    again = simulate(200, [0.0], [0.1], 4, 190, n_paths=5000, seed=11)
+    other = simulate(200, [0.0], [0.1], 4, 190, n_paths=5000, seed=12)
+    assert np.array_equal(first.prob_reached, again.prob_reached)
+    assert np.array_equal(first.percentiles[50], again.percentiles[50])
+    assert not np.array_equal(first.prob_below, other.prob_below)
+
+
+def test_probabilities_match_the_random_walk(monkeypatch):
+    monkeypatch.setattr(cac_simulation, "MAX_CHUNK_ELEMENTS", 50_000)
+    drift, volatility, target = -0.02, 0.1, 190
+    result = simulate(200, [drift], [volatility], 3, target, n_paths=200_000, seed=3)
+    steps = np.arange(1, 4)
+    z = (math.log(target / 200) - drift * steps) / (volatility * np.sqrt(steps))
+    expected = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    assert result.prob_below == pytest.approx(expected, abs=0.01)
+    assert np.all(np.diff(result.prob_reached) >= 0)
+    assert np.all(result.prob_reached >= result.prob_below)
+    assert result.percentiles[50] == pytest.approx(200 * np.exp(drift * steps), rel=0.01)
+
+
+def test_deterministic_paths_and_spend_factor():
+    result = simulate(200, [0.0], [0.0], 2, 150, n_paths=10, factor=0.7)
+    assert result.percentiles[50] == pytest.approx([140.0, 140.0])
+    assert result.prob_below.tolist() == [1.0, 1.0]
+    with pytest.raises(ValueError, match="positive horizon"):
+        simulate(200, [0.0], [0.0], 0, 150)
+
+
+def test_simulate_series_labels_future_periods():
+    simulated = simulate_series([225.6, 228.97, 234.24, 234.71], ['Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024'],
+                                150, horizon=2, n_paths=100)
+    assert simulated["labels"] == ['Q1 2025', 'Q2 2025']
+    assert len(simulated["prob_below"]) == 2
+    with pytest.raises(ValueError, match="positive CAC"):
+        simulate_series([np.nan, 0.0], ['Q1 2024', 'Q2 2024'], 150)
+
+
+def test_scenario_factor_from_elasticity_and_curves():
+    assert scenario_factor(0.0) == 1.0
+    assert scenario_factor(0.21, elasticity=0.5) == pytest.approx(1.1)
+    curves = pd.DataFrame({
+        'Channel': ['search', 'social'],
+        'Scale': [1.0, 1.0],
+        'Elasticity': [0.5, 0.5],
+        'Average_Spend': [100.0, 100.0],
+    })
+    assert scenario_factor(0.21, curves) == pytest.approx(1.1)
+    assert scenario_factor({'social': 0.0}, curves) == pytest.approx(1.0)
+    with pytest.raises(ValueError, match="Unknown channels"):
+        scenario_factor({'tv': 0.1}, curves)
+    with pytest.raises(ValueError, match="greater than -100%"):
+        scenario_factor(-1.0, curves)
+    with pytest.raises(ValueError, match="response curves"):
+        scenario_factor({'search': 0.1})
+
+
+def test_parse_shifts():
+    assert parse_shifts(["search=10%", "social=-25"]) == {"search": 0.1, "social": -0.25}
+    assert parse_shifts(None) == {}
+    with pytest.raises(ValueError, match="CHANNEL=PERCENT"):
+        parse_shifts(["search"])
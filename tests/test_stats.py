@@ -0,0 +1,40 @@
+import math
+
+import numpy as np
+import pytest
+
+from cac_engine import compute_stats
+from cac_stats import QuantileSketch, StreamingStats
+
+
+def _daily_cac(n=731):
+    return np.random.default_rng(4).lognormal(5, 0.3, size=n)
+
+
+def test_compute_stats_median_is_exact_beyond_the_sketch_size():
+    values = _daily_cac()
+    values[::50] = np.nan
+    stats = compute_stats(values, average_cac=200, target_cac=150)
+    assert stats['Median CAC'] == np.nanmedian(values)
+    assert stats['Mean CAC'] == pytest.approx(np.nanmean(values))
+
+
+def test_compute_stats_without_observations():
+    stats = compute_stats([math.nan], average_cac=math.nan, target_cac=150)
+    assert math.isnan(stats['Median CAC'])
+
+
+def test_streaming_stats_merge_matches_numpy():
+    values = _daily_cac()
+    merged = StreamingStats().update(values[:300]).merge(StreamingStats().update(values[300:]))
+    assert merged.count == len(values)
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.std == pytest.approx(values.std())
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_sketch_is_exact_until_it_compacts_and_close_after():
+    values = _daily_cac()
+    assert QuantileSketch(k=1000).update(values).quantile(0.5) == pytest.approx(np.median(values))
+    approximate = QuantileSketch(k=200).update(values).quantile(0.5)
+    assert abs(np.mean(values <= approximate) - 0.5) < 0.05
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from cac_store import CACStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    ledger = pd.DataFrame({
+        "date": ["2024-01-15", "2024-02-10", "2024-10-05", "2024-11-20", "2024-11-21"],
+        "spend": [1000.0, 2000.0, 3000.0, 4000.0, 500.0],
+        "new_customers": [10, 10, 20, 20, 5],
+        "channel": ["search", "social", "search", "social", "search"],
+    })
+    ledger.to_csv(tmp_path / "ledger.csv", index=False)
+    store = CACStore(str(tmp_path / "history"))
+    assert store.ingest(str(tmp_path / "ledger.csv")) == len(ledger)
+    return store
+
+
+def test_window_and_channel_filters_prune_partitions(store):
+    # One partition per year/month/channel present in the ledger
+    assert len(store.files()) == 5
+    q4_search = store.files(start="2024-10-01", end="2024-12-31", channels=["search"])
+    assert len(q4_search) == 2
+    assert all("channel=search" in path and ("month=10" in path or "month=11" in path) for path in q4_search)
+    assert len(store.files(start="2025-01-01")) == 0
+
+
+def test_period_frame_from_the_selected_history(store):
+    frame = store.load_period_frame(freq="Q", start="2024-10-01", channels=["search"])
+    assert frame["Spend"].tolist() == [3500.0]
+    assert frame["New_Customers"].tolist() == [25]
+    by_channel = store.load_period_frame(freq="Q", by_channel=True)
+    assert len(by_channel) == 4
+    with pytest.raises(ValueError, match="No stored rows"):
+        store.load_period_frame(start="2025-01-01")